@@ -0,0 +1,80 @@
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional, TextIO, Tuple
+
+
+class ActivityLog:
+    """Fixed-capacity activity history with batched hand-off to a view.
+
+    ``append`` only formats the line and queues it; nothing touches the
+    widget. The view calls ``drain`` once per frame to collect everything
+    queued since the last flush as one block of text, plus how many old
+    lines to trim so the widget never holds more than ``capacity`` lines.
+    Memory and per-frame work stay bounded however long the wallet runs.
+
+    With ``spill_path`` set, every line is also appended to that file at
+    drain time, so the full history survives the in-memory ring.
+    """
+
+    def __init__(self, capacity: int = 1_000, spill_path: Optional[str] = None) -> None:
+        if capacity <= 0:
+            raise ValueError("Log capacity must be positive.")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._lines: Deque[str] = deque(maxlen=capacity)
+        self._pending: Deque[str] = deque(maxlen=capacity)
+        self._shown = 0
+        self._spill: Optional[TextIO] = None
+        self._spill_buffer: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def append(self, message: str, now: Optional[datetime] = None) -> str:
+        line = f"[{(now or datetime.now()).strftime('%H:%M:%S')}] {message}"
+        self._lines.append(line)
+        # Lines that fall out of the pending ring before a flush never reach
+        # the widget; they would have been trimmed straight away anyway.
+        self._pending.append(line)
+        if self.spill_path is not None:
+            self._spill_buffer.append(line)
+            if len(self._spill_buffer) >= self.capacity:
+                self._write_spill()
+        return line
+
+    def drain(self) -> Tuple[str, int]:
+        """Return ``(text, trim)``: queued lines joined for a single insert, and
+        how many lines to delete from the top of the view afterwards."""
+
+        if self._spill_buffer:
+            self._write_spill()
+        if not self._pending:
+            return "", 0
+        text = "".join(f"{line}\n" for line in self._pending)
+        added = len(self._pending)
+        self._pending.clear()
+        self._shown += added
+        trim = max(0, self._shown - self.capacity)
+        self._shown -= trim
+        return text, trim
+
+    def close(self) -> None:
+        if self._spill_buffer:
+            self._write_spill()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _write_spill(self) -> None:
+        if self._spill is None:
+            self._spill = open(self.spill_path, "a", encoding="utf-8")
+        self._spill.write("".join(f"{line}\n" for line in self._spill_buffer))
+        self._spill.flush()
+        self._spill_buffer.clear()
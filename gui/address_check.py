@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from hd import BECH32_HRP, P2PKH_VERSION, P2SH_VERSIONS, base58check_decode, segwit_decode
+from monero import (
+    MAINNET_ADDRESS_PREFIX,
+    MAINNET_INTEGRATED_PREFIX,
+    MAINNET_SUBADDRESS_PREFIX,
+    base58_decode,
+    keccak256,
+)
+
+# Both coins use the Bitcoin base58 alphabet
+_BASE58 = frozenset("123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz")
+# Monero: prefix byte, 32-byte spend key, 32-byte view key, [8-byte payment id,] 4-byte checksum
+_MONERO_SIZES = {
+    MAINNET_ADDRESS_PREFIX: 69,
+    MAINNET_INTEGRATED_PREFIX: 77,
+    MAINNET_SUBADDRESS_PREFIX: 69,
+}
+_MONERO_LENGTHS = (95, 106)  # encoded length of 69- and 77-byte addresses
+
+ADDRESS_REQUIRED = "Destination address is required."
+
+
+def _litecoin_error(address: str) -> Optional[str]:
+    hrp = BECH32_HRP["LTC"]
+    if address[: len(hrp) + 1].lower() == hrp + "1":
+        if segwit_decode(hrp, address) is None:
+            return "Litecoin address checksum does not match; check it for typos."
+        return None
+    if not 26 <= len(address) <= 35 or any(char not in _BASE58 for char in address):
+        return "Not a Litecoin address."
+    payload = base58check_decode(address)
+    if payload is None:
+        return "Litecoin address checksum does not match; check it for typos."
+    if len(payload) != 21 or (payload[0] != P2PKH_VERSION["LTC"] and payload[0] not in P2SH_VERSIONS["LTC"]):
+        return "Not a Litecoin address."
+    return None
+
+
+def _monero_error(address: str) -> Optional[str]:
+    if len(address) not in _MONERO_LENGTHS or any(char not in _BASE58 for char in address):
+        return "Not a Monero address."
+    data = base58_decode(address)
+    if data is None or _MONERO_SIZES.get(data[0]) != len(data):
+        return "Not a Monero address."
+    if keccak256(data[:-4])[:4] != data[-4:]:
+        return "Monero address checksum does not match; check it for typos."
+    return None
+
+
+_CHECKS = {"LTC": _litecoin_error, "XMR": _monero_error}
+
+
+class AddressValidator:
+    """Full decode-and-checksum validation with a bounded LRU cache of verdicts.
+
+    Keccak and base58 decoding dominate the cost, and payout files repeat
+    addresses, so each ``(symbol, address)`` pair is checked once while it
+    stays among the ``max_entries`` most recently used. Safe to share between
+    threads.
+    """
+
+    def __init__(self, max_entries: int = 16_384) -> None:
+        self.max_entries = max_entries
+        self._verdicts: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def error(self, symbol: str, address: str) -> Optional[str]:
+        """Why ``address`` cannot receive ``symbol``, or ``None`` if it is valid."""
+
+        if symbol not in _CHECKS:
+            raise KeyError(f"Unsupported asset: {symbol}")
+        if not address:
+            return ADDRESS_REQUIRED
+        key = (symbol, address)
+        with self._lock:
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return self._verdicts[key]
+        verdict = _CHECKS[symbol](address)
+        with self._lock:
+            self.misses += 1
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+        return verdict
+
+    def validate_column(self, symbol: str, addresses: Sequence[str]) -> Dict[int, str]:
+        """Row -> error for every invalid address in a payout column.
+
+        Each distinct address is checked once, however often it repeats.
+        """
+
+        verdicts: Dict[str, Optional[str]] = {}
+        errors = {}
+        for row, address in enumerate(addresses):
+            if address not in verdicts:
+                verdicts[address] = self.error(symbol, address)
+            message = verdicts[address]
+            if message:
+                errors[row] = message
+        return errors
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verdicts.clear()
+
+
+_DEFAULT = AddressValidator()
+
+
+def address_error(symbol: str, address: str) -> Optional[str]:
+    return _DEFAULT.error(symbol, address)
+
+
+def validate_addresses(symbol: str, addresses: Sequence[str]) -> Dict[int, str]:
+    return _DEFAULT.validate_column(symbol, addresses)
@@ -0,0 +1,227 @@
+import hashlib
+import math
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from hd import BECH32_HRP, P2PKH_VERSION, P2SH_VERSIONS, base58check_decode, segwit_decode
+
+_MAGIC = b"KWAI"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBIIQ")  # magic, version, hash count, entry count, bit count
+_ENTRY = struct.Struct(">BBIB")  # key length, symbol index, account, path length
+
+
+class AddressEntry(NamedTuple):
+    """Where an owned address came from."""
+
+    symbol: str
+    account: int
+    path: Tuple[int, ...]
+
+
+class BloomFilter:
+    """Bit-array Bloom filter with double hashing over one BLAKE2b digest.
+
+    A miss is definitive; a hit only means the exact map has to be consulted.
+    Sized for ``capacity`` keys at ``error_rate`` false positives.
+    """
+
+    def __init__(self, capacity: int = 1_024, error_rate: float = 0.001) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def add(self, key: bytes) -> None:
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: object) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] >> (position & 7) & 1 for position in self._positions(key))  # type: ignore[arg-type]
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        size = self.bit_count
+        for round_ in range(self.hash_count):
+            yield (first + round_ * second) % size
+
+
+class AddressIndex:
+    """Owned scriptPubKeys (or raw address bytes) -> :class:`AddressEntry`.
+
+    The exact map answers every in-process probe: one dict lookup per
+    output. A Bloom filter over the same keys is kept alongside it and
+    serialized with it. It is the compact pre-check to hand to anything
+    that cannot hold the full map, such as a scanning worker process or a
+    node-side filter, and it never misses an owned key. The filter doubles
+    in size once the index outgrows it, so its false-positive rate stays
+    near ``error_rate`` as addresses are derived.
+    """
+
+    def __init__(self, capacity: int = 1_024, error_rate: float = 0.001) -> None:
+        self.error_rate = error_rate
+        self._entries: Dict[bytes, AddressEntry] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return self.match(key) is not None  # type: ignore[arg-type]
+
+    def add(self, key: bytes, symbol: str, account: int, path: Sequence[int]) -> None:
+        if key in self._entries:
+            return
+        self._entries[key] = AddressEntry(symbol, account, tuple(path))
+        if len(self._entries) > self._bloom.capacity:
+            self._rebuild(2 * self._bloom.capacity)
+        else:
+            self._bloom.add(key)
+
+    def add_address(self, symbol: str, address: str, account: int, path: Sequence[int]) -> bytes:
+        key = script_for_address(symbol, address)
+        self.add(key, symbol, account, path)
+        return key
+
+    @property
+    def bloom(self) -> BloomFilter:
+        return self._bloom
+
+    def might_contain(self, key: bytes) -> bool:
+        """Bloom pre-check only: ``False`` is definitive, ``True`` may be a false positive."""
+
+        return key in self._bloom
+
+    def match(self, key: bytes) -> Optional[AddressEntry]:
+        return self._entries.get(key)
+
+    def match_many(self, keys: Iterable[bytes]) -> List[Tuple[bytes, AddressEntry]]:
+        """Probe every output script of a block or mempool listing once."""
+
+        get = self._entries.get
+        hits = []
+        for key in keys:
+            entry = get(key)
+            if entry is not None:
+                hits.append((key, entry))
+        return hits
+
+    def keys(self, symbol: Optional[str] = None) -> List[bytes]:
+        if symbol is None:
+            return list(self._entries)
+        return [key for key, entry in self._entries.items() if entry.symbol == symbol]
+
+    # Serialization
+    def to_bytes(self) -> bytes:
+        """Binary image: header, the Bloom bit array as-is, then entries."""
+
+        symbols = sorted({entry.symbol for entry in self._entries.values()})
+        symbol_index = {symbol: position for position, symbol in enumerate(symbols)}
+        bloom = self._bloom
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, bloom.hash_count, len(self._entries), bloom.bit_count),
+            struct.pack(">Id", bloom.capacity, self.error_rate),
+            bytes([len(symbols)]),
+            b"".join(bytes([len(symbol)]) + symbol.encode("ascii") for symbol in symbols),
+            bytes(bloom._bits),
+        ]
+        for key, entry in self._entries.items():
+            parts.append(_ENTRY.pack(len(key), symbol_index[entry.symbol], entry.account, len(entry.path)))
+            parts.append(key)
+            parts.append(struct.pack(f">{len(entry.path)}I", *entry.path))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AddressIndex":
+        view = memoryview(data)
+        magic, version, hash_count, entry_count, bit_count = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not an address index image.")
+        offset = _HEADER.size
+        capacity, error_rate = struct.unpack_from(">Id", view, offset)
+        offset += 12
+        symbols = []
+        symbol_count = view[offset]
+        offset += 1
+        for _ in range(symbol_count):
+            length = view[offset]
+            symbols.append(bytes(view[offset + 1 : offset + 1 + length]).decode("ascii"))
+            offset += 1 + length
+
+        index = cls.__new__(cls)
+        index.error_rate = error_rate
+        index._entries = {}
+        bloom = BloomFilter.__new__(BloomFilter)
+        bloom.capacity, bloom.error_rate = capacity, error_rate
+        bloom.bit_count, bloom.hash_count = bit_count, hash_count
+        byte_count = (bit_count + 7) // 8
+        bloom._bits = bytearray(view[offset : offset + byte_count])
+        offset += byte_count
+        index._bloom = bloom
+
+        entries = index._entries
+        unpack_entry = _ENTRY.unpack_from
+        for _ in range(entry_count):
+            key_length, symbol, account, depth = unpack_entry(view, offset)
+            offset += _ENTRY.size
+            key = bytes(view[offset : offset + key_length])
+            offset += key_length
+            path = struct.unpack_from(f">{depth}I", view, offset)
+            offset += 4 * depth
+            entries[key] = AddressEntry(symbols[symbol], account, path)
+        if offset != len(view):
+            raise ValueError("Address index image has trailing data.")
+        return index
+
+    def save(self, path: str) -> None:
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(self.to_bytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AddressIndex":
+        with open(path, "rb") as handle:
+            return cls.from_bytes(handle.read())
+
+    def _rebuild(self, capacity: int) -> None:
+        bloom = BloomFilter(capacity, self.error_rate)
+        for key in self._entries:
+            bloom.add(key)
+        self._bloom = bloom
+
+
+def output_script(symbol: str, address: str) -> Optional[bytes]:
+    """scriptPubKey paying a segwit, P2PKH or P2SH address; ``None`` if it is none of those."""
+
+    hrp = BECH32_HRP.get(symbol)
+    if hrp is None:
+        return None
+    decoded = segwit_decode(hrp, address)
+    if decoded is not None:
+        version, program = decoded
+        return bytes([version + 0x50 if version else 0, len(program)]) + program
+    payload = base58check_decode(address)
+    if payload is None or len(payload) != 21:
+        return None
+    if payload[0] == P2PKH_VERSION.get(symbol):
+        return b"\x76\xa9\x14" + payload[1:] + b"\x88\xac"
+    if payload[0] in P2SH_VERSIONS.get(symbol, ()):
+        return b"\xa9\x14" + payload[1:] + b"\x87"
+    return None
+
+
+def script_for_address(symbol: str, address: str) -> bytes:
+    """Index key for an address: its scriptPubKey where one exists, raw bytes otherwise (Monero)."""
+
+    script = output_script(symbol, address)
+    return script if script is not None else address.encode("ascii")
@@ -0,0 +1,319 @@
+"""Offline benchmarks for WalletEngine hot paths.
+
+Builds a synthetic wallet (sub-accounts, pending history, UTXOs, mempool and
+a payout run), times each engine entry point, and reports ops/sec, latency
+percentiles and peak traced memory. Results can be saved as a JSON baseline
+and later runs compared against it; any tracked metric that regresses past
+the threshold makes the run exit non-zero.
+
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --baseline baseline.json --threshold 0.25
+
+Nothing here touches the network or the user's files.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from hd import segwit_address
+from pending import RetentionPolicy
+from wallet_engine import WalletEngine
+
+# A valid 12-word BIP-39 test vector, so profile loading exercises real validation.
+BENCH_SEED = " ".join(["abandon"] * 11 + ["about"])
+
+# Metric name -> True when higher is better.
+TRACKED_METRICS: Dict[str, bool] = {
+    "ops_per_sec": True,
+    "p50_us": False,
+    "p95_us": False,
+    "peak_kib": False,
+}
+# Below this many samples the 95th percentile is one or two samples' noise, so it is not gated.
+TAIL_MIN_SAMPLES = 100
+# Every case gets at least this many samples, however long they take.
+MIN_SAMPLES = 20
+
+
+@dataclass
+class Scenario:
+    """Size of the synthetic wallet. Same values and seed give the same wallet."""
+
+    sub_accounts: int = 1_000
+    pending: int = 10_000
+    payout_rows: int = 10_000
+    utxos: int = 10_000
+    mempool: int = 20_000
+    seed: int = 1
+
+
+@dataclass
+class Result:
+    name: str
+    ops: int
+    ops_per_sec: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    peak_kib: float
+
+
+# Synthetic data
+def _ltc_address(rng: random.Random) -> str:
+    return segwit_address("ltc", 0, bytes(rng.getrandbits(8) for _ in range(20)))
+
+
+def build_engine(scenario: Scenario) -> WalletEngine:
+    """Create an engine holding the scenario's accounts, history, coins and mempool."""
+
+    rng = random.Random(scenario.seed)
+    engine = WalletEngine(pending_retention=RetentionPolicy(max_records=None))
+    engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+    engine.set_node("XMR", "127.0.0.1:18081", tls=False)
+
+    ledger = engine.ledger
+    for symbol, scale in (("LTC", 10**8), ("XMR", 10**12)):
+        ledger.add_sub_accounts(symbol, scenario.sub_accounts)
+        balances = [rng.randrange(scale) for _ in range(ledger.sub_account_count(symbol))]
+        balances[0] = 10**6 * scale
+        ledger.load(symbol, balances)
+
+    utxos = engine.get_utxos("LTC")
+    utxos.add_many(
+        (f"{rng.getrandbits(256):064x}", rng.randrange(4), rng.randrange(10_000, 5 * 10**8))
+        for _ in range(scenario.utxos)
+    )
+    if scenario.utxos:
+        engine.set_balance("LTC", utxos.total)
+
+    pending = engine.get_account("LTC").pending
+    count = scenario.pending
+    pending.add_many(
+        [_ltc_address(rng) for _ in range(count)],
+        [rng.randrange(10_000, 10**8) for _ in range(count)],
+        [rng.randrange(10_000, 10**6) for _ in range(count)],
+        ["" if index % 7 else "payroll" for index in range(count)],
+        now=1.0,
+    )
+
+    estimator = engine.get_fee_estimator("LTC")
+    estimator.sync_mempool(
+        (f"{index:064x}", rng.randrange(100, 200_000), rng.randrange(110, 2_000))
+        for index in range(scenario.mempool)
+    )
+    engine.attach_sync(ChurnSync(engine, seed=scenario.seed))
+    return engine
+
+
+class ChurnSync:
+    """Stand-in chain sync: each run receives ``outputs`` new coins and spends the previous run's.
+
+    It goes through the same journaled ``add_utxo``/``spend_utxo`` calls as
+    the real syncs, so ``refresh_balances`` measures the engine's share of a
+    catch-up without a node.
+    """
+
+    def __init__(self, engine: WalletEngine, symbol: str = "LTC", outputs: int = 100, seed: int = 0) -> None:
+        self.engine = engine
+        self.symbol = symbol
+        self.outputs = outputs
+        self._rng = random.Random(seed)
+        self._received: List[str] = []
+
+    def run_blocking(self) -> None:
+        coins = self.engine.get_utxos(self.symbol)
+        for txid in self._received:
+            if (txid, 0) in coins:  # send_transaction may have selected it meanwhile
+                self.engine.spend_utxo(self.symbol, txid, 0)
+        self._received = [f"{self._rng.getrandbits(256):064x}" for _ in range(self.outputs)]
+        for txid in self._received:
+            self.engine.add_utxo(self.symbol, txid, 0, self._rng.randrange(10_000, 10**8))
+
+
+def payout_columns(scenario: Scenario) -> Dict[str, List[Any]]:
+    rng = random.Random(scenario.seed + 1)
+    rows = scenario.payout_rows
+    return {
+        "addresses": [_ltc_address(rng) for _ in range(rows)],
+        "amounts": [rng.randrange(1, 1_000) / 10**5 for _ in range(rows)],
+        "fees": [0.0001] * rows,
+    }
+
+
+# Measurement
+def measure(
+    name: str,
+    operation: Callable[[], Any],
+    min_time: float = 0.5,
+    max_ops: int = 10_000,
+    min_ops: int = MIN_SAMPLES,
+) -> Result:
+    """Time ``operation`` for ``min_time`` seconds and ``min_ops`` calls, then once more under tracemalloc."""
+
+    operation()  # warm caches and lazy indexes
+    samples: List[int] = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        deadline = time.perf_counter() + min_time
+        while len(samples) < max_ops and (len(samples) < min_ops or time.perf_counter() < deadline):
+            started = time.perf_counter_ns()
+            operation()
+            samples.append(time.perf_counter_ns() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return Result(
+        name=name,
+        ops=len(samples),
+        ops_per_sec=round(len(samples) / (sum(samples) / 1e9), 2),
+        p50_us=round(_percentile(samples, 0.50) / 1e3, 2),
+        p95_us=round(_percentile(samples, 0.95) / 1e3, 2),
+        p99_us=round(_percentile(samples, 0.99) / 1e3, 2),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def _percentile(ordered: Sequence[int], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_suite(scenario: Scenario, min_time: float = 0.5, only: Optional[Sequence[str]] = None) -> List[Result]:
+    engine = build_engine(scenario)
+    columns = payout_columns(scenario)
+    rng = random.Random(scenario.seed + 2)
+    recipients = [_ltc_address(rng) for _ in range(256)]
+    counter = iter(range(10**9))
+
+    def send() -> None:
+        index = next(counter)
+        engine.send_transaction("LTC", recipients[index % 256], 0.001, 0.0001, "")
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "set_profile": lambda: engine.set_profile("bench", BENCH_SEED),
+        "validate_transaction": lambda: engine.validate_transaction("LTC", recipients[0], 0.5, 0.0001),
+        "estimate_fee": lambda: engine.estimate_fee("LTC", 0.5),
+        "send_transaction": send,
+        # The synthetic nodes are not running; the mempool is fed directly above.
+        "refresh_balances": lambda: engine.refresh_balances(mempool=False),
+        "validate_batch": lambda: engine.validate_batch(
+            "LTC", columns["addresses"], columns["amounts"], columns["fees"]
+        ),
+        "list_transactions": lambda: engine.list_transactions(
+            "LTC", offset=next(counter) % max(1, scenario.pending), limit=50
+        ),
+    }
+    engine.set_profile("bench", BENCH_SEED)
+    results = []
+    for name, operation in cases.items():
+        if only and name not in only:
+            continue
+        results.append(measure(name, operation, min_time))
+    return results
+
+
+# Baselines
+def save_baseline(path: str, scenario: Scenario, results: Sequence[Result]) -> None:
+    document = {
+        "scenario": asdict(scenario),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def compare(baseline: Dict[str, Any], results: Sequence[Result], threshold: float) -> List[str]:
+    """Return one message per tracked metric that regressed by more than ``threshold``.
+
+    ``p95_us`` is only compared when both runs have ``TAIL_MIN_SAMPLES``
+    samples; slow cases are gated on ``p50_us`` and ``ops_per_sec``.
+    """
+
+    regressions = []
+    recorded = baseline.get("results", {})
+    for result in results:
+        previous = recorded.get(result.name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            if metric == "p95_us" and min(result.ops, previous.get("ops", 0)) < TAIL_MIN_SAMPLES:
+                continue
+            before, after = previous.get(metric), getattr(result, metric)
+            if not before:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{result.name}.{metric}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+
+def _print_table(results: Sequence[Result]) -> None:
+    print(f"{'benchmark':<22}{'ops':>8}{'ops/s':>12}{'p50 us':>11}{'p95 us':>11}{'p99 us':>11}{'peak KiB':>11}")
+    for result in results:
+        print(
+            f"{result.name:<22}{result.ops:>8}{result.ops_per_sec:>12.1f}{result.p50_us:>11.1f}"
+            f"{result.p95_us:>11.1f}{result.p99_us:>11.1f}{result.peak_kib:>11.1f}"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = Scenario()
+    parser.add_argument("--accounts", type=int, default=defaults.sub_accounts, help="sub-accounts per asset")
+    parser.add_argument("--pending", type=int, default=defaults.pending, help="pending transactions")
+    parser.add_argument("--rows", type=int, default=defaults.payout_rows, help="payout batch rows")
+    parser.add_argument("--utxos", type=int, default=defaults.utxos, help="LTC unspent outputs")
+    parser.add_argument("--mempool", type=int, default=defaults.mempool, help="mempool transactions")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to sample each benchmark")
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, e.g. 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    scenario = Scenario(args.accounts, args.pending, args.rows, args.utxos, args.mempool, args.seed)
+    results = run_suite(scenario, args.min_time, args.only)
+    _print_table(results)
+
+    if args.save:
+        save_baseline(args.save, scenario, results)
+        print(f"Saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("scenario") != asdict(scenario):
+            print("Warning: baseline was recorded with a different scenario.", file=sys.stderr)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print("Regressions past threshold:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No tracked metric regressed more than {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
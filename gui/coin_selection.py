@@ -0,0 +1,258 @@
+import random
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Outpoint = Tuple[str, int]
+
+# P2WPKH sizes in vbytes, used to price a change output and spending it later.
+CHANGE_OUTPUT_VSIZE = 31
+INPUT_VSIZE = 68
+TX_OVERHEAD_VSIZE = 11  # version, input and output counts, locktime, segwit marker
+
+
+def spend_vsize(inputs: int, outputs: int) -> int:
+    """Approximate vsize of a P2WPKH spend; every output is priced like a change output."""
+
+    return TX_OVERHEAD_VSIZE + INPUT_VSIZE * inputs + CHANGE_OUTPUT_VSIZE * outputs
+
+
+class UtxoIndex:
+    """Value-sorted index of spendable outputs with incremental updates.
+
+    Entries are ``(value, txid, vout)`` tuples kept sorted by value, with a dict
+    from outpoint to value alongside. Receiving or spending a coin is one
+    bisect plus one list insert or delete, so the index never needs a full
+    re-sort, and range queries by value are a bisect away.
+    """
+
+    def __init__(self) -> None:
+        self._sorted: List[Tuple[int, str, int]] = []
+        self._values: Dict[Outpoint, int] = {}
+        self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, outpoint: object) -> bool:
+        return outpoint in self._values
+
+    def __iter__(self) -> Iterator[Tuple[int, str, int]]:
+        return iter(self._sorted)
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def add(self, txid: str, vout: int, value: int) -> None:
+        if value <= 0:
+            raise ValueError("UTXO value must be positive.")
+        if (txid, vout) in self._values:
+            return
+        insort(self._sorted, (value, txid, vout))
+        self._values[(txid, vout)] = value
+        self._total += value
+
+    def add_many(self, outputs: Iterable[Tuple[str, int, int]]) -> None:
+        """Bulk-load ``(txid, vout, value)`` rows with a single sort, e.g. on restore."""
+
+        fresh = []
+        for txid, vout, value in outputs:
+            if value > 0 and (txid, vout) not in self._values:
+                self._values[(txid, vout)] = value
+                self._total += value
+                fresh.append((value, txid, vout))
+        self._sorted.extend(fresh)
+        self._sorted.sort()
+
+    def get(self, txid: str, vout: int) -> Optional[int]:
+        return self._values.get((txid, vout))
+
+    def spend(self, txid: str, vout: int) -> int:
+        value = self._values.pop((txid, vout), None)
+        if value is None:
+            raise KeyError(f"Unknown or already spent output {txid}:{vout}")
+        position = bisect_left(self._sorted, (value, txid, vout))
+        del self._sorted[position]
+        self._total -= value
+        return value
+
+    def smallest_at_least(self, value: int) -> Optional[Tuple[int, str, int]]:
+        position = bisect_left(self._sorted, (value,))
+        return self._sorted[position] if position < len(self._sorted) else None
+
+    def below(self, bound: int, limit: int) -> List[Tuple[int, str, int]]:
+        """Up to ``limit`` largest entries with value <= ``bound``, descending."""
+
+        end = bisect_left(self._sorted, (bound + 1,))
+        start = max(0, end - limit)
+        return self._sorted[start:end][::-1]
+
+    def largest(self, limit: int) -> List[Tuple[int, str, int]]:
+        return self._sorted[-limit:][::-1]
+
+
+@dataclass
+class CoinSelection:
+    """Chosen inputs for a spend. ``change`` is zero for a changeless result."""
+
+    inputs: List[Outpoint]
+    total: int
+    change: int
+    algorithm: str
+    excess: int = 0
+    values: List[int] = field(default_factory=list, repr=False)
+
+
+def select_coins(
+    index: UtxoIndex,
+    target: int,
+    fee_rate: int,
+    time_budget: float = 0.05,
+    pool_limit: int = 2_000,
+    max_tries: int = 100_000,
+) -> CoinSelection:
+    """Pick inputs covering ``target`` atomic units (amount plus fee).
+
+    Branch-and-bound looks first for a changeless set whose surplus is no more
+    than the cost of creating and later spending a change output at
+    ``fee_rate``; that surplus is absorbed into the fee. If none turns up
+    within ``time_budget``, a randomized knapsack pass and the smallest single
+    covering coin compete for the least change, with largest-first as the
+    last resort.
+    """
+
+    if target <= 0:
+        raise ValueError("Amount must be greater than zero.")
+    if target > index.total:
+        raise ValueError("Insufficient balance for amount plus fee.")
+
+    deadline = time.monotonic() + time_budget
+    cost_of_change = (CHANGE_OUTPUT_VSIZE + INPUT_VSIZE) * fee_rate
+
+    pool = index.below(target + cost_of_change, pool_limit)
+    chosen = _branch_and_bound([entry[0] for entry in pool], target, cost_of_change, deadline, max_tries)
+    if chosen is not None:
+        picked = [pool[position] for position in chosen]
+        return _result(picked, target, change=0, algorithm="bnb")
+
+    # With change, the change output itself must be worth creating.
+    needed = target + cost_of_change
+    single = index.smallest_at_least(needed)
+    pool = index.below(needed - 1, pool_limit)
+    subset = _knapsack([entry[0] for entry in pool], needed, deadline)
+    if subset is not None:
+        knapsack_total = sum(pool[position][0] for position in subset)
+        if single is None or knapsack_total < single[0]:
+            picked = [pool[position] for position in subset]
+            return _result(picked, target, knapsack_total - target, "knapsack")
+    if single is not None:
+        return _result([single], target, single[0] - target, "single")
+
+    picked = []
+    running = 0
+    for entry in index.largest(len(index)):
+        picked.append(entry)
+        running += entry[0]
+        if running >= target:
+            break
+    change = running - target
+    if change <= cost_of_change:
+        return _result(picked, target, change=0, algorithm="largest-first")
+    return _result(picked, target, change, "largest-first")
+
+
+def _result(picked: Sequence[Tuple[int, str, int]], target: int, change: int, algorithm: str) -> CoinSelection:
+    total = sum(entry[0] for entry in picked)
+    return CoinSelection(
+        inputs=[(txid, vout) for _, txid, vout in picked],
+        total=total,
+        change=change,
+        algorithm=algorithm,
+        excess=total - target - change,
+        values=[entry[0] for entry in picked],
+    )
+
+
+def _branch_and_bound(
+    values: Sequence[int], target: int, tolerance: int, deadline: float, max_tries: int
+) -> Optional[List[int]]:
+    """Depth-first search over descending ``values`` for a sum in [target, target + tolerance]."""
+
+    available = sum(values)
+    if available < target:
+        return None
+
+    selected: List[bool] = []
+    current = 0
+    best: Optional[List[bool]] = None
+    best_waste = tolerance + 1
+    for tries in range(max_tries):
+        if not tries & 1023 and time.monotonic() > deadline:
+            break
+        backtrack = False
+        if current + available < target or current > target + tolerance:
+            backtrack = True
+        elif current >= target:
+            waste = current - target
+            if waste < best_waste:
+                best, best_waste = list(selected), waste
+                if waste == 0:
+                    break
+            backtrack = True
+
+        if backtrack:
+            while selected and not selected[-1]:
+                selected.pop()
+                available += values[len(selected)]
+            if not selected:
+                break
+            selected[-1] = False
+            current -= values[len(selected) - 1]
+        else:
+            value = values[len(selected)]
+            available -= value
+            # Excluding a coin and then including an equal one is the same branch.
+            if selected and not selected[-1] and value == values[len(selected) - 1]:
+                selected.append(False)
+            else:
+                selected.append(True)
+                current += value
+
+    if best is None:
+        return None
+    return [position for position, included in enumerate(best) if included]
+
+
+def _knapsack(values: Sequence[int], needed: int, deadline: float, rounds: int = 1_000) -> Optional[List[int]]:
+    """Randomized approximate subset sum over descending ``values`` (smallest total >= needed)."""
+
+    if sum(values) < needed:
+        return None
+    chooser = random.SystemRandom()
+    best_total = sum(values) + 1
+    best: Optional[List[bool]] = None
+    for _ in range(rounds):
+        if time.monotonic() > deadline and best is not None:
+            break
+        included = [False] * len(values)
+        total = 0
+        reached = False
+        for second_pass in (False, True):
+            if reached:
+                break
+            for position, value in enumerate(values):
+                if included[position] or not (second_pass or chooser.random() < 0.5):
+                    continue
+                total += value
+                included[position] = True
+                if total >= needed:
+                    reached = True
+                    if total < best_total:
+                        best_total, best = total, list(included)
+                    total -= value
+                    included[position] = False
+    if best is None:
+        return None
+    return [position for position, included in enumerate(best) if included]
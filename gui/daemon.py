@@ -0,0 +1,269 @@
+"""Headless wallet daemon: a :class:`WalletEngine` served over a Unix domain socket.
+
+No GUI module is imported, so the daemon runs without a display and is
+ready as soon as the engine modules have loaded, with no Tk start-up or
+widget tree in the way. The protocol is JSON-RPC 2.0 with one
+message per line; a line holding a JSON array is a batch, answered with
+one array once every call in it has run. Calls in a batch run in order in
+a single worker-thread hop, so a scripted payout run costs one round trip.
+Separate connections are served concurrently; the engine's account locks
+keep concurrent spends safe.
+
+The socket is created mode 0600: anyone who can reach it can spend, and
+``set_profile`` carries the seed phrase, so it must stay on the local host
+and be readable only by the wallet's user.
+
+Usage::
+
+    python daemon.py --socket /run/user/1000/kernel-wallet.sock [--journal DIR]
+
+With ``--journal`` the storage passphrase is read from
+``KERNEL_WALLET_STORAGE_PASSPHRASE``.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import signal
+import sys
+from dataclasses import asdict
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set
+
+from pending import PENDING_STATES, HistoryPage, PendingRecord
+from wallet_engine import NodeConfig, PayoutBatch, WalletAccount, WalletEngine, WalletProfile
+
+# Engine methods reachable over the socket; nothing else is dispatched.
+EXPOSED_METHODS = frozenset(
+    {
+        "has_profile",
+        "set_profile",
+        "get_profile",
+        "last_profile_name",
+        "list_accounts",
+        "get_account",
+        "receive_address",
+        "set_node",
+        "add_node",
+        "remove_node",
+        "get_node",
+        "get_nodes",
+        "estimate_fee",
+        "validate_transaction",
+        "send_transaction",
+        "get_transaction",
+        "list_transactions",
+        "update_transaction_state",
+        "broadcast_transaction",
+        "validate_batch",
+        "prepare_batch",
+        "refresh_balances",
+        "refresh_mempool",
+        "flush",
+    }
+)
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603  # anything else the engine raised
+WALLET_ERROR = -32000  # ValueError: validation and state errors
+NOT_FOUND = -32001  # KeyError: unknown asset, transaction or node
+
+MAX_LINE = 16 * 1024 * 1024
+
+
+def encode(value: Any) -> Any:
+    """Engine results as JSON-ready values. Profiles never carry their seed."""
+
+    if isinstance(value, WalletProfile):
+        return {"name": value.name}
+    if isinstance(value, WalletAccount):
+        return {
+            "coin": value.coin,
+            "symbol": value.symbol,
+            "address": value.address,
+            "ledger_index": value.ledger_index,
+            "balance_units": value.balance_units,
+            "pending": {state: value.pending.count(state) for state in PENDING_STATES},
+        }
+    if isinstance(value, PendingRecord):
+        return {name: getattr(value, name) for name in PendingRecord.__slots__}
+    if isinstance(value, HistoryPage):
+        return {
+            "offset": value.offset,
+            "total": value.total,
+            "version": value.version,
+            "records": [encode(record) for record in value.records],
+        }
+    if isinstance(value, PayoutBatch):
+        encoded = asdict(value)
+        encoded["errors"] = {str(row): messages for row, messages in value.errors.items()}
+        return encoded
+    if isinstance(value, NodeConfig):
+        return asdict(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    return value
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class WalletDaemon:
+    """Serve one engine on ``socket_path`` until :meth:`stop` is called."""
+
+    def __init__(self, engine: WalletEngine, socket_path: str) -> None:
+        self.engine = engine
+        self.socket_path = socket_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._connections: Set["asyncio.Task[None]"] = set()
+        self._signatures: Dict[str, inspect.Signature] = {}
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from an unclean exit
+        previous = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path, limit=MAX_LINE)
+        finally:
+            os.umask(previous)
+        os.chmod(self.socket_path, 0o600)
+        self._stopped = asyncio.Event()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._stopped is not None
+        await self._stopped.wait()
+        await self._shutdown()
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        # Hang up on connected clients; an engine call already running in its thread still completes.
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    reply: Any = _error(None, PARSE_ERROR, "Request is not valid JSON.")
+                else:
+                    reply = await loop.run_in_executor(None, self.handle, message)
+                if reply is not None:
+                    writer.write(json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n")
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    def handle(self, message: Any) -> Any:
+        """Answer one request or batch; ``None`` when everything was a notification."""
+
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch.")
+            replies = [reply for reply in map(self._call, message) if reply is not None]
+            return replies or None
+        return self._call(message)
+
+    def _call(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error(None, INVALID_REQUEST, "Request must be an object with a method.")
+        request_id = request.get("id")
+        notification = "id" not in request
+        method = request["method"]
+        params = request.get("params", [])
+        if method not in EXPOSED_METHODS:
+            reply = _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+        elif not isinstance(params, (list, dict)):
+            reply = _error(request_id, INVALID_PARAMS, "Params must be an array or an object.")
+        else:
+            handler = getattr(self.engine, method)
+            signature = self._signatures.get(method)
+            if signature is None:
+                signature = self._signatures[method] = inspect.signature(handler)
+            try:
+                # Bind first so only a bad argument list is INVALID_PARAMS; a
+                # TypeError from inside the engine is an internal error.
+                bound = signature.bind(**params) if isinstance(params, dict) else signature.bind(*params)
+            except TypeError as exc:
+                return None if notification else _error(request_id, INVALID_PARAMS, str(exc))
+            try:
+                result = handler(*bound.args, **bound.kwargs)
+            except KeyError as exc:
+                reply = _error(request_id, NOT_FOUND, str(exc.args[0]) if exc.args else "Not found.")
+            except ValueError as exc:
+                reply = _error(request_id, WALLET_ERROR, str(exc))
+            except Exception as exc:
+                # Answer for this id and keep the connection and the rest of the batch alive.
+                reply = _error(request_id, INTERNAL_ERROR, f"{type(exc).__name__}: {exc}")
+            else:
+                reply = {"jsonrpc": "2.0", "id": request_id, "result": encode(result)}
+        return None if notification else reply
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the Kernel Wallet engine without a GUI.")
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    parser.add_argument("--journal", help="directory of the encrypted state journal")
+    args = parser.parse_args(argv)
+
+    journal = None
+    if args.journal:
+        passphrase = os.environ.get("KERNEL_WALLET_STORAGE_PASSPHRASE")
+        if not passphrase:
+            parser.error("--journal needs KERNEL_WALLET_STORAGE_PASSPHRASE in the environment")
+        from journal import JournalStore
+
+        journal = JournalStore.open(args.journal, passphrase)
+    engine = WalletEngine(journal=journal)
+    daemon = WalletDaemon(engine, args.socket)
+
+    async def run() -> None:
+        await daemon.start()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, daemon.stop)
+        print(f"Kernel Wallet daemon listening on {args.socket}", file=sys.stderr, flush=True)
+        await daemon.serve_forever()
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
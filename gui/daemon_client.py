@@ -0,0 +1,265 @@
+import itertools
+import json
+import socket
+import threading
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ledger import from_atomic
+from pending import HistoryPage, PendingRecord
+from wallet_engine import NodeConfig, PayoutBatch, WalletProfile
+
+RPCCall = Tuple[str, Any]
+
+
+class DaemonError(Exception):
+    """An error reply from the daemon; ``code`` is the JSON-RPC error code."""
+
+    def __init__(self, message: str, code: int) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class DaemonClient:
+    """Blocking JSON-RPC client for ``daemon.py`` over its Unix socket.
+
+    One connection is shared behind a lock, so the client can be used from
+    the GUI thread and worker threads alike. :meth:`batch` sends many calls
+    in one line and one round trip.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._reader: Any = None
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if args and kwargs:
+            raise ValueError("Pass positional or keyword parameters, not both.")
+        reply = self._exchange(self._request(method, kwargs or list(args)))
+        return self._result(reply)
+
+    def batch(self, calls: Sequence[RPCCall], return_exceptions: bool = False) -> List[Any]:
+        """Run ``(method, params)`` calls in order on the daemon; results come back in input order."""
+
+        requests = [self._request(method, params if params is not None else []) for method, params in calls]
+        if not requests:
+            return []
+        replies = {reply.get("id"): reply for reply in self._exchange(requests)}
+        results = []
+        for request in requests:
+            try:
+                results.append(self._result(replies[request["id"]]))
+            except DaemonError as exc:
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                self._reader.close()
+                self._socket.close()
+                self._socket = None
+
+    def _request(self, method: str, params: Any) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+    def _exchange(self, message: Any) -> Any:
+        line = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            if self._socket is None:
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.settimeout(self.timeout)
+                try:
+                    connection.connect(self.socket_path)
+                except OSError:
+                    # Leave no half-open socket behind, so a retry while the daemon starts reconnects.
+                    connection.close()
+                    raise
+                self._socket = connection
+                self._reader = connection.makefile("rb")
+            try:
+                self._socket.sendall(line)
+                reply = self._reader.readline()
+            except OSError:
+                self._reader.close()
+                self._socket.close()
+                self._socket = None
+                raise
+        if not reply:
+            raise ConnectionError("Wallet daemon closed the connection.")
+        return json.loads(reply)
+
+    @staticmethod
+    def _result(reply: Dict[str, Any]) -> Any:
+        error = reply.get("error")
+        if error is None:
+            return reply.get("result")
+        if error["code"] == -32001:
+            raise KeyError(error["message"])
+        if error["code"] == -32000:
+            raise ValueError(error["message"])
+        raise DaemonError(error["message"], error["code"])
+
+
+class RemotePending:
+    """Per-state counts standing in for an account's pending store."""
+
+    def __init__(self, counts: Dict[str, int]) -> None:
+        self._counts = counts
+
+    def count(self, state: Optional[str] = None) -> int:
+        if state is None:
+            return sum(self._counts.values())
+        return self._counts.get(state, 0)
+
+
+class RemoteAccount:
+    """Snapshot of a daemon-side account, read-only."""
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.coin = data["coin"]
+        self.symbol = data["symbol"]
+        self.address = data["address"]
+        self.ledger_index = data["ledger_index"]
+        self.balance_units = data["balance_units"]
+        self.pending = RemotePending(data["pending"])
+
+    @property
+    def balance(self) -> Decimal:
+        return from_atomic(self.symbol, self.balance_units)
+
+
+def _record(data: Dict[str, Any]) -> PendingRecord:
+    record = PendingRecord(
+        data["tx_id"], data["symbol"], data["address"], data["amount"], data["fee"], data["note"], data["created_at"]
+    )
+    record.state = data["state"]
+    record.updated_at = data["updated_at"]
+    record.inputs = data["inputs"]
+    record.change = data["change"]
+    record.batch = data.get("batch")
+    return record
+
+
+def _batch(data: Dict[str, Any]) -> PayoutBatch:
+    data = dict(data)
+    data["errors"] = {int(row): messages for row, messages in data["errors"].items()}
+    return PayoutBatch(**data)
+
+
+class RemoteEngine:
+    """The slice of the :class:`WalletEngine` API the GUI uses, served by a daemon.
+
+    Results come back as the same types the in-process engine returns
+    (accounts as read-only :class:`RemoteAccount` snapshots), so
+    ``WalletGUI`` can attach to a daemon without changes.
+    """
+
+    metrics = None
+
+    def __init__(self, socket_path: str) -> None:
+        self.client = DaemonClient(socket_path)
+
+    def has_profile(self) -> bool:
+        return self.client.call("has_profile")
+
+    def set_profile(self, name: str, seed_phrase: str, passphrase: str = "") -> WalletProfile:
+        return WalletProfile(self.client.call("set_profile", name, seed_phrase, passphrase)["name"], "")
+
+    def get_profile(self) -> WalletProfile:
+        return WalletProfile(self.client.call("get_profile")["name"], "")
+
+    def last_profile_name(self) -> Optional[str]:
+        return self.client.call("last_profile_name")
+
+    def list_accounts(self) -> List[RemoteAccount]:
+        return [RemoteAccount(data) for data in self.client.call("list_accounts")]
+
+    def get_account(self, symbol: str) -> RemoteAccount:
+        return RemoteAccount(self.client.call("get_account", symbol))
+
+    def receive_address(self, symbol: str, index: int = 0, change: bool = False) -> str:
+        return self.client.call("receive_address", symbol, index, change)
+
+    def set_node(self, symbol: str, rpc_address: str, tls: bool = True) -> NodeConfig:
+        return NodeConfig(**self.client.call("set_node", symbol, rpc_address, tls))
+
+    def add_node(self, symbol: str, rpc_address: str, tls: bool = True) -> NodeConfig:
+        return NodeConfig(**self.client.call("add_node", symbol, rpc_address, tls))
+
+    def remove_node(self, symbol: str, rpc_address: str) -> None:
+        self.client.call("remove_node", symbol, rpc_address)
+
+    def get_node(self, symbol: str) -> Optional[NodeConfig]:
+        node = self.client.call("get_node", symbol)
+        return NodeConfig(**node) if node is not None else None
+
+    def get_nodes(self, symbol: str) -> List[NodeConfig]:
+        return [NodeConfig(**node) for node in self.client.call("get_nodes", symbol)]
+
+    def estimate_fee(self, symbol: str, amount: float, target_blocks: int = 2) -> float:
+        return self.client.call("estimate_fee", symbol, amount, target_blocks)
+
+    def validate_transaction(self, symbol: str, address: str, amount: float, fee: float) -> List[str]:
+        return self.client.call("validate_transaction", symbol, address, amount, fee)
+
+    def send_transaction(self, symbol: str, address: str, amount: float, fee: float, note: str) -> str:
+        return self.client.call("send_transaction", symbol, address, amount, fee, note)
+
+    def get_transaction(self, symbol: str, tx_id: str) -> PendingRecord:
+        return _record(self.client.call("get_transaction", symbol, tx_id))
+
+    def list_transactions(
+        self,
+        symbol: str,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "created",
+        descending: bool = True,
+        state: Optional[str] = None,
+        query: str = "",
+    ) -> HistoryPage:
+        page = self.client.call("list_transactions", symbol, offset, limit, sort, descending, state, query)
+        return HistoryPage(page["offset"], page["total"], page["version"], [_record(data) for data in page["records"]])
+
+    def update_transaction_state(self, symbol: str, tx_id: str, state: str) -> PendingRecord:
+        return _record(self.client.call("update_transaction_state", symbol, tx_id, state))
+
+    def broadcast_transaction(self, symbol: str, tx_id: str, raw_hex: str) -> PendingRecord:
+        return _record(self.client.call("broadcast_transaction", symbol, tx_id, raw_hex))
+
+    def validate_batch(
+        self, symbol: str, addresses: Sequence[str], amounts: Sequence[float], fees: Sequence[float]
+    ) -> PayoutBatch:
+        return _batch(self.client.call("validate_batch", symbol, list(addresses), list(amounts), list(fees)))
+
+    def prepare_batch(
+        self,
+        symbol: str,
+        addresses: Sequence[str],
+        amounts: Sequence[float],
+        fees: Sequence[float],
+        notes: Optional[Sequence[str]] = None,
+    ) -> PayoutBatch:
+        notes = list(notes) if notes is not None else None
+        return _batch(
+            self.client.call("prepare_batch", symbol, list(addresses), list(amounts), list(fees), notes)
+        )
+
+    def refresh_balances(self, mempool: bool = True) -> None:
+        self.client.call("refresh_balances", mempool)
+
+    def refresh_mempool(self, symbol: str) -> int:
+        return self.client.call("refresh_mempool", symbol)
+
+    def flush(self) -> None:
+        self.client.call("flush")
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,162 @@
+import math
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+MempoolEntry = Tuple[str, int, int]  # txid, fee in atomic units, size in vbytes/bytes
+
+
+@dataclass(frozen=True)
+class FeeProfile:
+    """Chain parameters the estimator needs. Rates are atomic units per vbyte."""
+
+    block_size: int
+    typical_tx_size: int
+    relay_floor: int
+
+
+FEE_PROFILES: Dict[str, FeeProfile] = {
+    # 1 MvB blocks; a 1-in/2-out P2WPKH spend is ~141 vB; 10 litoshi/vB relay floor.
+    "LTC": FeeProfile(block_size=1_000_000, typical_tx_size=141, relay_floor=10),
+    # Blocks track the 300 kB penalty-free median; a 2-out RingCT tx is ~1.5 kB.
+    "XMR": FeeProfile(block_size=300_000, typical_tx_size=1_500, relay_floor=20_000),
+}
+
+
+class FeeEstimator:
+    """Mempool fee-rate histogram with O(log n) confirmation-target queries.
+
+    Transactions are bucketed by fee rate on a 10% log scale. Adding or
+    removing a transaction touches one bucket. The cumulative index, which is
+    the mempool size paying at least each bucket's rate, sorted from the top,
+    is rebuilt lazily on the first query after a change. A query bisects that
+    index for the rate that gets into the next ``target`` blocks. Answers are
+    cached per target for ``ttl`` seconds.
+
+    Minimum fee rates of recently mined blocks act as a floor, so a quiet
+    mempool does not produce bids below what miners actually accept.
+    """
+
+    _GROWTH = 1.1
+    _BUCKETS = 160
+
+    def __init__(self, profile: FeeProfile, ttl: float = 10.0, recent_blocks: int = 12) -> None:
+        self.profile = profile
+        self.ttl = ttl
+        self._sizes = [0] * self._BUCKETS
+        self._txs: Dict[str, Tuple[int, int]] = {}
+        self._recent_floors: Deque[int] = deque(maxlen=recent_blocks)
+        self._cumulative: List[int] = []
+        self._dirty = True
+        self._cache: Dict[int, Tuple[float, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._txs)
+
+    @property
+    def has_data(self) -> bool:
+        return bool(self._txs or self._recent_floors)
+
+    # Incremental updates
+    def add_transaction(self, txid: str, fee: int, size: int) -> None:
+        if txid in self._txs or size <= 0:
+            return
+        bucket = self._bucket_for(fee / size)
+        self._txs[txid] = (bucket, size)
+        self._sizes[bucket] += size
+        self._dirty = True
+
+    def remove_transaction(self, txid: str) -> None:
+        entry = self._txs.pop(txid, None)
+        if entry is not None:
+            bucket, size = entry
+            self._sizes[bucket] -= size
+            self._dirty = True
+
+    def sync_mempool(self, entries: Iterable[MempoolEntry]) -> None:
+        """Reconcile with a full mempool listing, touching only what changed."""
+
+        seen = set()
+        for txid, fee, size in entries:
+            seen.add(txid)
+            self.add_transaction(txid, fee, size)
+        for txid in [txid for txid in self._txs if txid not in seen]:
+            self.remove_transaction(txid)
+
+    def add_block(self, txids: Iterable[str], min_fee_rate: Optional[int] = None) -> None:
+        """Drop mined transactions and remember the block's cheapest accepted rate."""
+
+        for txid in txids:
+            self.remove_transaction(txid)
+        if min_fee_rate is not None:
+            self._recent_floors.append(min_fee_rate)
+            self._dirty = True
+
+    # Queries
+    def fee_rate(self, target: int = 2) -> int:
+        """Atomic units per vbyte expected to confirm within ``target`` blocks."""
+
+        target = max(1, target)
+        now = time.monotonic()
+        cached = self._cache.get(target)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        if self._dirty:
+            self._rebuild()
+        capacity = target * self.profile.block_size
+        position = bisect_left(self._cumulative, capacity)
+        if position >= len(self._cumulative):
+            rate = 0
+        else:
+            # Outbid the bucket that spills past the target's block space.
+            rate = math.ceil(self._upper_bound(self._BUCKETS - 1 - position))
+        floor = min(self._recent_floors) if self._recent_floors else 0
+        rate = max(rate, floor, self.profile.relay_floor)
+        self._cache[target] = (now + self.ttl, rate)
+        return rate
+
+    def fee_for(self, size: Optional[int] = None, target: int = 2) -> int:
+        return self.fee_rate(target) * (size or self.profile.typical_tx_size)
+
+    # Internals
+    def _rebuild(self) -> None:
+        running = 0
+        cumulative = []
+        for size in reversed(self._sizes):
+            running += size
+            cumulative.append(running)
+        self._cumulative = cumulative
+        self._cache.clear()
+        self._dirty = False
+
+    def _bucket_for(self, rate: float) -> int:
+        if rate <= 1:
+            return 0
+        return min(int(math.log(rate, self._GROWTH)) + 1, self._BUCKETS - 1)
+
+    def _upper_bound(self, bucket: int) -> float:
+        return self._GROWTH**bucket
+
+
+def parse_mempool(symbol: str, payload: Any) -> List[MempoolEntry]:
+    """Turn a node's verbose mempool listing into estimator entries.
+
+    Accepts litecoind's ``getrawmempool true`` result and monerod's
+    ``/get_transaction_pool`` reply.
+    """
+
+    if symbol == "LTC":
+        entries = []
+        for txid, info in payload.items():
+            fee = info["fees"]["base"] if "fees" in info else info["fee"]
+            entries.append((txid, round(fee * 10**8), info["vsize"]))
+        return entries
+    if symbol == "XMR":
+        return [
+            (tx["id_hash"], tx["fee"], tx.get("weight") or tx["blob_size"])
+            for tx in payload.get("transactions", [])
+        ]
+    raise KeyError(f"Unsupported asset: {symbol}")
@@ -0,0 +1,636 @@
+"""BIP-32 hierarchical deterministic keys on secp256k1, with BIP-44/84 paths.
+
+Pure Python and stdlib only. Fixed-base multiplications use a precomputed
+table of byte multiples of G, so a child step is one HMAC-SHA512 plus about
+32 point additions. ``KeyChain`` caches every interior node by path prefix,
+which makes deriving index ``i + 1`` after ``i`` a single child step.
+``GapLimitScanner`` derives address windows from public data only, so
+process-pool workers never see private keys.
+"""
+
+import hashlib
+import hmac
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# secp256k1 domain parameters
+P = 2**256 - 2**32 - 977
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+HARDENED = 0x80000000
+
+Point = Tuple[int, int]
+Path = Tuple[int, ...]
+
+# Purpose and coin type per asset. Monero uses its own key scheme (see monero.MoneroKeys).
+COIN_TYPES: Dict[str, int] = {"LTC": 2}
+BECH32_HRP: Dict[str, str] = {"LTC": "ltc"}
+P2PKH_VERSION: Dict[str, int] = {"LTC": 0x30}
+# Current "M" prefix first; "3" addresses from before the split are still valid.
+P2SH_VERSIONS: Dict[str, Tuple[int, ...]] = {"LTC": (0x32, 0x05)}
+
+XPRV_VERSION = 0x0488ADE4
+XPUB_VERSION = 0x0488B21E
+
+
+# Field and group arithmetic (Jacobian coordinates, a = 0)
+def _jacobian_double(point: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    x, y, z = point
+    if not y:
+        return (0, 0, 0)
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    nx = (m * m - 2 * s) % P
+    return nx, (m * (s - nx) - 8 * yy * yy) % P, 2 * y * z % P
+
+
+def _jacobian_add_affine(point: Tuple[int, int, int], other: Point) -> Tuple[int, int, int]:
+    x1, y1, z1 = point
+    if not z1:
+        return other[0], other[1], 1
+    zz = z1 * z1 % P
+    u2 = other[0] * zz % P
+    s2 = other[1] * zz * z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if not h:
+        return _jacobian_double(point) if not r else (0, 0, 0)
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    nx = (r * r - hhh - 2 * v) % P
+    return nx, (r * (v - nx) - y1 * hhh) % P, z1 * h % P
+
+
+def _to_affine(point: Tuple[int, int, int]) -> Optional[Point]:
+    x, y, z = point
+    if not z:
+        return None
+    inverse = pow(z, -1, P)
+    inverse_squared = inverse * inverse % P
+    return x * inverse_squared % P, y * inverse_squared * inverse % P
+
+
+_G_TABLE: List[List[Point]] = []
+
+
+def _g_table() -> List[List[Point]]:
+    """``table[w][b - 1] = b * 256**w * G`` for every byte ``b``, built once."""
+
+    if not _G_TABLE:
+        base: Point = G
+        for _ in range(32):
+            row: List[Point] = []
+            running = (0, 0, 0)
+            for _ in range(255):
+                running = _jacobian_add_affine(running, base)
+                row.append(_to_affine(running))  # type: ignore[arg-type]
+            _G_TABLE.append(row)
+            doubled = (base[0], base[1], 1)
+            for _ in range(8):
+                doubled = _jacobian_double(doubled)
+            base = _to_affine(doubled)  # type: ignore[assignment]
+    return _G_TABLE
+
+
+def point_mul_g(scalar: int) -> Point:
+    table = _g_table()
+    running = (0, 0, 0)
+    for window, byte in enumerate(scalar.to_bytes(32, "little")):
+        if byte:
+            running = _jacobian_add_affine(running, table[window][byte - 1])
+    point = _to_affine(running)
+    if point is None:
+        raise ValueError("Scalar is a multiple of the group order.")
+    return point
+
+
+def point_add(left: Point, right: Point) -> Point:
+    point = _to_affine(_jacobian_add_affine((left[0], left[1], 1), right))
+    if point is None:
+        raise ValueError("Point addition reached infinity.")
+    return point
+
+
+def compress(point: Point) -> bytes:
+    return bytes([2 + (point[1] & 1)]) + point[0].to_bytes(32, "big")
+
+
+def decompress(data: bytes) -> Point:
+    if len(data) != 33 or data[0] not in (2, 3):
+        raise ValueError("Expected a 33-byte compressed public key.")
+    x = int.from_bytes(data[1:], "big")
+    y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+    if (y * y - x * x * x - 7) % P:
+        raise ValueError("Public key is not on secp256k1.")
+    if y & 1 != data[0] & 1:
+        y = P - y
+    return x, y
+
+
+# Hashing and encodings
+def hash160(data: bytes) -> bytes:
+    digest = hashlib.sha256(data).digest()
+    try:
+        return hashlib.new("ripemd160", digest).digest()
+    except ValueError:  # OpenSSL 3 builds without the legacy provider
+        return _ripemd160(digest)
+
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_DIGITS = {char: digit for digit, char in enumerate(_BASE58)}
+
+
+def base58check_encode(payload: bytes) -> str:
+    data = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58[remainder] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + encoded
+
+
+def base58check_decode(text: str) -> Optional[bytes]:
+    """Payload of a Base58Check string, or ``None`` if it is malformed or the checksum fails."""
+
+    number = 0
+    digits = _BASE58_DIGITS
+    for char in text:
+        digit = digits.get(char)
+        if digit is None:
+            return None
+        number = number * 58 + digit
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    data = b"\0" * (len(text) - len(text.lstrip("1"))) + body
+    if len(data) < 5:
+        return None
+    payload, checksum = data[:-4], data[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        return None
+    return payload
+
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_CONST = 1
+BECH32M_CONST = 0x2BC830A3
+
+
+_BECH32_GENERATORS = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+
+
+def _generator_mix(top: int) -> int:
+    mixed = 0
+    for bit in range(5):
+        if (top >> bit) & 1:
+            mixed ^= _BECH32_GENERATORS[bit]
+    return mixed
+
+
+# XOR of the generators selected by each 5-bit value shifted out of the checksum
+_BECH32_TABLE = tuple(_generator_mix(top) for top in range(32))
+_BECH32_VALUES = str.maketrans({char: chr(value) for value, char in enumerate(BECH32_CHARSET)})
+_BECH32_BASE32 = str.maketrans(BECH32_CHARSET, "0123456789abcdefghijklmnopqrstuv")
+
+
+def bech32_polymod(values: Iterable[int], checksum: int = 1) -> int:
+    table = _BECH32_TABLE
+    for value in values:
+        checksum = (checksum & 0x1FFFFFF) << 5 ^ value ^ table[checksum >> 25]
+    return checksum
+
+
+def bech32_hrp_expand(hrp: str) -> List[int]:
+    return [ord(char) >> 5 for char in hrp] + [0] + [ord(char) & 31 for char in hrp]
+
+
+_HRP_CHECKSUMS: Dict[str, int] = {}
+
+
+def _hrp_checksum(hrp: str) -> int:
+    """Checksum state after the expanded human-readable part, computed once per prefix."""
+
+    checksum = _HRP_CHECKSUMS.get(hrp)
+    if checksum is None:
+        checksum = _HRP_CHECKSUMS[hrp] = bech32_polymod(bech32_hrp_expand(hrp))
+    return checksum
+
+
+def convert_bits(data: Iterable[int], from_bits: int, to_bits: int, pad: bool = True) -> Optional[List[int]]:
+    accumulator = 0
+    bits = 0
+    result = []
+    mask = (1 << to_bits) - 1
+    for value in data:
+        if value < 0 or value >> from_bits:
+            return None
+        accumulator = (accumulator << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((accumulator >> bits) & mask)
+    if pad:
+        if bits:
+            result.append((accumulator << (to_bits - bits)) & mask)
+    elif bits >= from_bits or (accumulator << (to_bits - bits)) & mask:
+        return None
+    return result
+
+
+def segwit_address(hrp: str, version: int, program: bytes) -> str:
+    data = [version] + (convert_bits(program, 8, 5) or [])
+    constant = BECH32_CONST if version == 0 else BECH32M_CONST
+    polymod = bech32_polymod(bech32_hrp_expand(hrp) + data + [0] * 6) ^ constant
+    checksum = [(polymod >> 5 * (5 - position)) & 31 for position in range(6)]
+    return hrp + "1" + "".join(BECH32_CHARSET[value] for value in data + checksum)
+
+
+def segwit_decode(hrp: str, address: str) -> Optional[Tuple[int, bytes]]:
+    """``(witness version, program)`` of a bech32/bech32m address, or ``None``."""
+
+    if address.lower() != address and address.upper() != address:
+        return None
+    address = address.lower()
+    separator = address.rfind("1")
+    if address[:separator] != hrp or separator + 7 > len(address) or len(address) > 90:
+        return None
+    part = address[separator + 1 :]
+    if not part.isascii():
+        return None
+    # Characters outside the charset pass through translate unchanged, i.e. above 31.
+    data = part.translate(_BECH32_VALUES).encode("ascii")
+    if max(data) > 31:
+        return None
+    version = data[0]
+    constant = bech32_polymod(data, _hrp_checksum(hrp))
+    if constant != (BECH32_CONST if version == 0 else BECH32M_CONST):
+        return None
+    # Regroup the 5-bit program into bytes in one big-integer step; the
+    # leftover bits must be fewer than five and zero, as in convert_bits.
+    groups = part[1:-6]
+    bits = 5 * len(groups)
+    padding = bits % 8
+    number = int(groups.translate(_BECH32_BASE32), 32) if groups else 0
+    if padding >= 5 or number & ((1 << padding) - 1):
+        return None
+    program = (number >> padding).to_bytes(bits // 8, "big")
+    if not 2 <= len(program) <= 40 or version > 16:
+        return None
+    if version == 0 and len(program) not in (20, 32):
+        return None
+    return version, program
+
+
+def p2wpkh_address(public_key: bytes, hrp: str) -> str:
+    return segwit_address(hrp, 0, hash160(public_key))
+
+
+def p2pkh_address(public_key: bytes, version: int) -> str:
+    return base58check_encode(bytes([version]) + hash160(public_key))
+
+
+# Extended keys
+class ExtendedKey:
+    """A BIP-32 node. ``private`` is ``None`` for public-only (neutered) keys."""
+
+    __slots__ = ("private", "public", "chain_code", "depth", "parent_fingerprint", "index", "_public_bytes")
+
+    def __init__(
+        self,
+        private: Optional[int],
+        public: Point,
+        chain_code: bytes,
+        depth: int = 0,
+        parent_fingerprint: bytes = b"\0\0\0\0",
+        index: int = 0,
+    ) -> None:
+        self.private = private
+        self.public = public
+        self.chain_code = chain_code
+        self.depth = depth
+        self.parent_fingerprint = parent_fingerprint
+        self.index = index
+        self._public_bytes: Optional[bytes] = None
+
+    @classmethod
+    def from_seed(cls, seed: bytes) -> "ExtendedKey":
+        digest = hmac.new(b"Bitcoin seed", bytes(seed), hashlib.sha512).digest()
+        return cls.from_master(digest[:32], digest[32:])
+
+    @classmethod
+    def from_master(cls, key: bytes, chain_code: bytes) -> "ExtendedKey":
+        private = int.from_bytes(bytes(key), "big")
+        if not 0 < private < N:
+            raise ValueError("Seed produced an invalid master key.")
+        return cls(private, point_mul_g(private), bytes(chain_code))
+
+    @property
+    def public_bytes(self) -> bytes:
+        if self._public_bytes is None:
+            self._public_bytes = compress(self.public)
+        return self._public_bytes
+
+    @property
+    def fingerprint(self) -> bytes:
+        return hash160(self.public_bytes)[:4]
+
+    def child(self, index: int) -> "ExtendedKey":
+        if index >= HARDENED:
+            if self.private is None:
+                raise ValueError("Cannot derive a hardened child from a public key.")
+            data = b"\0" + self.private.to_bytes(32, "big") + index.to_bytes(4, "big")
+        else:
+            data = self.public_bytes + index.to_bytes(4, "big")
+        digest = hmac.new(self.chain_code, data, hashlib.sha512).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        if tweak >= N:
+            raise ValueError("Invalid child; skip to the next index.")
+        if self.private is not None:
+            private = (self.private + tweak) % N
+            if not private:
+                raise ValueError("Invalid child; skip to the next index.")
+            public = point_mul_g(private)
+        else:
+            private = None
+            public = point_add(point_mul_g(tweak), self.public)
+        return ExtendedKey(private, public, digest[32:], self.depth + 1, self.fingerprint, index)
+
+    def neuter(self) -> "ExtendedKey":
+        return ExtendedKey(None, self.public, self.chain_code, self.depth, self.parent_fingerprint, self.index)
+
+    def serialize(self, private: bool = False) -> str:
+        """Base58Check ``xprv``/``xpub`` encoding (BIP-32 mainnet versions)."""
+
+        if private and self.private is None:
+            raise ValueError("Public-only key has no private serialization.")
+        key = b"\0" + self.private.to_bytes(32, "big") if private else self.public_bytes  # type: ignore[union-attr]
+        return base58check_encode(
+            (XPRV_VERSION if private else XPUB_VERSION).to_bytes(4, "big")
+            + bytes([self.depth])
+            + self.parent_fingerprint
+            + self.index.to_bytes(4, "big")
+            + self.chain_code
+            + key
+        )
+
+    def __repr__(self) -> str:
+        kind = "private" if self.private is not None else "public"
+        return f"ExtendedKey({kind}, depth={self.depth}, index={self.index})"
+
+
+def parse_path(path: str) -> Path:
+    parts = path.strip().split("/")
+    if not parts or parts[0] != "m":
+        raise ValueError(f"Derivation path must start with m: {path}")
+    indices = []
+    for part in parts[1:]:
+        hardened = part.endswith(("'", "h", "H"))
+        number = part[:-1] if hardened else part
+        if not number.isdigit() or int(number) >= HARDENED:
+            raise ValueError(f"Invalid derivation path component: {part}")
+        indices.append(int(number) + (HARDENED if hardened else 0))
+    return tuple(indices)
+
+
+def account_path(symbol: str, purpose: int = 84, account: int = 0) -> Path:
+    """``m/purpose'/coin_type'/account'`` for a BIP-32 asset."""
+
+    if symbol not in COIN_TYPES:
+        raise KeyError(f"{symbol} does not use BIP-32 derivation.")
+    return (purpose + HARDENED, COIN_TYPES[symbol] + HARDENED, account + HARDENED)
+
+
+def address_for(symbol: str, public_key: bytes, purpose: int = 84) -> str:
+    if purpose == 84:
+        return p2wpkh_address(public_key, BECH32_HRP[symbol])
+    if purpose == 44:
+        return p2pkh_address(public_key, P2PKH_VERSION[symbol])
+    raise ValueError(f"Unsupported purpose: {purpose}")
+
+
+class KeyChain:
+    """Derives keys from one master, caching interior nodes by path prefix.
+
+    Only interior nodes are cached, so a scan over thousands of address
+    indices keeps one cached parent rather than thousands of leaves.
+    ``max_nodes`` bounds the cache with least-recently-used eviction.
+    """
+
+    def __init__(self, master: ExtendedKey, max_nodes: int = 256) -> None:
+        self.master = master
+        self.max_nodes = max_nodes
+        self._nodes: "OrderedDict[Path, ExtendedKey]" = OrderedDict()
+        self.steps = 0  # child derivations performed, for diagnostics
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def derive(self, path: Sequence[int]) -> ExtendedKey:
+        path = tuple(path)
+        if not path:
+            return self.master
+        parent = self._interior(path[:-1])
+        self.steps += 1
+        return parent.child(path[-1])
+
+    def derive_path(self, path: str) -> ExtendedKey:
+        return self.derive(parse_path(path))
+
+    def clear(self) -> None:
+        self._nodes.clear()
+
+    def _interior(self, path: Path) -> ExtendedKey:
+        if not path:
+            return self.master
+        node = self._nodes.get(path)
+        if node is not None:
+            self._nodes.move_to_end(path)
+            return node
+        depth = len(path) - 1
+        while depth and path[:depth] not in self._nodes:
+            depth -= 1
+        node = self._nodes[path[:depth]] if depth else self.master
+        for position in range(depth, len(path)):
+            node = node.child(path[position])
+            self.steps += 1
+            self._nodes[path[: position + 1]] = node
+        while len(self._nodes) > self.max_nodes:
+            self._nodes.popitem(last=False)
+        return node
+
+
+# Gap-limit scanning
+def derive_public_window(
+    account_public: bytes,
+    chain_code: bytes,
+    change: int,
+    start: int,
+    count: int,
+    symbol: str = "LTC",
+    purpose: int = 84,
+) -> List[str]:
+    """Addresses ``start .. start + count - 1`` on one chain of an account xpub.
+
+    Module-level and public-data-only so it can run in a process pool.
+    """
+
+    account = ExtendedKey(None, decompress(account_public), chain_code)
+    branch = account.child(change)
+    return [address_for(symbol, branch.child(index).public_bytes, purpose) for index in range(start, start + count)]
+
+
+@dataclass
+class ScanResult:
+    """Used addresses found on one chain, and the first index after the last used one."""
+
+    used: Dict[int, str] = field(default_factory=dict)
+    next_index: int = 0
+    scanned: int = 0
+
+
+class GapLimitScanner:
+    """Find used addresses on an account chain, stopping after ``gap_limit`` unused.
+
+    Windows of ``window`` addresses are derived ahead in ``executor`` (a
+    spawn-context process pool by default, one worker per core), up to
+    ``prefetch`` windows in flight. Each finished window goes to ``is_used``
+    in one call, which should return the subset seen on chain, e.g. from one
+    batched node query, so derivation and node round trips overlap.
+    """
+
+    def __init__(
+        self,
+        account: ExtendedKey,
+        is_used: Callable[[Sequence[str]], Iterable[str]],
+        symbol: str = "LTC",
+        purpose: int = 84,
+        gap_limit: int = 20,
+        window: int = 500,
+        prefetch: int = 4,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.account_public = account.public_bytes
+        self.chain_code = account.chain_code
+        self.is_used = is_used
+        self.symbol = symbol
+        self.purpose = purpose
+        self.gap_limit = gap_limit
+        self.window = window
+        self.prefetch = prefetch
+        self._executor = executor
+
+    def scan(self, change: int = 0) -> ScanResult:
+        owns_executor = self._executor is None
+        if self._executor is None:
+            # Imported here: the process-pool machinery costs more to import than this whole module.
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_context
+
+            executor: Executor = ProcessPoolExecutor(mp_context=get_context("spawn"))
+        else:
+            executor = self._executor
+        result = ScanResult()
+        in_flight: Deque[Tuple[int, Future]] = deque()
+        next_start = 0
+        try:
+            while True:
+                while len(in_flight) < self.prefetch:
+                    future = executor.submit(
+                        derive_public_window,
+                        self.account_public,
+                        self.chain_code,
+                        change,
+                        next_start,
+                        self.window,
+                        self.symbol,
+                        self.purpose,
+                    )
+                    in_flight.append((next_start, future))
+                    next_start += self.window
+                start, future = in_flight.popleft()
+                addresses = future.result()
+                seen = set(self.is_used(addresses))
+                for offset, address in enumerate(addresses):
+                    if address in seen:
+                        result.used[start + offset] = address
+                        result.next_index = start + offset + 1
+                result.scanned = start + len(addresses)
+                if result.scanned - result.next_index >= self.gap_limit:
+                    return result
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            if owns_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+# RIPEMD-160 fallback for interpreters whose hashlib lacks it.
+_RMD_R1 = [
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12, 1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+]
+_RMD_R2 = [
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12, 6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13, 8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+]
+_RMD_S1 = [
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8, 7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5, 11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+]
+_RMD_S2 = [
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6, 9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5, 15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+]
+_RMD_K1 = (0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E)
+_RMD_K2 = (0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000)
+
+
+def _rmd_f(round_: int, x: int, y: int, z: int) -> int:
+    if round_ == 0:
+        return x ^ y ^ z
+    if round_ == 1:
+        return (x & y) | (~x & z)
+    if round_ == 2:
+        return (x | ~y) ^ z
+    if round_ == 3:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+
+def _rol(value: int, shift: int) -> int:
+    value &= 0xFFFFFFFF
+    return ((value << shift) | (value >> (32 - shift))) & 0xFFFFFFFF
+
+
+def _ripemd160(data: bytes) -> bytes:
+    state = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    message = data + b"\x80" + b"\0" * ((55 - len(data)) % 64) + (8 * len(data)).to_bytes(8, "little")
+    for block in range(0, len(message), 64):
+        words = [int.from_bytes(message[block + 4 * i : block + 4 * i + 4], "little") for i in range(16)]
+        a1, b1, c1, d1, e1 = state
+        a2, b2, c2, d2, e2 = state
+        for step in range(80):
+            round_ = step // 16
+            t = _rol(a1 + _rmd_f(round_, b1, c1, d1) + words[_RMD_R1[step]] + _RMD_K1[round_], _RMD_S1[step]) + e1
+            a1, e1, d1, c1, b1 = e1, d1, _rol(c1, 10), b1, t & 0xFFFFFFFF
+            t = _rol(a2 + _rmd_f(4 - round_, b2, c2, d2) + words[_RMD_R2[step]] + _RMD_K2[round_], _RMD_S2[step]) + e2
+            a2, e2, d2, c2, b2 = e2, d2, _rol(c2, 10), b2, t & 0xFFFFFFFF
+        state = [
+            (state[1] + c1 + d2) & 0xFFFFFFFF,
+            (state[2] + d1 + e2) & 0xFFFFFFFF,
+            (state[3] + e1 + a2) & 0xFFFFFFFF,
+            (state[4] + a1 + b2) & 0xFFFFFFFF,
+            (state[0] + b1 + c2) & 0xFFFFFFFF,
+        ]
+    return b"".join(word.to_bytes(4, "little") for word in state)
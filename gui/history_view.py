@@ -0,0 +1,196 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, Optional
+
+from ledger import format_amount
+from pending import PENDING_STATES, HistoryPage
+
+PageRequest = Callable[[Dict[str, Any], Callable[[HistoryPage], None]], None]
+
+_COLUMNS = (
+    ("id", "ID", 90, "created"),
+    ("state", "State", 80, "state"),
+    ("amount", "Amount", 110, "amount"),
+    ("fee", "Fee", 90, "fee"),
+    ("address", "Address", 220, "address"),
+    ("note", "Note", 140, None),
+)
+_ALL_STATES = "all"
+
+
+class HistoryCursor:
+    """Which window of history a view shows and which query it is waiting on.
+
+    Kept apart from the widgets (as :class:`activity_log.ActivityLog` is for
+    the log) so paging can be driven without a display. Every
+    :meth:`request` supersedes the previous one, and :meth:`accept` takes a
+    page only if it answers the latest request.
+    """
+
+    def __init__(self, rows: int = 10) -> None:
+        self.rows = rows
+        self.offset = 0
+        self.total = 0
+        self.sort = "created"
+        self.descending = True
+        self.state: Optional[str] = None
+        self.query = ""
+        self._requested: Optional[Dict[str, Any]] = None
+
+    def request(self, offset: int) -> Dict[str, Any]:
+        offset = max(0, min(offset, self.total - self.rows)) if self.total else max(0, offset)
+        request = {
+            "offset": offset,
+            "limit": self.rows,
+            "sort": self.sort,
+            "descending": self.descending,
+            "state": self.state,
+            "query": self.query,
+        }
+        self._requested = request
+        return request
+
+    def accept(self, request: Dict[str, Any], page: HistoryPage) -> bool:
+        if request is not self._requested:
+            return False
+        self.offset, self.total = page.offset, page.total
+        return True
+
+    def sort_by(self, key: str) -> None:
+        if key == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort, self.descending = key, key in ("created", "amount", "fee")
+
+    def scrolled(self, action: str, amount: str, unit: str = "") -> Optional[int]:
+        """Target offset for a scrollbar command, or ``None`` for one that does not move."""
+
+        if action == "moveto":
+            return round(float(amount) * self.total)
+        if action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            return self.offset + int(amount) * step
+        return None
+
+
+class HistoryView(ttk.Frame):
+    """Virtualized transaction history backed by the engine's paged query.
+
+    The tree only ever holds ``rows`` items. Its scrollbar is driven by hand
+    from the page's offset and total, and every scroll, sort or filter change
+    asks ``request_page`` for the matching window. The caller decides how
+    the page is fetched (the GUI goes through its worker) and passes the
+    result to the callback it was given. Replies for anything but the latest
+    query are ignored, so fast scrolling never paints a stale window.
+    """
+
+    def __init__(self, parent: Any, request_page: PageRequest, rows: int = 10, **kwargs: Any) -> None:
+        super().__init__(parent, **kwargs)
+        self.request_page = request_page
+        self.rows = rows
+        self.cursor = HistoryCursor(rows)
+        self.state_filter = tk.StringVar(value=_ALL_STATES)
+        self.query = tk.StringVar()
+        self._query_job: Optional[str] = None
+
+        filters = ttk.Frame(self)
+        filters.pack(fill="x", pady=(0, 6))
+        ttk.Label(filters, text="State", style="Subtitle.TLabel").pack(side="left")
+        state_box = ttk.Combobox(
+            filters,
+            textvariable=self.state_filter,
+            values=(_ALL_STATES,) + PENDING_STATES,
+            state="readonly",
+            width=10,
+        )
+        state_box.pack(side="left", padx=(6, 12))
+        state_box.bind("<<ComboboxSelected>>", lambda _: self.reset())
+        ttk.Label(filters, text="Search", style="Subtitle.TLabel").pack(side="left")
+        ttk.Entry(filters, textvariable=self.query).pack(side="left", fill="x", expand=True, padx=(6, 0))
+        self.query.trace_add("write", lambda *_: self._schedule_query())
+        self.count_label = ttk.Label(filters, text="0 transactions", style="Subtitle.TLabel")
+        self.count_label.pack(side="right", padx=(12, 0))
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(
+            body, columns=[column[0] for column in _COLUMNS], show="headings", height=rows
+        )
+        for name, heading, width, sort_key in _COLUMNS:
+            command = (lambda key=sort_key: self._sort_by(key)) if sort_key else ""
+            self.tree.heading(name, text=heading, command=command)
+            self.tree.column(name, width=width, stretch=name in ("address", "note"))
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        self.tree.bind("<Prior>", lambda _: self.scroll_to(self.cursor.offset - self.rows))
+        self.tree.bind("<Next>", lambda _: self.scroll_to(self.cursor.offset + self.rows))
+
+    def reset(self) -> None:
+        """Jump back to the top, e.g. after the account or filters change."""
+
+        self.scroll_to(0)
+
+    def reload(self) -> None:
+        self.scroll_to(self.cursor.offset)
+
+    def scroll_to(self, offset: int) -> None:
+        state = self.state_filter.get()
+        self.cursor.state = None if state == _ALL_STATES else state
+        self.cursor.query = self.query.get()
+        request = self.cursor.request(offset)
+        self.request_page(request, lambda page: self._show(request, page))
+
+    # Event handlers
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "") -> None:
+        offset = self.cursor.scrolled(action, amount, unit)
+        if offset is not None:
+            self.scroll_to(offset)
+
+    def _on_wheel(self, event: Any) -> str:
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.cursor.offset - 3)
+        else:
+            self.scroll_to(self.cursor.offset + 3)
+        return "break"
+
+    def _sort_by(self, key: str) -> None:
+        self.cursor.sort_by(key)
+        self.reset()
+
+    def _schedule_query(self) -> None:
+        # Wait for a pause in typing before re-running the filter.
+        if self._query_job is not None:
+            self.after_cancel(self._query_job)
+        self._query_job = self.after(200, self._run_query)
+
+    def _run_query(self) -> None:
+        self._query_job = None
+        self.reset()
+
+    def _show(self, request: Dict[str, Any], page: HistoryPage) -> None:
+        if not self.cursor.accept(request, page):
+            return
+        self.tree.delete(*self.tree.get_children())
+        for record in page.records:
+            self.tree.insert(
+                "",
+                "end",
+                iid=record.tx_id,
+                values=(
+                    record.tx_id,
+                    record.state,
+                    format_amount(record.symbol, record.amount),
+                    format_amount(record.symbol, record.fee),
+                    record.address,
+                    record.note,
+                ),
+            )
+        if page.total:
+            self.scrollbar.set(page.offset / page.total, (page.offset + len(page.records)) / page.total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        noun = "transaction" if page.total == 1 else "transactions"
+        self.count_label.config(text=f"{page.total:,} {noun}")
@@ -0,0 +1,293 @@
+import hashlib
+import hmac
+import json
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+JournalEntry = Tuple[str, Dict[str, Any]]
+
+_SNAPSHOT_MAGIC = b"KWSNAP01"
+_SNAPSHOT_PREFIX = struct.Struct(">8sQ")  # magic, last seq
+_SNAPSHOT_HEADER = struct.Struct(">8sQ16s32s")  # prefix, nonce, tag
+_RECORD_PREFIX = struct.Struct(">IQ")  # ciphertext length, seq
+_RECORD_HEADER = struct.Struct(">IQ16s")  # prefix, nonce
+_TAG_SIZE = 32
+_SALT_FILE = "salt"
+_SNAPSHOT_FILE = "snapshot.kws"
+
+
+def derive_storage_key(passphrase: str, salt: bytes) -> bytes:
+    """Stretch a passphrase into the 32-byte storage key with scrypt."""
+
+    return hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, n=2**14, r=8, p=1, dklen=32)
+
+
+class JournalStore:
+    """Encrypted, integrity-checked, append-only journal with compacted snapshots.
+
+    Every record and snapshot is sealed with a SHAKE-256 keystream and a keyed
+    BLAKE2b tag over its header, nonce and ciphertext, so tampering or a wrong
+    key is detected before anything is replayed. Only the Python standard
+    library is used.
+
+    Appends are buffered and made durable in groups: one flush and fsync covers
+    up to ``group_size`` records or ``group_interval`` seconds of writes,
+    whichever comes first, and :meth:`commit` forces the group out. A
+    background flusher commits a group once its interval has passed, so the
+    tail of a burst reaches disk even when no further record arrives. After
+    ``snapshot_every`` records a snapshot is due; writing one starts a fresh
+    journal segment and removes the segments it covers, so cold start costs
+    one snapshot read plus a short tail replay. The store is safe to share
+    between threads.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        key: bytes,
+        group_size: int = 64,
+        group_interval: float = 0.05,
+        snapshot_every: int = 1000,
+    ) -> None:
+        if len(key) != 32:
+            raise ValueError("Storage key must be 32 bytes.")
+        self.directory = directory
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_every = snapshot_every
+        self._enc_key = hashlib.blake2b(b"kernel-wallet/journal/enc", key=key).digest()
+        self._mac_key = hashlib.blake2b(b"kernel-wallet/journal/mac", key=key).digest()
+        self._next_seq = 1
+        self._snapshot_seq = 0
+        self._uncommitted = 0
+        self._group_started = 0.0
+        self._segment = None
+        self._lock = threading.Condition(threading.RLock())
+        self._flusher: Optional[threading.Thread] = None
+        self._closing = False
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def open(cls, directory: str, passphrase: str, **options: Any) -> "JournalStore":
+        """Open or create a store, deriving its key from ``passphrase``."""
+
+        os.makedirs(directory, exist_ok=True)
+        salt_path = os.path.join(directory, _SALT_FILE)
+        if os.path.exists(salt_path):
+            with open(salt_path, "rb") as handle:
+                salt = handle.read()
+        else:
+            salt = secrets.token_bytes(16)
+            with open(salt_path, "wb") as handle:
+                handle.write(salt)
+                handle.flush()
+                os.fsync(handle.fileno())
+        return cls(directory, derive_storage_key(passphrase, salt), **options)
+
+    # Reading
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[JournalEntry]]:
+        """Return the latest snapshot state (if any) and the entries written after it.
+
+        Call once before appending so sequence numbering continues from disk.
+        """
+
+        state = self._read_snapshot()
+        entries: List[JournalEntry] = []
+        for name in self._segments():
+            entries.extend(self._read_segment(os.path.join(self.directory, name)))
+        return state, entries
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, _SNAPSHOT_FILE)
+        if not os.path.exists(path) or os.path.getsize(path) < _SNAPSHOT_HEADER.size:
+            return None
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, seq, nonce, tag = _SNAPSHOT_HEADER.unpack_from(view, 0)
+            if magic != _SNAPSHOT_MAGIC:
+                raise ValueError("Snapshot file is not a Kernel Wallet snapshot.")
+            header = bytes(view[: _SNAPSHOT_PREFIX.size])
+            with memoryview(view) as whole, whole[_SNAPSHOT_HEADER.size :] as body:
+                plaintext = self._open_sealed(header, nonce, body, tag)
+        self._snapshot_seq = seq
+        self._next_seq = max(self._next_seq, seq + 1)
+        return json.loads(plaintext)
+
+    def _read_segment(self, path: str) -> List[JournalEntry]:
+        entries: List[JournalEntry] = []
+        size = os.path.getsize(path)
+        if size == 0:
+            return entries
+        good_end = 0
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            with memoryview(view) as data:
+                offset = 0
+                while offset + _RECORD_HEADER.size <= size:
+                    length, seq, nonce = _RECORD_HEADER.unpack_from(data, offset)
+                    body_start = offset + _RECORD_HEADER.size
+                    body_end = body_start + length
+                    if body_end + _TAG_SIZE > size:
+                        break
+                    header = bytes(data[offset : offset + _RECORD_PREFIX.size])
+                    tag = bytes(data[body_end : body_end + _TAG_SIZE])
+                    with data[body_start:body_end] as body:
+                        plaintext = self._open_sealed(header, nonce, body, tag)
+                    offset = good_end = body_end + _TAG_SIZE
+                    self._next_seq = max(self._next_seq, seq + 1)
+                    if seq <= self._snapshot_seq:
+                        continue
+                    op, payload = json.loads(plaintext)
+                    entries.append((op, payload))
+        if good_end < size:
+            # A torn write at the tail never reached fsync; drop it so new
+            # records are not appended after garbage.
+            with open(path, "r+b") as handle:
+                handle.truncate(good_end)
+        return entries
+
+    # Writing
+    def append(self, op: str, payload: Dict[str, Any]) -> int:
+        plaintext = json.dumps([op, payload], separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            header = _RECORD_PREFIX.pack(len(plaintext), seq)
+            nonce, ciphertext, tag = self._seal(header, plaintext)
+
+            segment = self._open_segment()
+            segment.write(header + nonce + ciphertext + tag)
+            if not self._uncommitted:
+                self._group_started = time.monotonic()
+                self._start_flusher()
+                self._lock.notify()
+            self._uncommitted += 1
+            if (
+                self._uncommitted >= self.group_size
+                or time.monotonic() - self._group_started >= self.group_interval
+            ):
+                self.commit()
+        return seq
+
+    def commit(self) -> None:
+        """Flush and fsync every buffered record as one group."""
+
+        with self._lock:
+            if self._segment is None or not self._uncommitted:
+                return
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._uncommitted = 0
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._closing = False
+            self._flusher = threading.Thread(target=self._flush_loop, name="journal-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        with self._lock:
+            while not self._closing:
+                if not self._uncommitted:
+                    self._lock.wait()
+                    continue
+                remaining = self._group_started + self.group_interval - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                else:
+                    self.commit()
+
+    @property
+    def snapshot_due(self) -> bool:
+        return self._next_seq - 1 - self._snapshot_seq >= self.snapshot_every
+
+    def write_snapshot(self, state: Dict[str, Any]) -> None:
+        """Persist ``state`` as of the last appended record and compact the journal."""
+
+        with self._lock:
+            self._write_snapshot(state)
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        self.commit()
+        seq = self._next_seq - 1
+        plaintext = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        header = _SNAPSHOT_PREFIX.pack(_SNAPSHOT_MAGIC, seq)
+        nonce, ciphertext, tag = self._seal(header, plaintext)
+
+        path = os.path.join(self.directory, _SNAPSHOT_FILE)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(header + nonce + tag + ciphertext)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        self._snapshot_seq = seq
+
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        for name in self._segments():
+            os.remove(os.path.join(self.directory, name))
+        self._fsync_directory()
+
+    def close(self) -> None:
+        with self._lock:
+            self.commit()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            self._closing = True
+            self._lock.notify()
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+
+    # Helpers
+    def _open_segment(self):
+        if self._segment is None:
+            name = f"journal-{self._next_seq - 1:016d}.log"
+            self._segment = open(os.path.join(self.directory, name), "ab")
+        return self._segment
+
+    def _segments(self) -> List[str]:
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith("journal-") and name.endswith(".log")
+        )
+
+    def _fsync_directory(self) -> None:
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _keystream_xor(self, nonce: bytes, data: bytes) -> bytes:
+        if not data:
+            return b""
+        stream = hashlib.shake_256(self._enc_key + nonce).digest(len(data))
+        mixed = int.from_bytes(data, "big") ^ int.from_bytes(stream, "big")
+        return mixed.to_bytes(len(data), "big")
+
+    def _tag(self, header: bytes, nonce: bytes, ciphertext: bytes) -> bytes:
+        mac = hashlib.blake2b(key=self._mac_key, digest_size=_TAG_SIZE)
+        mac.update(header)
+        mac.update(nonce)
+        mac.update(ciphertext)
+        return mac.digest()
+
+    def _seal(self, header: bytes, plaintext: bytes) -> Tuple[bytes, bytes, bytes]:
+        nonce = secrets.token_bytes(16)
+        ciphertext = self._keystream_xor(nonce, plaintext)
+        return nonce, ciphertext, self._tag(header, nonce, ciphertext)
+
+    def _open_sealed(self, header: bytes, nonce: bytes, ciphertext: memoryview, tag: bytes) -> bytes:
+        if not hmac.compare_digest(self._tag(header, nonce, ciphertext), tag):
+            raise ValueError("Storage integrity check failed; wrong passphrase or tampered data.")
+        return self._keystream_xor(nonce, bytes(ciphertext))
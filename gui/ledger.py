@@ -0,0 +1,146 @@
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from typing import Dict, List, Sequence, Union
+
+# Smallest on-chain unit per asset: litoshi (1e-8 LTC) and piconero (1e-12 XMR).
+ASSET_DECIMALS: Dict[str, int] = {
+    "LTC": 8,
+    "XMR": 12,
+}
+
+Amount = Union[int, float, str, Decimal]
+MAX_UNITS = 2**64 - 1  # a ledger slot is an unsigned 64-bit integer
+
+
+def decimals_for(symbol: str) -> int:
+    if symbol not in ASSET_DECIMALS:
+        raise KeyError(f"Unsupported asset: {symbol}")
+    return ASSET_DECIMALS[symbol]
+
+
+def to_atomic(symbol: str, amount: Amount) -> int:
+    """Convert a coin-denominated amount to integer atomic units.
+
+    Floats go through their shortest ``repr`` so ``0.1`` becomes exactly
+    10000000 litoshi instead of inheriting binary rounding error. Sub-unit
+    remainders are rounded half-to-even. Anything that is not a finite
+    number raises :class:`ValueError`.
+    """
+
+    if isinstance(amount, float):
+        amount = repr(amount)
+    try:
+        value = Decimal(amount)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"{amount!r} is not a number.") from None
+    if not value.is_finite():
+        raise ValueError(f"{amount!r} is not a finite amount.")
+    scaled = value.scaleb(decimals_for(symbol))
+    return int(scaled.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_atomic(symbol: str, units: int) -> Decimal:
+    return Decimal(units).scaleb(-decimals_for(symbol))
+
+
+def format_amount(symbol: str, units: int) -> str:
+    return f"{from_atomic(symbol, units):.{decimals_for(symbol)}f}"
+
+
+class Ledger:
+    """Exact balances held as unsigned 64-bit atomic units.
+
+    Each asset owns one compact ``array('Q')`` with a slot per sub-account, so
+    thousands of sub-accounts cost eight bytes each and updates happen in place.
+    Index 0 is the primary account the GUI displays. Debits never drive a slot
+    below zero; multi-row updates are checked in full before any slot changes.
+    """
+
+    def __init__(self) -> None:
+        self._balances: Dict[str, array] = {}
+
+    def open(self, symbol: str, sub_accounts: int = 1) -> None:
+        decimals_for(symbol)
+        if sub_accounts < 1:
+            raise ValueError("A ledger needs at least one sub-account.")
+        if symbol not in self._balances:
+            self._balances[symbol] = array("Q", bytes(8 * sub_accounts))
+
+    def add_sub_accounts(self, symbol: str, count: int) -> int:
+        """Append ``count`` zero-balance sub-accounts and return the first new index."""
+
+        slots = self._slots(symbol)
+        first = len(slots)
+        slots.frombytes(bytes(8 * count))
+        return first
+
+    def sub_account_count(self, symbol: str) -> int:
+        return len(self._slots(symbol))
+
+    def balance(self, symbol: str, index: int = 0) -> int:
+        return self._slots(symbol)[index]
+
+    def total(self, symbol: str) -> int:
+        return sum(self._slots(symbol))
+
+    def balances(self, symbol: str) -> memoryview:
+        """Read-only view over every sub-account balance without copying."""
+
+        return memoryview(self._slots(symbol)).toreadonly()
+
+    def credit(self, symbol: str, units: int, index: int = 0) -> int:
+        if units < 0:
+            raise ValueError("Credit amount cannot be negative.")
+        slots = self._slots(symbol)
+        if slots[index] + units > MAX_UNITS:
+            raise ValueError("Credit would overflow the 64-bit balance.")
+        slots[index] += units
+        return slots[index]
+
+    def debit(self, symbol: str, units: int, index: int = 0) -> int:
+        if units < 0:
+            raise ValueError("Debit amount cannot be negative.")
+        slots = self._slots(symbol)
+        if units > slots[index]:
+            raise ValueError("Insufficient balance for amount plus fee.")
+        slots[index] -= units
+        return slots[index]
+
+    def load(self, symbol: str, balances: Sequence[int]) -> None:
+        """Replace every sub-account balance of ``symbol`` at once."""
+
+        decimals_for(symbol)
+        self._balances[symbol] = array("Q", balances)
+
+    def set_balance(self, symbol: str, units: int, index: int = 0) -> None:
+        self._slots(symbol)[index] = units
+
+    def apply(self, symbol: str, indices: Sequence[int], deltas: Sequence[int]) -> None:
+        """Apply signed deltas to many sub-accounts as one all-or-nothing update."""
+
+        if len(indices) != len(deltas):
+            raise ValueError("Ledger indices and deltas must have the same length.")
+        slots = self._slots(symbol)
+        net: Dict[int, int] = {}
+        for index, delta in zip(indices, deltas):
+            net[index] = net.get(index, 0) + delta
+        for index, delta in net.items():
+            if slots[index] + delta < 0:
+                raise ValueError(f"Sub-account {index} would be overdrawn.")
+            if slots[index] + delta > MAX_UNITS:
+                raise ValueError(f"Sub-account {index} would overflow the 64-bit balance.")
+        for index, delta in net.items():
+            slots[index] += delta
+
+    def reconcile(self, symbol: str, expected: Sequence[int]) -> List[int]:
+        """Return sub-account indices whose balance differs from ``expected``."""
+
+        slots = self._slots(symbol)
+        if len(expected) != len(slots):
+            raise ValueError("Expected balances must cover every sub-account.")
+        return [index for index, (held, want) in enumerate(zip(slots, expected)) if held != want]
+
+    def _slots(self, symbol: str) -> array:
+        if symbol not in self._balances:
+            raise KeyError(f"Unsupported asset: {symbol}")
+        return self._balances[symbol]
@@ -0,0 +1,423 @@
+"""Litecoin sync over BIP-157/158 compact block filters.
+
+The pipeline has three asyncio stages joined by bounded queues:
+
+1. fetch: block hashes and basic filters, requested a window at a time so
+   the node client can batch them;
+2. match: verify the filter-header chain and test each filter against our
+   scripts; only on a hit is the full block requested, and that request is
+   left in flight while matching continues;
+3. apply: walk hit blocks in height order, credit outputs paying us and
+   debit spends of our coins, confirm our own sends (moving their change
+   onto the real output), then checkpoint.
+
+Queues cap how far fetching can run ahead of applying, so memory stays
+bounded on a long catch-up. Progress is checkpointed to a small JSON file,
+written atomically after the engine's journal is flushed, so a restart
+resumes from the last applied block instead of rescanning. The checkpoint
+also lists the coins each of the last ``reorg_depth`` hit blocks received and
+spent, so blocks that a reorg disconnects are rolled back before re-syncing.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ledger import to_atomic
+
+# BIP-158 basic filter parameters
+FILTER_P = 19
+FILTER_M = 784_931
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_DONE = object()
+
+
+# SipHash-2-4
+def _rotl(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK64
+
+
+def siphash(k0: int, k1: int, data: bytes) -> int:
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    def rounds(count: int) -> None:
+        nonlocal v0, v1, v2, v3
+        for _ in range(count):
+            v0 = (v0 + v1) & _MASK64
+            v1 = _rotl(v1, 13) ^ v0
+            v0 = _rotl(v0, 32)
+            v2 = (v2 + v3) & _MASK64
+            v3 = _rotl(v3, 16) ^ v2
+            v0 = (v0 + v3) & _MASK64
+            v3 = _rotl(v3, 21) ^ v0
+            v2 = (v2 + v1) & _MASK64
+            v1 = _rotl(v1, 17) ^ v2
+            v2 = _rotl(v2, 32)
+
+    tail = len(data) & 7
+    for offset in range(0, len(data) - tail, 8):
+        word = int.from_bytes(data[offset : offset + 8], "little")
+        v3 ^= word
+        rounds(2)
+        v0 ^= word
+    last = (len(data) & 0xFF) << 56 | int.from_bytes(data[len(data) - tail :], "little")
+    v3 ^= last
+    rounds(2)
+    v0 ^= last
+    v2 ^= 0xFF
+    rounds(4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+# Golomb-coded sets
+def _filter_key(block_hash: str) -> Tuple[int, int]:
+    key = bytes.fromhex(block_hash)[::-1][:16]
+    return int.from_bytes(key[:8], "little"), int.from_bytes(key[8:], "little")
+
+
+def _hashed(block_hash: str, items: Iterable[bytes], count: int) -> List[int]:
+    k0, k1 = _filter_key(block_hash)
+    bound = count * FILTER_M
+    return sorted((siphash(k0, k1, item) * bound) >> 64 for item in items)
+
+
+def _read_compact_size(data: bytes) -> Tuple[int, int]:
+    first = data[0]
+    if first < 0xFD:
+        return first, 1
+    width = {0xFD: 2, 0xFE: 4, 0xFF: 8}[first]
+    return int.from_bytes(data[1 : 1 + width], "little"), 1 + width
+
+
+def _compact_size(value: int) -> bytes:
+    if value < 0xFD:
+        return bytes([value])
+    if value <= 0xFFFF:
+        return b"\xfd" + value.to_bytes(2, "little")
+    if value <= 0xFFFFFFFF:
+        return b"\xfe" + value.to_bytes(4, "little")
+    return b"\xff" + value.to_bytes(8, "little")
+
+
+def build_filter(block_hash: str, scripts: Iterable[bytes]) -> bytes:
+    """Encode a BIP-158 basic filter; used for fixtures and self-checks."""
+
+    elements = {script for script in scripts if script and script[0] != 0x6A}
+    values = _hashed(block_hash, elements, len(elements))
+    bits = 0
+    length = 0
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        quotient = delta >> FILTER_P
+        bits = (bits << (quotient + 1)) | (((1 << quotient) - 1) << 1)
+        bits = (bits << FILTER_P) | (delta & ((1 << FILTER_P) - 1))
+        length += quotient + 1 + FILTER_P
+    padding = -length % 8
+    body = (bits << padding).to_bytes((length + padding) // 8, "big") if length else b""
+    return _compact_size(len(elements)) + body
+
+
+def filter_matches(block_hash: str, filter_bytes: bytes, scripts: Sequence[bytes]) -> bool:
+    """True if any of ``scripts`` may be in the filter (false positives ~1/M)."""
+
+    count, offset = _read_compact_size(filter_bytes)
+    if not count or not scripts:
+        return False
+    targets = _hashed(block_hash, scripts, count)
+    stream = int.from_bytes(filter_bytes[offset:], "big")
+    remaining = (len(filter_bytes) - offset) * 8
+    value = 0
+    position = 0
+    for _ in range(count):
+        # Unary quotient: count leading ones from the current position.
+        quotient = 0
+        while (stream >> (remaining - 1)) & 1:
+            quotient += 1
+            remaining -= 1
+        remaining -= 1 + FILTER_P
+        value += (quotient << FILTER_P) | ((stream >> remaining) & ((1 << FILTER_P) - 1))
+        while targets[position] < value:
+            position += 1
+            if position == len(targets):
+                return False
+        if targets[position] == value:
+            return True
+    return False
+
+
+def filter_header(filter_bytes: bytes, previous_header: bytes) -> bytes:
+    """BIP-157 filter header, internal byte order."""
+
+    filter_hash = hashlib.sha256(hashlib.sha256(filter_bytes).digest()).digest()
+    return hashlib.sha256(hashlib.sha256(filter_hash + previous_header).digest()).digest()
+
+
+# Checkpoints
+@dataclass
+class SyncCheckpoint:
+    """Last fully applied block and its filter header (display hex).
+
+    ``applied`` holds ``[height, received, spent]`` for recent hit blocks:
+    the ``[txid, vout]`` coins credited and the ``[txid, vout, value, path]``
+    coins debited, newest last. ``path`` is ``None`` when the engine had none.
+    """
+
+    height: int
+    block_hash: str
+    filter_header: str
+    applied: List[List[Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SyncCheckpoint"]:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                return cls(**json.load(handle))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str) -> None:
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(asdict(self), handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+
+@dataclass
+class SyncReport:
+    start_height: int
+    tip_height: int
+    filters_checked: int = 0
+    blocks_fetched: int = 0
+    outputs_received: int = 0
+    outputs_spent: int = 0
+    sends_confirmed: int = 0
+    blocks_rolled_back: int = 0
+
+
+class FilterSync:
+    """Sync the engine's LTC coins from compact filters served by our own node.
+
+    ``client_factory`` returns a client with async ``call(method, params)``
+    and ``close()``, i.e. a :class:`NodeClient` or :class:`NodeRouter`; a
+    fresh one is made per run so each run can own its event loop. It
+    defaults to the engine's router over the configured LTC nodes.
+    ``birthday`` is the first height that can hold wallet activity.
+    """
+
+    symbol = "LTC"
+
+    def __init__(
+        self,
+        engine: Any,
+        client_factory: Optional[Callable[[], Any]],
+        checkpoint_path: str,
+        birthday: int = 0,
+        window: int = 100,
+        queue_size: int = 500,
+        checkpoint_every: int = 1_000,
+        reorg_depth: int = 6,
+    ) -> None:
+        self.engine = engine
+        self.client_factory = client_factory or (lambda: engine.node_router(self.symbol))
+        self.checkpoint_path = checkpoint_path
+        self.birthday = birthday
+        self.window = window
+        self.queue_size = queue_size
+        self.checkpoint_every = checkpoint_every
+        self.reorg_depth = reorg_depth
+
+    def run_blocking(self) -> SyncReport:
+        """Run one catch-up on a private event loop, e.g. from a worker thread."""
+
+        return asyncio.run(self.run())
+
+    async def run(self) -> SyncReport:
+        client = self.client_factory()
+        try:
+            return await self._run(client)
+        finally:
+            await client.close()
+
+    async def _run(self, client: Any) -> SyncReport:
+        checkpoint, rolled_back = await self._resume_point(client)
+        tip = await client.call("getblockcount", [])
+        report = SyncReport(start_height=checkpoint.height + 1, tip_height=tip, blocks_rolled_back=rolled_back)
+        if tip <= checkpoint.height:
+            return report
+
+        scripts = self.engine.address_index.keys(self.symbol)
+        filters: "asyncio.Queue[Any]" = asyncio.Queue(self.queue_size)
+        blocks: "asyncio.Queue[Any]" = asyncio.Queue(self.queue_size)
+        stages = [
+            asyncio.ensure_future(self._fetch(client, checkpoint.height + 1, tip, filters)),
+            asyncio.ensure_future(self._match(client, checkpoint, scripts, filters, blocks, report)),
+            asyncio.ensure_future(self._apply(checkpoint, blocks, report)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            for stage in stages:
+                stage.cancel()
+        return report
+
+    async def _resume_point(self, client: Any) -> Tuple[SyncCheckpoint, int]:
+        """Where to continue, and how many applied blocks a reorg rolled back."""
+
+        checkpoint = SyncCheckpoint.load(self.checkpoint_path)
+        applied: List[List[Any]] = []
+        rolled_back = 0
+        if checkpoint is not None:
+            current = await client.call("getblockhash", [checkpoint.height])
+            if current == checkpoint.block_hash:
+                return checkpoint, 0
+            # The checkpointed block was reorganized away; undo what recent
+            # blocks applied, back off and re-verify.
+            height = max(self.birthday - 1, checkpoint.height - self.reorg_depth)
+            applied = [entry for entry in checkpoint.applied if entry[0] <= height]
+            disconnected = [entry for entry in checkpoint.applied if entry[0] > height]
+            for entry in reversed(disconnected):
+                self._roll_back(entry)
+            rolled_back = len(disconnected)
+        else:
+            height = self.birthday - 1
+        if height < 0:
+            anchored = SyncCheckpoint(-1, "", "00" * 32, applied)
+        else:
+            block_hash = await client.call("getblockhash", [height])
+            anchor = await client.call("getblockfilter", [block_hash, "basic"])
+            anchored = SyncCheckpoint(height, block_hash, anchor["header"], applied)
+        if rolled_back:
+            # Persist the rollback so an interrupted run does not repeat it.
+            self._save(anchored)
+        return anchored, rolled_back
+
+    def _roll_back(self, entry: List[Any]) -> None:
+        # Confirmed sends stay confirmed: the same transaction is normally
+        # mined again, and its change output keeps its outpoint.
+        _, received, spent = entry
+        utxos = self.engine.get_utxos(self.symbol)
+        for txid, vout in reversed(received):
+            if (txid, vout) in utxos:
+                self.engine.spend_utxo(self.symbol, txid, vout)
+        for txid, vout, value, *path in reversed(spent):
+            self.engine.add_utxo(self.symbol, txid, vout, value, path[0] if path else None)
+
+    # Stage 1
+    async def _fetch(self, client: Any, start: int, tip: int, out: "asyncio.Queue[Any]") -> None:
+        for first in range(start, tip + 1, self.window):
+            heights = range(first, min(first + self.window, tip + 1))
+            hashes = await asyncio.gather(*(client.call("getblockhash", [height]) for height in heights))
+            filters = await asyncio.gather(
+                *(client.call("getblockfilter", [block_hash, "basic"]) for block_hash in hashes)
+            )
+            for height, block_hash, entry in zip(heights, hashes, filters):
+                await out.put((height, block_hash, entry))
+        await out.put(_DONE)
+
+    # Stage 2
+    async def _match(
+        self,
+        client: Any,
+        checkpoint: SyncCheckpoint,
+        scripts: Sequence[bytes],
+        source: "asyncio.Queue[Any]",
+        out: "asyncio.Queue[Any]",
+        report: SyncReport,
+    ) -> None:
+        previous = bytes.fromhex(checkpoint.filter_header)[::-1]
+        while True:
+            item = await source.get()
+            if item is _DONE:
+                await out.put(_DONE)
+                return
+            height, block_hash, entry = item
+            filter_bytes = bytes.fromhex(entry["filter"])
+            header = filter_header(filter_bytes, previous)
+            if header[::-1].hex() != entry["header"]:
+                raise ValueError(f"Filter header mismatch at height {height}; refusing the node's filters.")
+            previous = header
+            report.filters_checked += 1
+            block: Optional[Awaitable[Any]] = None
+            if filter_matches(block_hash, filter_bytes, scripts):
+                block = asyncio.ensure_future(client.call("getblock", [block_hash, 2]))
+                report.blocks_fetched += 1
+            await out.put((height, block_hash, entry["header"], block))
+
+    # Stage 3
+    async def _apply(self, checkpoint: SyncCheckpoint, source: "asyncio.Queue[Any]", report: SyncReport) -> None:
+        since_checkpoint = 0
+        applied = list(checkpoint.applied)
+        while True:
+            item = await source.get()
+            if item is _DONE:
+                break
+            height, block_hash, header, block = item
+            if block is not None:
+                received, spent = self._apply_block(await block, report)
+                if received or spent:
+                    applied.append([height, received, spent])
+                applied = [entry for entry in applied if entry[0] > height - self.reorg_depth]
+            checkpoint = SyncCheckpoint(height, block_hash, header, applied)
+            since_checkpoint += 1
+            if block is not None or since_checkpoint >= self.checkpoint_every:
+                self._save(checkpoint)
+                since_checkpoint = 0
+        self._save(checkpoint)
+
+    def _apply_block(self, block: Any, report: SyncReport) -> Tuple[List[List[Any]], List[List[Any]]]:
+        """Apply one block; returns the coins it credited and debited, for rollback."""
+
+        engine = self.engine
+        utxos = engine.get_utxos(self.symbol)
+        match = engine.match_script
+        ours: Dict[Tuple[str, int], str] = engine.pending_inputs(self.symbol)
+        received: List[List[Any]] = []
+        spent: List[List[Any]] = []
+        for tx in block["tx"]:
+            outpoints = [(entry.get("txid"), entry.get("vout")) for entry in tx.get("vin", ())]
+            for outpoint in outpoints:
+                value = utxos.get(*outpoint)
+                if value is not None:
+                    path = engine.utxo_path(self.symbol, *outpoint)
+                    engine.spend_utxo(self.symbol, *outpoint)
+                    spent.append([*outpoint, value, list(path) if path is not None else None])
+                    report.outputs_spent += 1
+            outputs = [
+                (output["n"], bytes.fromhex(output["scriptPubKey"]["hex"]), to_atomic(self.symbol, output["value"]))
+                for output in tx.get("vout", ())
+            ]
+            send = next((ours[outpoint] for outpoint in outpoints if outpoint in ours), None)
+            if send is not None:
+                # One of our own sends: confirm it and move its change placeholder
+                # onto the real output before the output loop sees it.
+                engine.settle_spend(self.symbol, send, tx["txid"], outputs)
+                ours = engine.pending_inputs(self.symbol)
+                report.sends_confirmed += 1
+            for vout, script, value in outputs:
+                entry = match(script)
+                if entry is not None and (tx["txid"], vout) not in utxos:
+                    engine.add_utxo(self.symbol, tx["txid"], vout, value, entry.path)
+                    received.append([tx["txid"], vout])
+                    report.outputs_received += 1
+        return received, spent
+
+    def _save(self, checkpoint: SyncCheckpoint) -> None:
+        if checkpoint.height < 0:
+            if os.path.exists(self.checkpoint_path):
+                # A rollback reached past the first synced block: start over from the birthday.
+                self.engine.flush()
+                os.remove(self.checkpoint_path)
+            return
+        self.engine.flush()
+        checkpoint.save(self.checkpoint_path)
@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]
+Collector = Callable[[], Iterable[Sample]]
+
+# Latency bucket upper bounds in seconds: 10 µs to 10 s, roughly x2.5 apart.
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus cumulative-bucket model."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding ``fraction`` of observations."""
+
+        if not self.count:
+            return None
+        target = fraction * self.count
+        running = 0
+        for position, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return self.bounds[position] if position < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+class Metrics:
+    """In-process counters, gauges and latency histograms.
+
+    Updates take a lock so an exporter thread always sees a consistent copy.
+    Gauges that are cheap to read on demand, such as queue depths, come from
+    collectors registered with :meth:`add_collector` and are evaluated only
+    at export time, so they cost nothing on the hot path.
+    """
+
+    def __init__(self, namespace: str = "kernel_wallet") -> None:
+        self.namespace = namespace
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: List[Collector] = []
+
+    # Recording
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._gauges[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Collector) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def instrument(self, name: str, fn: Callable[..., Any], labels: Labels = ()) -> Callable[..., Any]:
+        """Wrap ``fn`` to count calls, errors and latency under ``method=name`` plus ``labels``.
+
+        Wrapping the same method with the same labels again (say, a second
+        engine sharing these metrics) feeds the existing series.
+        """
+
+        labels = (("method", name),) + tuple(labels)
+        counter_key = ("calls_total", labels)
+        error_key = ("errors_total", labels)
+        with self._lock:
+            histogram = self._histograms.setdefault(("call_seconds", labels), Histogram())
+        lock = self._lock
+        counters = self._counters
+        clock = time.perf_counter
+
+        @wraps(fn)
+        def instrumented(*args: Any, **kwargs: Any) -> Any:
+            started = clock()
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = clock() - started
+                # One lock round trip per call, errors included.
+                with lock:
+                    counters[counter_key] = counters.get(counter_key, 0) + 1
+                    if failed:
+                        counters[error_key] = counters.get(error_key, 0) + 1
+                    histogram.observe(elapsed)
+
+        return instrumented
+
+    # Export
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data view: counters, gauges and histogram summaries keyed by
+        ``name{label="value",...}``."""
+
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summary = {
+                _series(*key): {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for key, histogram in self._histograms.items()
+            }
+            collectors = list(self._collectors)
+        for collector in collectors:
+            for name, labels, value in collector():
+                gauges[(name, labels)] = value
+        return {
+            "uptime": time.time() - self.started_at,
+            "counters": {_series(*key): value for key, value in sorted(counters.items())},
+            "gauges": {_series(*key): value for key, value in sorted(gauges.items())},
+            "histograms": dict(sorted(summary.items())),
+        }
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = dict(self._gauges)
+            histograms = sorted(
+                (key, histogram.bounds, list(histogram.counts), histogram.count, histogram.sum)
+                for key, histogram in self._histograms.items()
+            )
+            collectors = list(self._collectors)
+        for collector in collectors:
+            for name, labels, value in collector():
+                gauges[(name, labels)] = value
+
+        lines: List[str] = []
+        typed = set()
+
+        def header(name: str, kind: str) -> str:
+            full = f"{self.namespace}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for (name, labels), value in counters:
+            lines.append(f"{_series(header(name, 'counter'), labels)} {_number(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            lines.append(f"{_series(header(name, 'gauge'), labels)} {_number(value)}")
+        for (name, labels), bounds, counts, count, total in histograms:
+            full = header(name, "histogram")
+            running = 0
+            for bound, bucket in zip(bounds + (float("inf"),), counts):
+                running += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{_series(full + '_bucket', labels + (('le', le),))} {running}")
+            lines.append(f"{_series(full + '_sum', labels)} {_number(total)}")
+            lines.append(f"{_series(full + '_count', labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the text dump atomically, e.g. for node_exporter's textfile collector."""
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """Serve ``/metrics`` on a local socket from a daemon thread.
+
+        Binds to loopback by default; the caller owns the returned server and
+        should ``shutdown()`` it on exit.
+        """
+
+        # Imported here so processes that never serve metrics (e.g. the daemon) skip http.server.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+def _series(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,352 @@
+"""Monero primitives in pure Python: Keccak-256, ed25519 group math, keys and addresses.
+
+Only what the wallet needs to find and track its own outputs and show its
+address: Keccak with the original (pre-SHA-3) padding, scalar and point
+arithmetic on ed25519 in extended coordinates with a fixed-base table for
+``s * G``, ``hash_to_ec`` and key images, Monero's block-wise base58, and
+the standard/integrated address layout.
+"""
+
+from typing import List, Optional, Tuple
+
+# Keccak-256 (Monero's cn_fast_hash)
+_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+_ROTATIONS = (
+    0, 1, 62, 28, 27, 36, 44, 6, 55, 20, 3, 10, 43, 25, 39, 41, 45, 15, 21, 8, 18, 2, 61, 56, 14,
+)
+# Pi step as a gather: new lane i comes from old lane _PI[i].
+_PI = [0] * 25
+for _x in range(5):
+    for _y in range(5):
+        _PI[_y + 5 * ((2 * _x + 3 * _y) % 5)] = _x + 5 * _y
+_RHO_PI = tuple((_PI[index], _PI[index] % 5, _ROTATIONS[_PI[index]]) for index in range(25))
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_RATE = 136
+
+
+def _keccak_f(lanes: List[int]) -> None:
+    rotations = _RHO_PI
+    mask = _MASK64
+    for constant in _ROUND_CONSTANTS:
+        c0 = lanes[0] ^ lanes[5] ^ lanes[10] ^ lanes[15] ^ lanes[20]
+        c1 = lanes[1] ^ lanes[6] ^ lanes[11] ^ lanes[16] ^ lanes[21]
+        c2 = lanes[2] ^ lanes[7] ^ lanes[12] ^ lanes[17] ^ lanes[22]
+        c3 = lanes[3] ^ lanes[8] ^ lanes[13] ^ lanes[18] ^ lanes[23]
+        c4 = lanes[4] ^ lanes[9] ^ lanes[14] ^ lanes[19] ^ lanes[24]
+        mixes = (
+            c4 ^ (((c1 << 1) | (c1 >> 63)) & mask),
+            c0 ^ (((c2 << 1) | (c2 >> 63)) & mask),
+            c1 ^ (((c3 << 1) | (c3 >> 63)) & mask),
+            c2 ^ (((c4 << 1) | (c4 >> 63)) & mask),
+            c3 ^ (((c0 << 1) | (c0 >> 63)) & mask),
+        )
+        rotated = []
+        for source, column, shift in rotations:
+            value = lanes[source] ^ mixes[column]
+            rotated.append(((value << shift) | (value >> (64 - shift))) & mask if shift else value)
+        for y in range(0, 25, 5):
+            a0, a1, a2, a3, a4 = rotated[y : y + 5]
+            lanes[y] = a0 ^ (~a1 & a2)
+            lanes[y + 1] = a1 ^ (~a2 & a3)
+            lanes[y + 2] = a2 ^ (~a3 & a4)
+            lanes[y + 3] = a3 ^ (~a4 & a0)
+            lanes[y + 4] = a4 ^ (~a0 & a1)
+        lanes[0] ^= constant
+
+
+def keccak256(data: bytes) -> bytes:
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(bytes(-len(padded) % _RATE))
+    padded[-1] |= 0x80
+    lanes = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        block = padded[offset : offset + _RATE]
+        for index in range(_RATE // 8):
+            lanes[index] ^= int.from_bytes(block[8 * index : 8 * index + 8], "little")
+        _keccak_f(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+# ed25519
+Q = 2**255 - 19
+L = 2**252 + 27742317777372353535851937790883648493
+D = -121665 * pow(121666, -1, Q) % Q
+D2 = 2 * D % Q
+SQRT_M1 = pow(2, (Q - 1) // 4, Q)
+
+Point = Tuple[int, int, int, int]  # extended (X, Y, Z, T)
+IDENTITY: Point = (0, 1, 1, 0)
+
+
+def _recover_x(y: int, sign: int) -> Optional[int]:
+    if y >= Q:
+        return None
+    u = (y * y - 1) % Q
+    v = (D * y * y + 1) % Q
+    x = u * pow(v, 3, Q) * pow(u * pow(v, 7, Q), (Q - 5) // 8, Q) % Q
+    check = v * x * x % Q
+    if check == (-u) % Q:
+        x = x * SQRT_M1 % Q
+    elif check != u:
+        return None
+    if x == 0 and sign:
+        return None
+    return Q - x if x & 1 != sign else x
+
+
+_GY = 4 * pow(5, -1, Q) % Q
+_GX = _recover_x(_GY, 0)
+G: Point = (_GX, _GY, 1, _GX * _GY % Q)  # type: ignore[operator]
+
+
+def point_add(left: Point, right: Point) -> Point:
+    x1, y1, z1, t1 = left
+    x2, y2, z2, t2 = right
+    a = (y1 - x1) * (y2 - x2) % Q
+    b = (y1 + x1) * (y2 + x2) % Q
+    c = t1 * D2 * t2 % Q
+    d = 2 * z1 * z2 % Q
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return e * f % Q, g * h % Q, f * g % Q, e * h % Q
+
+
+def point_double(point: Point) -> Point:
+    x1, y1, z1, _ = point
+    a = x1 * x1 % Q
+    b = y1 * y1 % Q
+    c = 2 * z1 * z1 % Q
+    h = a + b
+    e = h - (x1 + y1) * (x1 + y1)
+    g = a - b
+    f = c + g
+    return e * f % Q, g * h % Q, f * g % Q, e * h % Q
+
+
+def scalar_mult(scalar: int, point: Point) -> Point:
+    """Variable-base multiplication with a 4-bit fixed window."""
+
+    table = [IDENTITY, point]
+    for _ in range(14):
+        table.append(point_add(table[-1], point))
+    result = IDENTITY
+    for shift in range(252, -1, -4):
+        result = point_double(point_double(point_double(point_double(result))))
+        digit = (scalar >> shift) & 15
+        if digit:
+            result = point_add(result, table[digit])
+    return result
+
+
+_BASE_TABLE: List[List[Point]] = []
+
+
+def _base_table() -> List[List[Point]]:
+    """``table[w][b - 1] = b * 256**w * G``, built once per process."""
+
+    if not _BASE_TABLE:
+        base = G
+        for _ in range(32):
+            row = [base]
+            for _ in range(254):
+                row.append(point_add(row[-1], base))
+            _BASE_TABLE.append(row)
+            base = point_double(row[127])
+    return _BASE_TABLE
+
+
+def base_mult(scalar: int) -> Point:
+    table = _base_table()
+    result = IDENTITY
+    for window, byte in enumerate((scalar % L).to_bytes(32, "little")):
+        if byte:
+            result = point_add(result, table[window][byte - 1])
+    return result
+
+
+def _sqrt(value: int) -> int:
+    root = pow(value, (Q + 3) // 8, Q)
+    if root * root % Q != value % Q:
+        root = root * SQRT_M1 % Q
+    return root
+
+
+# Constants of ge_fromfe_frombytes_vartime; any square root works, the sign is fixed afterwards.
+_A = 486662
+_FFFB1 = _sqrt(-2 * _A * (_A + 2) % Q)
+_FFFB2 = _sqrt(2 * _A * (_A + 2) % Q)
+_FFFB3 = _sqrt(-SQRT_M1 * _A * (_A + 2) % Q)
+_FFFB4 = _sqrt(SQRT_M1 * _A * (_A + 2) % Q)
+
+
+def hash_to_point(data: bytes) -> Point:
+    """Monero's ``hash_to_ec``: Keccak, Elligator-style map onto the curve, times 8."""
+
+    u = int.from_bytes(keccak256(data), "little") % Q
+    v = 2 * u * u % Q
+    w = (v + 1) % Q
+    x = (w * w - _A * _A * v) % Q
+    root = w * pow(x, 3, Q) * pow(w * pow(x, 7, Q), (Q - 5) // 8, Q) % Q
+    check = root * root * x % Q
+    if check == w or check == (Q - w) % Q:
+        root = root * (_FFFB2 if check == w else _FFFB1) * u % Q
+        z = -_A * v % Q
+        sign = 0
+    else:
+        check = check * SQRT_M1 % Q
+        root = root * (_FFFB4 if check == w else _FFFB3) % Q
+        z = Q - _A
+        sign = 1
+    if root & 1 != sign:
+        root = Q - root
+    z_coord = (z + w) % Q
+    y_coord = (z - w) % Q
+    point = (root * z_coord % Q, y_coord, z_coord, root * y_coord % Q)
+    return point_double(point_double(point_double(point)))
+
+
+def key_image(output_secret: int, output_key: bytes) -> bytes:
+    """``x * Hp(P)`` for a one-time key ``P = x * G``; spending the output publishes it."""
+
+    return compress(scalar_mult(output_secret % L, hash_to_point(output_key)))
+
+
+def compress(point: Point) -> bytes:
+    x, y, z, _ = point
+    inverse = pow(z, -1, Q)
+    x, y = x * inverse % Q, y * inverse % Q
+    return (y | (x & 1) << 255).to_bytes(32, "little")
+
+
+def decompress(data: bytes) -> Optional[Point]:
+    if len(data) != 32:
+        return None
+    value = int.from_bytes(data, "little")
+    y = value & ((1 << 255) - 1)
+    x = _recover_x(y, value >> 255)
+    if x is None:
+        return None
+    return x, y, 1, x * y % Q
+
+
+def sc_reduce32(data: bytes) -> int:
+    return int.from_bytes(data, "little") % L
+
+
+def hash_to_scalar(data: bytes) -> int:
+    return sc_reduce32(keccak256(data))
+
+
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+# Output ownership
+def key_derivation(tx_public_key: Point, view_secret: int) -> bytes:
+    """``8 * a * R``, compressed: the shared secret for every output of one tx."""
+
+    return compress(scalar_mult(8 * view_secret % L, tx_public_key))
+
+
+def view_tag(derivation: bytes, output_index: int) -> int:
+    return keccak256(b"view_tag" + derivation + varint(output_index))[0]
+
+
+def derive_output_scalar(derivation: bytes, output_index: int) -> int:
+    return hash_to_scalar(derivation + varint(output_index))
+
+
+def decode_amount(encrypted: bytes, output_scalar: int) -> int:
+    """Compact RingCT (Bulletproofs and later) amount decryption."""
+
+    mask = keccak256(b"amount" + output_scalar.to_bytes(32, "little"))[:8]
+    return int.from_bytes(bytes(a ^ b for a, b in zip(encrypted, mask)), "little")
+
+
+def decode_legacy_amount(encrypted: bytes, output_scalar: int) -> int:
+    """Pre-Bulletproofs-2 RingCT amount: a 32-byte scalar offset by ``Hs(Hs(s))``."""
+
+    offset = hash_to_scalar(hash_to_scalar(output_scalar.to_bytes(32, "little")).to_bytes(32, "little"))
+    return ((int.from_bytes(encrypted, "little") - offset) % L) & 0xFFFFFFFFFFFFFFFF
+
+
+# Keys and addresses
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_DIGITS = {char: digit for digit, char in enumerate(_B58)}
+_FULL_BLOCK = 8
+_ENCODED_SIZES = (0, 2, 3, 5, 6, 7, 9, 10, 11)
+_DECODED_SIZES = {encoded: size for size, encoded in enumerate(_ENCODED_SIZES)}
+MONERO_COIN_TYPE = 128  # SLIP-44
+MAINNET_ADDRESS_PREFIX = 18
+MAINNET_INTEGRATED_PREFIX = 19
+MAINNET_SUBADDRESS_PREFIX = 42
+
+
+def base58_encode(data: bytes) -> str:
+    chunks = []
+    for offset in range(0, len(data), _FULL_BLOCK):
+        block = data[offset : offset + _FULL_BLOCK]
+        number = int.from_bytes(block, "big")
+        size = _ENCODED_SIZES[len(block)]
+        chars = []
+        for _ in range(size):
+            number, remainder = divmod(number, 58)
+            chars.append(_B58[remainder])
+        chunks.append("".join(reversed(chars)))
+    return "".join(chunks)
+
+
+def base58_decode(text: str) -> Optional[bytes]:
+    out = bytearray()
+    for offset in range(0, len(text), 11):
+        chunk = text[offset : offset + 11]
+        if len(chunk) not in _DECODED_SIZES:
+            return None
+        size = _DECODED_SIZES[len(chunk)]
+        number = 0
+        for char in chunk:
+            digit = _B58_DIGITS.get(char)
+            if digit is None:
+                return None
+            number = number * 58 + digit
+        if number >> (8 * size):
+            return None
+        out.extend(number.to_bytes(size, "big"))
+    return bytes(out)
+
+
+class MoneroKeys:
+    """A Monero account's secret and public spend/view keys."""
+
+    __slots__ = ("spend_secret", "view_secret", "spend_public", "view_public")
+
+    def __init__(self, spend_secret: int) -> None:
+        self.spend_secret = spend_secret % L
+        self.view_secret = hash_to_scalar(self.spend_secret.to_bytes(32, "little"))
+        self.spend_public = compress(base_mult(self.spend_secret))
+        self.view_public = compress(base_mult(self.view_secret))
+
+    @classmethod
+    def from_bip32_key(cls, private_key: int) -> "MoneroKeys":
+        """Kernel Wallet v1 scheme: spend = sc_reduce32(Keccak(k)) for k at m/44'/128'/account'."""
+
+        return cls(hash_to_scalar(private_key.to_bytes(32, "big")))
+
+    def address(self, prefix: int = MAINNET_ADDRESS_PREFIX) -> str:
+        body = varint(prefix) + self.spend_public + self.view_public
+        return base58_encode(body + keccak256(body)[:4])
+
+    def __repr__(self) -> str:
+        return "MoneroKeys(<redacted>)"
@@ -0,0 +1,454 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import re
+import secrets
+import ssl
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from wallet_engine import NodeConfig
+
+RPCCall = Tuple[str, Any]
+
+
+class NodeRPCError(RuntimeError):
+    """A node rejected a request or returned a JSON-RPC error object."""
+
+    def __init__(self, message: str, code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class NodeConnectionError(NodeRPCError):
+    """The connection to the node failed, closed early, or timed out."""
+
+
+@dataclass(frozen=True)
+class RPCDialect:
+    """Per-daemon JSON-RPC conventions."""
+
+    path: str
+    version: str
+    supports_batch: bool
+    auth_scheme: str  # "basic" or "digest"
+
+
+DIALECTS: Dict[str, RPCDialect] = {
+    # litecoind accepts JSON-RPC 1.0 style batches on its root path.
+    "LTC": RPCDialect(path="/", version="1.0", supports_batch=True, auth_scheme="basic"),
+    # monerod's /json_rpc endpoint handles one call per HTTP request; --rpc-login uses Digest auth.
+    "XMR": RPCDialect(path="/json_rpc", version="2.0", supports_batch=False, auth_scheme="digest"),
+}
+
+_DIGEST_HASHES = {
+    "MD5": hashlib.md5,
+    "MD5-SESS": hashlib.md5,
+    "SHA-256": hashlib.sha256,
+    "SHA-256-SESS": hashlib.sha256,
+}
+_CHALLENGE_PARAM = re.compile(r'(\w+)=(?:"([^"]*)"|([^,\s]*))')
+
+
+class DigestAuth:
+    """HTTP Digest credentials (RFC 7616) answering one server challenge.
+
+    After the first ``401`` the challenge is kept and every later request is
+    signed up front with an incrementing nonce count, so only the first
+    request pays the extra round trip.
+    """
+
+    def __init__(self, username: str, password: str) -> None:
+        self.username = username
+        self.password = password
+        self._challenge: Optional[Dict[str, str]] = None
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._challenge is not None
+
+    def accept_challenge(self, header: str) -> bool:
+        """Take a ``WWW-Authenticate`` value; ``False`` if it is not a usable Digest challenge."""
+
+        scheme, _, rest = header.strip().partition(" ")
+        if scheme.lower() != "digest":
+            return False
+        params = {name.lower(): quoted or bare for name, quoted, bare in _CHALLENGE_PARAM.findall(rest)}
+        if "nonce" not in params or params.get("algorithm", "MD5").upper() not in _DIGEST_HASHES:
+            return False
+        self._challenge = params
+        self._count = 0
+        return True
+
+    def header(self, method: str, uri: str) -> str:
+        challenge = self._challenge
+        assert challenge is not None
+        algorithm = challenge.get("algorithm", "MD5").upper()
+        digest = _DIGEST_HASHES[algorithm]
+
+        def hex_hash(text: str) -> str:
+            return digest(text.encode("utf-8")).hexdigest()
+
+        realm, nonce = challenge.get("realm", ""), challenge["nonce"]
+        self._count += 1
+        count = f"{self._count:08x}"
+        cnonce = secrets.token_hex(8)
+        secret = hex_hash(f"{self.username}:{realm}:{self.password}")
+        if algorithm.endswith("-SESS"):
+            secret = hex_hash(f"{secret}:{nonce}:{cnonce}")
+        target = hex_hash(f"{method}:{uri}")
+        qop = "auth" if "auth" in challenge.get("qop", "").replace(" ", "").split(",") else ""
+        if qop:
+            response = hex_hash(f"{secret}:{nonce}:{count}:{cnonce}:{qop}:{target}")
+        else:
+            response = hex_hash(f"{secret}:{nonce}:{target}")
+        fields = [
+            f'username="{self.username}"',
+            f'realm="{realm}"',
+            f'nonce="{nonce}"',
+            f'uri="{uri}"',
+            f"algorithm={challenge.get('algorithm', 'MD5')}",
+            f'response="{response}"',
+        ]
+        if qop:
+            fields += [f"qop={qop}", f"nc={count}", f'cnonce="{cnonce}"']
+        if "opaque" in challenge:
+            fields.append(f'opaque="{challenge["opaque"]}"')
+        return "Authorization: Digest " + ", ".join(fields) + "\r\n"
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    status_line = await reader.readuntil(b"\r\n")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+        raise NodeConnectionError("Node sent a malformed HTTP status line.")
+    status = int(parts[1])
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        # Keep the first of repeated headers; monerod offers its preferred Digest challenge first.
+        headers.setdefault(name.strip().lower(), value.strip())
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                break
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+        return status, headers, bytes(body)
+    if "content-length" in headers:
+        return status, headers, await reader.readexactly(int(headers["content-length"]))
+    headers["connection"] = "close"
+    return status, headers, await reader.read()
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection with pipelined requests.
+
+    Requests are written back to back without waiting; a single reader task
+    resolves the waiting futures in order as responses arrive.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._waiters: Deque["asyncio.Future[Tuple[int, Dict[str, str], bytes]]"] = deque()
+        self.closed = False
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._waiters)
+
+    async def send(self, request: bytes) -> "asyncio.Future[Tuple[int, Dict[str, str], bytes]]":
+        if self.closed:
+            raise NodeConnectionError("Connection to node is closed.")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._writer.write(request)
+        await self._writer.drain()
+        return waiter
+
+    async def _read_loop(self) -> None:
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                status, headers, body = await _read_response(self._reader)
+                if not self._waiters:
+                    raise NodeConnectionError("Node sent an unsolicited response.")
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result((status, headers, body))
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except asyncio.CancelledError:
+            pass
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError, NodeRPCError) as exc:
+            error = exc
+        finally:
+            self._shutdown(error)
+
+    def _shutdown(self, error: Optional[BaseException] = None) -> None:
+        self.closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(NodeConnectionError(f"Node connection lost: {error or 'closed'}"))
+        self._writer.close()
+
+    async def close(self) -> None:
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+        self._shutdown()
+
+
+class NodeClient:
+    """Async JSON-RPC client for a litecoind or monerod :class:`NodeConfig`.
+
+    Up to ``pool_size`` keep-alive connections are opened on demand and each
+    carries up to ``pipeline_depth`` requests in flight. A semaphore sized to
+    ``pool_size * pipeline_depth`` provides backpressure: callers beyond that
+    wait instead of opening more sockets. For daemons that accept JSON-RPC
+    batches, calls issued in the same event-loop tick are coalesced into one
+    HTTP request of at most ``batch_size`` entries. Every request is bounded
+    by ``timeout`` seconds; a timed-out connection is dropped from the pool.
+    ``auth`` is sent as HTTP Basic to litecoind and as Digest to monerod.
+    """
+
+    def __init__(
+        self,
+        node: NodeConfig,
+        auth: Optional[Tuple[str, str]] = None,
+        pool_size: int = 4,
+        pipeline_depth: int = 8,
+        batch_size: int = 100,
+        timeout: float = 10.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        if node.symbol not in DIALECTS:
+            raise KeyError(f"Unsupported asset: {node.symbol}")
+        host, _, port = node.rpc_address.partition(":")
+        self.node = node
+        self.dialect = DIALECTS[node.symbol]
+        self.pool_size = pool_size
+        self.pipeline_depth = pipeline_depth
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._host = host
+        self._port = int(port) if port else (443 if node.tls else 80)
+        self._ssl = (ssl_context or ssl.create_default_context()) if node.tls else None
+        self._authorization = ""
+        self._digest: Optional[DigestAuth] = None
+        if auth is not None and self.dialect.auth_scheme == "digest":
+            self._digest = DigestAuth(*auth)
+        elif auth is not None:
+            token = base64.b64encode(f"{auth[0]}:{auth[1]}".encode("utf-8")).decode("ascii")
+            self._authorization = f"Authorization: Basic {token}\r\n"
+        self._ids = itertools.count(1)
+        self._connections: List[_Connection] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queued: List[Tuple[str, Any, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "NodeClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    # JSON-RPC
+    async def call(self, method: str, params: Any = None) -> Any:
+        if not self.dialect.supports_batch:
+            return await self._call_single(method, params)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queued.append((method, params, waiter))
+        if len(self._queued) >= self.batch_size:
+            self._flush_queue()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_queue)
+        return await waiter
+
+    async def call_many(self, calls: Iterable[RPCCall], return_exceptions: bool = False) -> List[Any]:
+        """Issue many calls at once; results come back in input order.
+
+        Batch-capable daemons receive them as JSON-RPC batches, others as
+        pipelined single requests spread across the pool.
+        """
+
+        return await asyncio.gather(
+            *(self.call(method, params) for method, params in calls),
+            return_exceptions=return_exceptions,
+        )
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Any:
+        """POST a JSON body to a non-JSON-RPC endpoint such as monerod's ``/get_transactions``."""
+
+        status, body = await self._request(path, json.dumps(payload).encode("utf-8"))
+        return self._decode(status, body)
+
+    # Convenience calls
+    async def get_block_count(self) -> int:
+        if self.node.symbol == "XMR":
+            return (await self.call("get_block_count"))["count"]
+        return await self.call("getblockcount")
+
+    async def broadcast(self, raw_hex: str) -> Any:
+        if self.node.symbol == "XMR":
+            reply = await self.post("/send_raw_transaction", {"tx_as_hex": raw_hex})
+            if reply.get("status") != "OK":
+                raise NodeRPCError(f"Node rejected transaction: {reply.get('reason') or reply}")
+            return reply
+        return await self.call("sendrawtransaction", [raw_hex])
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
+
+    # Internals
+    def _envelope(self, method: str, params: Any) -> Dict[str, Any]:
+        envelope: Dict[str, Any] = {"jsonrpc": self.dialect.version, "id": next(self._ids), "method": method}
+        if params is not None:
+            envelope["params"] = params
+        return envelope
+
+    async def _call_single(self, method: str, params: Any) -> Any:
+        envelope = self._envelope(method, params)
+        status, body = await self._request(self.dialect.path, json.dumps(envelope).encode("utf-8"))
+        return self._unwrap(self._decode(status, body))
+
+    def _flush_queue(self) -> None:
+        self._flush_scheduled = False
+        while self._queued:
+            chunk, self._queued = self._queued[: self.batch_size], self._queued[self.batch_size :]
+            task = asyncio.ensure_future(self._send_batch(chunk))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, chunk: Sequence[Tuple[str, Any, asyncio.Future]]) -> None:
+        envelopes = [self._envelope(method, params) for method, params, _ in chunk]
+        try:
+            status, body = await self._request(self.dialect.path, json.dumps(envelopes).encode("utf-8"))
+            replies = self._decode(status, body)
+            if not isinstance(replies, list):
+                # A whole-batch failure comes back as a single error object.
+                self._unwrap(replies)
+                raise NodeRPCError("Node did not return a batch reply.")
+            by_id = {reply.get("id"): reply for reply in replies}
+        except Exception as exc:
+            for _, _, waiter in chunk:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+
+        for envelope, (_, _, waiter) in zip(envelopes, chunk):
+            if waiter.done():
+                continue
+            reply = by_id.get(envelope["id"])
+            if reply is None:
+                waiter.set_exception(NodeRPCError("Node omitted a reply in the batch."))
+                continue
+            try:
+                waiter.set_result(self._unwrap(reply))
+            except NodeRPCError as exc:
+                waiter.set_exception(exc)
+
+    async def _request(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size * self.pipeline_depth)
+            self._connect_lock = asyncio.Lock()
+        async with self._slots:
+            status, headers, reply = await self._exchange(path, body)
+            digest = self._digest
+            if status == 401 and digest is not None:
+                # First contact, or the server expired our nonce: answer the new challenge once.
+                if digest.accept_challenge(headers.get("www-authenticate", "")):
+                    status, headers, reply = await self._exchange(path, body)
+            return status, reply
+
+    async def _exchange(self, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        authorization = self._authorization
+        if self._digest is not None and self._digest.ready:
+            authorization = self._digest.header("POST", path)
+        request = (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {self._host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n"
+            f"{authorization}\r\n"
+        ).encode("latin-1") + body
+        connection = await self._acquire()
+        try:
+            waiter = await asyncio.wait_for(connection.send(request), self.timeout)
+            return await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            await connection.close()
+            raise NodeConnectionError(
+                f"Node {self.node.display_label()} did not answer within {self.timeout}s."
+            ) from None
+        except (ConnectionError, OSError) as exc:
+            await connection.close()
+            raise NodeConnectionError(f"Node connection failed: {exc}") from exc
+
+    async def _acquire(self) -> _Connection:
+        assert self._connect_lock is not None
+        async with self._connect_lock:
+            self._connections = [c for c in self._connections if not c.closed]
+            idle = min(self._connections, key=lambda c: c.outstanding, default=None)
+            if idle is not None and (idle.outstanding == 0 or len(self._connections) >= self.pool_size):
+                return idle
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        self._host,
+                        self._port,
+                        ssl=self._ssl,
+                        server_hostname=self._host if self._ssl else None,
+                    ),
+                    self.timeout,
+                )
+            except (asyncio.TimeoutError, OSError) as exc:
+                raise NodeConnectionError(
+                    f"Cannot reach node {self.node.display_label()}: {exc or 'timed out'}"
+                ) from exc
+            connection = _Connection(reader, writer)
+            self._connections.append(connection)
+            return connection
+
+    @staticmethod
+    def _decode(status: int, body: bytes) -> Any:
+        if status == 401:
+            raise NodeRPCError("Node rejected the RPC credentials.", code=401)
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise NodeRPCError(f"Node returned HTTP {status} without a JSON body.", code=status) from None
+
+    @staticmethod
+    def _unwrap(reply: Dict[str, Any]) -> Any:
+        error = reply.get("error")
+        if error:
+            if isinstance(error, dict):
+                raise NodeRPCError(str(error.get("message", error)), code=error.get("code"))
+            raise NodeRPCError(str(error))
+        return reply.get("result")
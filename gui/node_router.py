@@ -0,0 +1,277 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from node_client import NodeClient, NodeConnectionError
+from wallet_engine import NodeConfig
+
+ClientFactory = Callable[[NodeConfig], Any]
+Request = Callable[[Any], Awaitable[Any]]
+
+# Guards inserts into the health dicts that routers share (see NodeRouter's ``health``).
+_HEALTH_LOCK = threading.Lock()
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with cheap percentile lookups.
+
+    Buckets grow by 25% from 1 ms, so 64 buckets cover about 1.6 minutes with
+    roughly 12% resolution. Counts are halved every ``decay_every`` samples so
+    the histogram follows the node's recent behaviour rather than its lifetime.
+    """
+
+    _BASE = 0.001
+    _GROWTH = 1.25
+    _BUCKETS = 64
+
+    def __init__(self, decay_every: int = 512) -> None:
+        self.decay_every = decay_every
+        self._counts = [0] * self._BUCKETS
+        self._total = 0
+        self._since_decay = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def record(self, seconds: float) -> None:
+        if seconds <= self._BASE:
+            bucket = 0
+        else:
+            bucket = min(int(math.log(seconds / self._BASE, self._GROWTH)) + 1, self._BUCKETS - 1)
+        self._counts[bucket] += 1
+        self._total += 1
+        self._since_decay += 1
+        if self._since_decay >= self.decay_every:
+            self._counts = [count // 2 for count in self._counts]
+            self._total = sum(self._counts)
+            self._since_decay = 0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given quantile, or ``None`` if empty."""
+
+        if not self._total:
+            return None
+        target = fraction * self._total
+        running = 0
+        for bucket, count in enumerate(self._counts):
+            running += count
+            if running >= target:
+                return self._BASE * self._GROWTH**bucket
+        return self._BASE * self._GROWTH ** (self._BUCKETS - 1)
+
+
+class EndpointState:
+    """Health bookkeeping for one node endpoint.
+
+    Holds no connection, so one state can outlive the routers (and event
+    loops) that use it. Routers on different threads (a sync run and a
+    broadcast, say) share it, so every read and update goes through ``lock``.
+    """
+
+    def __init__(self, node: NodeConfig) -> None:
+        self.node = node
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.backoff = 0.0
+        self.in_flight = 0
+
+    def score(self) -> float:
+        with self.lock:
+            median = self.latency.percentile(0.5)
+            if median is None:
+                # Unmeasured endpoints sort first so every node gets sampled.
+                return 0.0
+            return median * (1.0 + 4.0 * self.error_rate) * (1 + self.in_flight)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self.lock:
+            return self.latency.percentile(fraction)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "endpoint": self.node.display_label(),
+                "samples": len(self.latency),
+                "p50": self.latency.percentile(0.5),
+                "p95": self.latency.percentile(0.95),
+                "error_rate": round(self.error_rate, 4),
+                "ejected_until": self.ejected_until,
+            }
+
+
+class NodeRouter:
+    """Route JSON-RPC calls across several endpoints for one asset.
+
+    Each call goes to the healthy endpoint with the best latency score. Reads
+    are hedged: if the first endpoint has not answered by its
+    ``hedge_percentile`` latency (at least ``min_hedge_delay``), the same
+    request goes to the next-best endpoint and the first answer wins. Only
+    transport failures count against an endpoint; JSON-RPC errors are the
+    node's real answer and are raised as-is. After ``eject_after`` consecutive
+    failures, or when the smoothed error rate passes ``max_error_rate``, an
+    endpoint is ejected for an exponentially growing backoff and re-admitted
+    on probation afterwards.
+
+    ``client_factory`` builds the per-endpoint client (``NodeClient`` by
+    default). Anything with async ``call(method, params)`` and ``close()``
+    works, which makes it easy to drive the router with in-process fake
+    nodes that inject delays; :meth:`post`, :meth:`get_block_count` and
+    :meth:`broadcast` need the matching client methods.
+
+    ``health`` maps endpoint addresses to their :class:`EndpointState`. Pass
+    the same dict to successive routers (the engine keeps one per asset) so
+    latency history and ejections carry over from one sync run to the next.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[NodeConfig],
+        client_factory: ClientFactory = NodeClient,
+        hedge_percentile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        eject_after: int = 3,
+        max_error_rate: float = 0.5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        health: Optional[Dict[str, EndpointState]] = None,
+    ) -> None:
+        if not nodes:
+            raise ValueError("Configure a trusted node endpoint before broadcasting.")
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.eject_after = eject_after
+        self.max_error_rate = max_error_rate
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        health = {} if health is None else health
+        self._endpoints: List[EndpointState] = []
+        self._clients: Dict[str, Any] = {}
+        with _HEALTH_LOCK:
+            for node in nodes:
+                state = health.get(node.rpc_address)
+                if state is None or state.node != node:
+                    state = health[node.rpc_address] = EndpointState(node)
+                self._endpoints.append(state)
+        for node in nodes:
+            self._clients[node.rpc_address] = client_factory(node)
+
+    async def call(self, method: str, params: Any = None, idempotent: bool = True) -> Any:
+        """Send one call; ``idempotent=False`` disables hedging and failover."""
+
+        return await self._route(lambda client: client.call(method, params), idempotent)
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Any:
+        return await self._route(lambda client: client.post(path, payload), True)
+
+    async def get_block_count(self) -> int:
+        return await self._route(lambda client: client.get_block_count(), True)
+
+    async def broadcast(self, raw_hex: str) -> Any:
+        """Relay a signed transaction; resending it to another node is harmless, so it fails over."""
+
+        return await self._route(lambda client: client.broadcast(raw_hex), True)
+
+    async def _route(self, request: Request, idempotent: bool) -> Any:
+        ranked = self._ranked()
+        primary = ranked[0]
+        if not idempotent:
+            return await self._attempt(primary, request)
+
+        backups = ranked[1:]
+        first = asyncio.ensure_future(self._attempt(primary, request))
+        hedge_delay = max(self.min_hedge_delay, primary.percentile(self.hedge_percentile) or 0.0)
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay)
+        if not backups or (done and not isinstance(first.exception(), NodeConnectionError)):
+            return await first
+        if done:
+            # The primary failed fast; fail over rather than hedge.
+            return await self._failover(backups, request, first.exception())
+
+        second = asyncio.ensure_future(self._attempt(backups[0], request))
+        racing = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while racing:
+                done, racing = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    if not isinstance(task.exception(), NodeConnectionError):
+                        raise task.exception()
+                    error = task.exception()
+        finally:
+            for task in racing:
+                task.cancel()
+        return await self._failover(backups[1:], request, error)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [endpoint.snapshot() for endpoint in self._endpoints]
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+
+    async def _failover(
+        self,
+        candidates: Sequence[EndpointState],
+        request: Request,
+        error: Optional[BaseException],
+    ) -> Any:
+        for endpoint in candidates:
+            try:
+                return await self._attempt(endpoint, request)
+            except NodeConnectionError as exc:
+                error = exc
+        assert error is not None
+        raise error
+
+    async def _attempt(self, endpoint: EndpointState, request: Request) -> Any:
+        started = time.monotonic()
+        with endpoint.lock:
+            endpoint.in_flight += 1
+        try:
+            result = await request(self._clients[endpoint.node.rpc_address])
+        except NodeConnectionError:
+            self._record_failure(endpoint)
+            raise
+        finally:
+            with endpoint.lock:
+                endpoint.in_flight -= 1
+        self._record_success(endpoint, time.monotonic() - started)
+        return result
+
+    def _ranked(self) -> List[EndpointState]:
+        now = time.monotonic()
+        ejected_until = {}
+        for endpoint in self._endpoints:
+            with endpoint.lock:
+                ejected_until[endpoint] = endpoint.ejected_until
+        healthy = [endpoint for endpoint in self._endpoints if ejected_until[endpoint] <= now]
+        if not healthy:
+            # Everything is ejected: try whichever comes back soonest.
+            return sorted(self._endpoints, key=ejected_until.__getitem__)
+        return sorted(healthy, key=EndpointState.score)
+
+    def _record_success(self, endpoint: EndpointState, seconds: float) -> None:
+        with endpoint.lock:
+            endpoint.latency.record(seconds)
+            endpoint.error_rate *= 0.9
+            endpoint.consecutive_failures = 0
+            endpoint.backoff = 0.0
+
+    def _record_failure(self, endpoint: EndpointState) -> None:
+        with endpoint.lock:
+            endpoint.error_rate = endpoint.error_rate * 0.9 + 0.1
+            endpoint.consecutive_failures += 1
+            if (
+                endpoint.consecutive_failures >= self.eject_after
+                or endpoint.error_rate > self.max_error_rate
+            ):
+                endpoint.backoff = min(max(endpoint.backoff * 2, self.base_backoff), self.max_backoff)
+                endpoint.ejected_until = time.monotonic() + endpoint.backoff
+                endpoint.consecutive_failures = 0
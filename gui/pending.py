@@ -0,0 +1,379 @@
+import time
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ledger import format_amount
+
+STAGED = "staged"
+BROADCAST = "broadcast"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+PENDING_STATES = (STAGED, BROADCAST, CONFIRMED, FAILED, CANCELLED)
+ACTIVE_STATES = (STAGED, BROADCAST)
+TERMINAL_STATES = (CONFIRMED, FAILED, CANCELLED)
+
+_TRANSITIONS: Dict[str, Sequence[str]] = {
+    STAGED: (BROADCAST, CANCELLED, FAILED),
+    BROADCAST: (CONFIRMED, FAILED),
+    CONFIRMED: (),
+    FAILED: (),
+    CANCELLED: (),
+}
+
+
+class PendingRecord:
+    """One prepared transaction. Amounts are atomic units of ``symbol``."""
+
+    __slots__ = (
+        "tx_id",
+        "symbol",
+        "address",
+        "amount",
+        "fee",
+        "note",
+        "state",
+        "created_at",
+        "updated_at",
+        "inputs",
+        "change",
+        "batch",
+    )
+
+    def __init__(
+        self,
+        tx_id: str,
+        symbol: str,
+        address: str,
+        amount: int,
+        fee: int,
+        note: str,
+        created_at: float,
+    ) -> None:
+        self.tx_id = tx_id
+        self.symbol = symbol
+        self.address = address
+        self.amount = amount
+        self.fee = fee
+        self.note = note
+        self.state = STAGED
+        self.created_at = created_at
+        self.updated_at = created_at
+        # Coin-selected spends remember [txid, vout, value] inputs and change so
+        # a cancelled send can put its coins back.
+        self.inputs: List[List[Any]] = []
+        self.change = 0
+        # Rows of one payout run share the first row's tx_id here; that row
+        # carries the run's inputs and change.
+        self.batch: Optional[str] = None
+
+    def summary(self) -> str:
+        text = (
+            f"{self.symbol} send {format_amount(self.symbol, self.amount)} to {self.address}"
+            f" (fee {format_amount(self.symbol, self.fee)})"
+        )
+        if self.note:
+            text += f" — {self.note}"
+        return text
+
+    def __repr__(self) -> str:
+        return f"PendingRecord({self.tx_id!r}, state={self.state!r})"
+
+
+@dataclass
+class RetentionPolicy:
+    """Bounds on how many finished records a store keeps.
+
+    Only records in a terminal state are ever evicted, oldest first; staged and
+    broadcast transactions always stay so funds in flight remain visible.
+    ``None`` disables a limit.
+    """
+
+    max_records: Optional[int] = 10_000
+    max_age: Optional[float] = None
+
+
+# Sort keys accepted by PendingStore.page. "created" is insertion order.
+HISTORY_SORT_KEYS: Dict[str, Optional[Callable[[PendingRecord], Any]]] = {
+    "created": None,
+    "updated": attrgetter("updated_at"),
+    "amount": attrgetter("amount"),
+    "fee": attrgetter("fee"),
+    "state": attrgetter("state"),
+    "address": attrgetter("address"),
+}
+
+
+@dataclass
+class HistoryPage:
+    """One window of a sorted, filtered history query.
+
+    ``total`` counts every match, not just the rows returned. ``version``
+    changes whenever the store does, so a view can tell a stale page apart.
+    """
+
+    offset: int
+    total: int
+    version: int
+    records: List[PendingRecord] = field(default_factory=list)
+
+
+class PendingStore:
+    """Per-account transaction store with O(1) lookup by id and by state.
+
+    Records live in an insertion-ordered dict keyed by ``tx_id``. Each state has
+    its own ordered index, so the oldest record in any state sits at the front
+    of that index and eviction never scans the whole store. Transaction ids come
+    from a monotonic counter and are never reused after eviction.
+
+    Rows staged together by ``add_many(..., batch=True)`` are one spend: a
+    state change on any of them moves the whole batch.
+    """
+
+    def __init__(self, symbol: str, retention: Optional[RetentionPolicy] = None) -> None:
+        self.symbol = symbol
+        self.retention = retention or RetentionPolicy()
+        self._records: Dict[str, PendingRecord] = {}
+        self._by_state: Dict[str, Dict[str, PendingRecord]] = {
+            state: {} for state in PENDING_STATES
+        }
+        self._sequence = 0
+        self._version = 0
+        self._view_key: Optional[Tuple[Any, ...]] = None
+        self._view: List[PendingRecord] = []
+        # Batch id -> its rows by tx_id, leader first; a dict so eviction drops one row in O(1).
+        self._batches: Dict[str, Dict[str, PendingRecord]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+    def __iter__(self) -> Iterator[PendingRecord]:
+        return iter(self._records.values())
+
+    def __contains__(self, tx_id: object) -> bool:
+        return tx_id in self._records
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def add(
+        self, address: str, amount: int, fee: int, note: str = "", now: Optional[float] = None
+    ) -> PendingRecord:
+        return self.add_many([address], [amount], [fee], [note], now)[0]
+
+    def add_many(
+        self,
+        addresses: Sequence[str],
+        amounts: Sequence[int],
+        fees: Sequence[int],
+        notes: Sequence[str],
+        now: Optional[float] = None,
+        batch: bool = False,
+    ) -> List[PendingRecord]:
+        now = time.time() if now is None else now
+        prefix = self.symbol.lower()
+        staged = self._by_state[STAGED]
+        added: List[PendingRecord] = []
+        for address, amount, fee, note in zip(addresses, amounts, fees, notes):
+            self._sequence += 1
+            record = PendingRecord(
+                f"{prefix}-{self._sequence:04d}", self.symbol, address, amount, fee, note, now
+            )
+            self._records[record.tx_id] = record
+            staged[record.tx_id] = record
+            added.append(record)
+        if batch and added:
+            for record in added:
+                record.batch = added[0].tx_id
+            self._batches[added[0].tx_id] = {record.tx_id: record for record in added}
+        self._version += 1
+        self.prune(now)
+        return added
+
+    def get(self, tx_id: str) -> PendingRecord:
+        if tx_id not in self._records:
+            raise KeyError(f"Unknown transaction: {tx_id}")
+        return self._records[tx_id]
+
+    def batch_of(self, record: PendingRecord) -> List[PendingRecord]:
+        """Every retained row of ``record``'s batch, leader first; just ``record`` for a single send."""
+
+        if record.batch is None:
+            return [record]
+        members = self._batches.get(record.batch)
+        return list(members.values()) if members else [record]
+
+    def set_state(self, tx_id: str, state: str, now: Optional[float] = None) -> PendingRecord:
+        """Move ``tx_id`` (and the rest of its batch) to ``state``; returns ``tx_id``'s record."""
+
+        record = self.get(tx_id)
+        members = self.batch_of(record)
+        for member in members:
+            if state not in _TRANSITIONS.get(member.state, ()):
+                raise ValueError(f"Cannot move {member.tx_id} from {member.state} to {state}.")
+        updated_at = time.time() if now is None else now
+        for member in members:
+            del self._by_state[member.state][member.tx_id]
+            member.state = state
+            member.updated_at = updated_at
+            self._by_state[state][member.tx_id] = member
+        self._version += 1
+        self.prune(updated_at)
+        return record
+
+    def in_state(self, state: str) -> List[PendingRecord]:
+        return list(self._by_state[state].values())
+
+    def active(self) -> List[PendingRecord]:
+        return [record for state in ACTIVE_STATES for record in self._by_state[state].values()]
+
+    def count(self, state: Optional[str] = None) -> int:
+        if state is None:
+            return len(self._records)
+        return len(self._by_state[state])
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "created",
+        descending: bool = True,
+        state: Optional[str] = None,
+        query: str = "",
+    ) -> HistoryPage:
+        """Return ``limit`` records starting at ``offset`` of a sorted, filtered view.
+
+        The matching, ordered view is built once per distinct query and store
+        version and then sliced, so scrolling through a large history costs
+        only the rows on screen. ``query`` matches the id, address or note,
+        ignoring case.
+        """
+
+        if sort not in HISTORY_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if state is not None and state not in self._by_state:
+            raise ValueError(f"Unknown state: {state}")
+        needle = query.strip().casefold()
+        key = (self._version, sort, descending, state, needle)
+        if key != self._view_key:
+            self._view = self._build_view(sort, descending, state, needle)
+            self._view_key = key
+        total = len(self._view)
+        offset = max(0, min(offset, total - limit)) if total > limit else 0
+        return HistoryPage(offset, total, self._version, self._view[offset : offset + limit])
+
+    def _build_view(
+        self, sort: str, descending: bool, state: Optional[str], needle: str
+    ) -> List[PendingRecord]:
+        source = self._records if state is None else self._by_state[state]
+        if needle:
+            view = [
+                record
+                for record in source.values()
+                if needle in record.tx_id
+                or needle in record.address.casefold()
+                or needle in record.note.casefold()
+            ]
+        else:
+            view = list(source.values())
+        sort_key = HISTORY_SORT_KEYS[sort]
+        if sort_key is None:
+            if state is not None:
+                # State indexes are ordered by last update; restore creation order.
+                view.sort(key=lambda record: int(record.tx_id.rsplit("-", 1)[1]))
+            if descending:
+                view.reverse()
+        else:
+            # Python's sort is stable, so equal keys keep creation order.
+            view.sort(key=sort_key, reverse=descending)
+        return view
+
+    def export(self) -> Dict[str, Any]:
+        """Plain-data copy of the store for snapshots."""
+
+        return {
+            "sequence": self._sequence,
+            "records": [
+                [
+                    record.tx_id,
+                    record.address,
+                    record.amount,
+                    record.fee,
+                    record.note,
+                    record.state,
+                    record.created_at,
+                    record.updated_at,
+                    record.inputs,
+                    record.change,
+                    record.batch,
+                ]
+                for record in self._records.values()
+            ],
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Replace the store contents with an :meth:`export` result."""
+
+        self._records.clear()
+        self._batches.clear()
+        for index in self._by_state.values():
+            index.clear()
+        for row in data["records"]:
+            tx_id, address, amount, fee, note, state, created_at, updated_at, inputs, change = row[:10]
+            record = PendingRecord(tx_id, self.symbol, address, amount, fee, note, created_at)
+            record.state = state
+            record.updated_at = updated_at
+            record.inputs = inputs
+            record.change = change
+            # Snapshots written before batch ids existed have ten columns.
+            record.batch = row[10] if len(row) > 10 else None
+            self._records[tx_id] = record
+            if record.batch is not None:
+                self._batches.setdefault(record.batch, {})[tx_id] = record
+        for record in sorted(self._records.values(), key=lambda record: record.updated_at):
+            self._by_state[record.state][record.tx_id] = record
+        self._sequence = data["sequence"]
+        self._version += 1
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Evict terminal records beyond the retention policy; return how many."""
+
+        max_records = self.retention.max_records
+        max_age = self.retention.max_age
+        cutoff = None if max_age is None else (now if now is not None else time.time()) - max_age
+        evicted = 0
+        while True:
+            oldest = self._oldest_terminal()
+            if oldest is None:
+                break
+            over_count = max_records is not None and len(self._records) > max_records
+            expired = cutoff is not None and oldest.updated_at < cutoff
+            if not (over_count or expired):
+                break
+            del self._by_state[oldest.state][oldest.tx_id]
+            del self._records[oldest.tx_id]
+            if oldest.batch is not None:
+                members = self._batches[oldest.batch]
+                del members[oldest.tx_id]
+                if not members:
+                    del self._batches[oldest.batch]
+            evicted += 1
+        if evicted:
+            self._version += 1
+        return evicted
+
+    def _oldest_terminal(self) -> Optional[PendingRecord]:
+        oldest: Optional[PendingRecord] = None
+        for state in TERMINAL_STATES:
+            index = self._by_state[state]
+            if index:
+                head = next(iter(index.values()))
+                if oldest is None or head.updated_at < oldest.updated_at:
+                    oldest = head
+        return oldest
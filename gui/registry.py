@@ -0,0 +1,100 @@
+import threading
+from typing import Callable, Dict, List, Optional
+
+from journal import JournalStore
+from metrics import Metrics
+from pending import RetentionPolicy
+from seed import SeedVault
+from wallet_engine import WalletEngine
+
+
+class WalletRegistry:
+    """Many isolated wallets in one process, keyed by wallet name.
+
+    Each wallet is its own :class:`WalletEngine` with its own ledger,
+    pending stores, coin indexes and (via ``journal_factory``) its own
+    journal, so operations on different wallets never contend. Within a
+    wallet the engine's per-account locks serialize spends. The wallets
+    share one :class:`SeedVault`, so there is a single PBKDF2 worker
+    process however many wallets are open; closing a wallet zeroizes its
+    cached seed unless another open wallet was loaded from the same one.
+    A shared :class:`Metrics` labels every series with ``wallet=<name>``.
+    """
+
+    def __init__(
+        self,
+        journal_factory: Optional[Callable[[str], JournalStore]] = None,
+        pending_retention: Optional[RetentionPolicy] = None,
+        metrics: Optional[Metrics] = None,
+        seed_vault: Optional[SeedVault] = None,
+    ) -> None:
+        self.journal_factory = journal_factory
+        self.pending_retention = pending_retention
+        self.metrics = metrics
+        self._seeds = seed_vault or SeedVault()
+        self._wallets: Dict[str, WalletEngine] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._wallets)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._wallets
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._wallets)
+
+    def open(self, name: str, seed_phrase: str, passphrase: str = "") -> WalletEngine:
+        """Create and load a wallet; names must be unique among open wallets."""
+
+        cleaned_name = name.strip()
+        if not cleaned_name:
+            raise ValueError("Wallet name is required.")
+        with self._lock:
+            if cleaned_name in self._wallets:
+                raise ValueError(f"Wallet {cleaned_name} is already open.")
+        journal = self.journal_factory(cleaned_name) if self.journal_factory is not None else None
+        engine = WalletEngine(
+            pending_retention=self.pending_retention,
+            journal=journal,
+            metrics=self.metrics,
+            seed_vault=self._seeds,
+            metric_labels=(("wallet", cleaned_name),),
+        )
+        try:
+            engine.set_profile(cleaned_name, seed_phrase, passphrase)
+            with self._lock:
+                if cleaned_name in self._wallets:
+                    raise ValueError(f"Wallet {cleaned_name} is already open.")
+                self._wallets[cleaned_name] = engine
+        except Exception:
+            engine.close()
+            raise
+        return engine
+
+    def get(self, name: str) -> WalletEngine:
+        with self._lock:
+            engine = self._wallets.get(name)
+        if engine is None:
+            raise KeyError(f"No open wallet named {name}")
+        return engine
+
+    def close(self, name: str) -> None:
+        with self._lock:
+            engine = self._wallets.pop(name, None)
+        if engine is None:
+            raise KeyError(f"No open wallet named {name}")
+        master = engine.get_profile().master
+        engine.close()
+        with self._lock:
+            shared = any(other.get_profile().master is master for other in self._wallets.values())
+        if master is not None and not shared:
+            self._seeds.discard(master)
+
+    def close_all(self) -> None:
+        with self._lock:
+            engines, self._wallets = list(self._wallets.values()), {}
+        for engine in engines:
+            engine.close()
+        self._seeds.close()
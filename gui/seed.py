@@ -0,0 +1,177 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import unicodedata
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+WORDLIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bip39_english.txt")
+# SHA-256 of the canonical BIP-39 English list; a corrupted copy must never load.
+WORDLIST_SHA256 = "2f5eed53a4727b4bf8880d8f3f199efc90e58503646d9ff8eff3a2ed3b24dbda"
+VALID_WORD_COUNTS = (12, 15, 18, 21, 24)
+PBKDF2_ROUNDS = 2048
+
+
+def _load_wordlist() -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    with open(WORDLIST_PATH, "rb") as handle:
+        raw = handle.read()
+    if hashlib.sha256(raw).hexdigest() != WORDLIST_SHA256:
+        raise ValueError("BIP-39 wordlist failed its integrity check.")
+    words = tuple(raw.decode("utf-8").split())
+    return words, {word: index for index, word in enumerate(words)}
+
+
+WORDLIST, WORD_INDEX = _load_wordlist()
+
+
+def normalize_mnemonic(phrase: str) -> str:
+    return " ".join(unicodedata.normalize("NFKD", phrase).lower().split())
+
+
+def mnemonic_indices(phrase: str) -> List[int]:
+    """Validate a BIP-39 mnemonic and return its word indices.
+
+    Each word is one dict lookup; the checksum is the leading bits of the
+    SHA-256 of the entropy, compared without building any bit strings.
+    """
+
+    words = normalize_mnemonic(phrase).split()
+    if len(words) not in VALID_WORD_COUNTS:
+        raise ValueError("Seed phrase must contain 12, 15, 18, 21 or 24 words.")
+    indices = []
+    for position, word in enumerate(words, start=1):
+        index = WORD_INDEX.get(word)
+        if index is None:
+            raise ValueError(f"Word {position} is not in the BIP-39 wordlist.")
+        indices.append(index)
+
+    packed = 0
+    for index in indices:
+        packed = (packed << 11) | index
+    checksum_bits = len(words) // 3
+    entropy_bits = len(words) * 11 - checksum_bits
+    entropy = (packed >> checksum_bits).to_bytes(entropy_bits // 8, "big")
+    expected = hashlib.sha256(entropy).digest()[0] >> (8 - checksum_bits)
+    if packed & ((1 << checksum_bits) - 1) != expected:
+        raise ValueError("Seed phrase checksum does not match; check the word order and spelling.")
+    return indices
+
+
+def mnemonic_to_seed(phrase: str, passphrase: str = "") -> bytes:
+    """BIP-39 seed: PBKDF2-HMAC-SHA512 over the NFKD mnemonic, 2048 rounds."""
+
+    mnemonic = normalize_mnemonic(phrase).encode("utf-8")
+    salt = ("mnemonic" + unicodedata.normalize("NFKD", passphrase)).encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha512", mnemonic, salt, PBKDF2_ROUNDS)
+
+
+class MasterSeed:
+    """A 64-byte BIP-39 seed and its BIP-32 master key in one zeroizable buffer.
+
+    ``zeroize`` overwrites the buffer in place. Python may still hold
+    transient copies (hash inputs, pickled results), so this narrows how
+    long key material lingers rather than guaranteeing it is gone.
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, seed: bytes) -> None:
+        master = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+        self._buffer = bytearray(seed + master)
+
+    @property
+    def seed(self) -> memoryview:
+        return memoryview(self._buffer)[:64]
+
+    @property
+    def master_key(self) -> memoryview:
+        return memoryview(self._buffer)[64:96]
+
+    @property
+    def master_chain_code(self) -> memoryview:
+        return memoryview(self._buffer)[96:128]
+
+    @property
+    def wiped(self) -> bool:
+        return not any(self._buffer)
+
+    def zeroize(self) -> None:
+        self._buffer[:] = bytes(len(self._buffer))
+
+    def __repr__(self) -> str:
+        return "MasterSeed(<redacted>)"
+
+
+class SeedVault:
+    """Session cache of stretched seeds, computed in a worker process.
+
+    PBKDF2 runs in a single-process pool, started on first use with the
+    ``spawn`` method so no Tk or thread state is forked. Results are keyed
+    by a keyed BLAKE2b digest of the mnemonic and passphrase under a
+    per-session random key, so the cache never stores the phrase itself.
+    Loading the same wallet again, or deriving child keys from it, never
+    repeats the stretch.
+    """
+
+    def __init__(self, use_process: bool = True) -> None:
+        self.use_process = use_process
+        self._session_key = secrets.token_bytes(32)
+        self._cache: Dict[bytes, MasterSeed] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional["ProcessPoolExecutor"] = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def derive(self, phrase: str, passphrase: str = "") -> MasterSeed:
+        key = self._cache_key(phrase, passphrase)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self.use_process:
+            seed = self._executor().submit(mnemonic_to_seed, phrase, passphrase).result()
+        else:
+            seed = mnemonic_to_seed(phrase, passphrase)
+        master = MasterSeed(seed)
+        with self._lock:
+            return self._cache.setdefault(key, master)
+
+    def discard(self, master: MasterSeed) -> None:
+        """Zeroize and drop one cached seed, e.g. when a wallet sharing this vault closes."""
+
+        with self._lock:
+            for key in [key for key, cached in self._cache.items() if cached is master]:
+                del self._cache[key]
+        master.zeroize()
+
+    def clear(self) -> None:
+        """Zeroize and drop every cached seed."""
+
+        with self._lock:
+            for master in self._cache.values():
+                master.zeroize()
+            self._cache.clear()
+
+    def close(self) -> None:
+        self.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _cache_key(self, phrase: str, passphrase: str) -> bytes:
+        material = f"{normalize_mnemonic(phrase)}\x00{passphrase}".encode("utf-8")
+        return hashlib.blake2b(material, key=self._session_key, digest_size=32).digest()
+
+    def _executor(self) -> "ProcessPoolExecutor":
+        # Imported on first use, so wallets that never stretch a seed skip multiprocessing.
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"))
+            return self._pool
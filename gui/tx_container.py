@@ -0,0 +1,461 @@
+"""Binary container for prepared transactions, for hand-off to an offline signer.
+
+Layout (integers big-endian unless noted)::
+
+    header   "KWTX" | version u8 | reserved u8
+    record   kind u8 | length u32 | body
+    body     symbol_len u8 | symbol | tx_id_len u8 | tx_id | created_at f64
+             | note_len u16 | note (UTF-8) | payload (rest of the record)
+    trailer  kind 0 | length 4 | record count u32
+
+The payload is a BIP-174 PSBT for Litecoin and an unsigned-transaction set
+(layout below) for Monero. The trailer makes a truncated file detectable.
+
+:class:`ContainerWriter` streams records to any binary file object, so an
+export of thousands of transactions never holds more than one record in
+memory. :func:`iter_container` walks a buffer (``bytes``, ``mmap``, ...)
+through one ``memoryview``: every field of a :class:`PreparedView` and
+every PSBT key and value in a :class:`PsbtView` is a slice of that view,
+decoded only when read.
+"""
+
+import hashlib
+import mmap
+import struct
+from typing import Any, BinaryIO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+MAGIC = b"KWTX"
+VERSION = 1
+UNSIGNED = 1
+PARTIALLY_SIGNED = 2
+_END = 0
+
+_HEADER = struct.Struct(">4sBB")
+_RECORD = struct.Struct(">BI")
+_CREATED = struct.Struct(">d")
+_NOTE_LENGTH = struct.Struct(">H")
+_COUNT = struct.Struct(">I")
+
+# BIP-174 key types used here
+PSBT_MAGIC = b"psbt\xff"
+PSBT_GLOBAL_UNSIGNED_TX = 0x00
+PSBT_IN_WITNESS_UTXO = 0x01
+PSBT_IN_PARTIAL_SIG = 0x02
+PSBT_IN_BIP32_DERIVATION = 0x06
+PSBT_OUT_BIP32_DERIVATION = 0x02
+PSBT_PROPRIETARY = 0xFC
+# Proprietary input field: the spent output's value (u64 LE). Only written for an
+# input whose address the engine never learned, so no WITNESS_UTXO can be filled in.
+KW_PREFIX = b"\x02kw"
+KW_IN_VALUE = 0x00
+
+Derivation = Tuple[bytes, bytes, Sequence[int]]  # public key, master fingerprint, path
+
+# Monero unsigned-transaction set:
+#   version u8 | destination_count u16 | (address_len u8 | address | amount u64)...
+#   | fee u64 | input_count u16 | (txid 32 | index u32 | amount u64)...
+#   | change u64 | change_address_len u8 | change_address
+_XMR_VERSION = 1
+_COUNT16 = struct.Struct(">H")
+_U64 = struct.Struct(">Q")
+_XMR_INPUT = struct.Struct(">32sIQ")
+
+
+# Compact sizes (Bitcoin serialization)
+def compact_size(value: int) -> bytes:
+    if value < 0xFD:
+        return bytes([value])
+    if value <= 0xFFFF:
+        return b"\xfd" + value.to_bytes(2, "little")
+    if value <= 0xFFFFFFFF:
+        return b"\xfe" + value.to_bytes(4, "little")
+    return b"\xff" + value.to_bytes(8, "little")
+
+
+def read_compact_size(view: memoryview, offset: int) -> Tuple[int, int]:
+    """Value and the offset just past it."""
+
+    first = view[offset]
+    if first < 0xFD:
+        return first, offset + 1
+    width = {0xFD: 2, 0xFE: 4, 0xFF: 8}[first]
+    end = offset + 1 + width
+    if end > len(view):
+        raise ValueError("Truncated compact size.")
+    return int.from_bytes(view[offset + 1 : end], "little"), end
+
+
+# PSBT construction
+def unsigned_transaction(inputs: Sequence[Tuple[str, int]], outputs: Sequence[Tuple[int, bytes]]) -> bytes:
+    """Version-2 transaction with empty scriptSigs, RBF-enabled sequences and locktime 0."""
+
+    parts = [struct.pack("<i", 2), compact_size(len(inputs))]
+    for txid, vout in inputs:
+        parts.append(bytes.fromhex(txid)[::-1] + struct.pack("<I", vout) + b"\x00" + b"\xfd\xff\xff\xff")
+    parts.append(compact_size(len(outputs)))
+    for value, script in outputs:
+        parts.append(struct.pack("<Q", value) + compact_size(len(script)) + script)
+    parts.append(b"\x00\x00\x00\x00")
+    return b"".join(parts)
+
+
+def _pair(key: bytes, value: bytes) -> bytes:
+    return compact_size(len(key)) + key + compact_size(len(value)) + value
+
+
+def _bip32_derivation(key_type: int, derivation: Derivation) -> bytes:
+    public_key, fingerprint, path = derivation
+    return _pair(bytes([key_type]) + public_key, fingerprint + struct.pack(f"<{len(path)}I", *path))
+
+
+class PsbtInput(NamedTuple):
+    """What the signer needs about one spent output."""
+
+    value: int
+    script: Optional[bytes] = None  # the output's scriptPubKey
+    derivation: Optional[Derivation] = None
+
+
+def transaction_id(tx: bytes) -> str:
+    """Txid of a serialized transaction. Segwit signatures are not part of it, so it is final before signing."""
+
+    return hashlib.sha256(hashlib.sha256(tx).digest()).digest()[::-1].hex()
+
+
+def build_psbt(
+    tx: bytes,
+    inputs: Sequence[PsbtInput],
+    output_count: int,
+    change_derivation: Optional[Derivation] = None,
+) -> bytes:
+    """PSBT around the unsigned transaction ``tx``.
+
+    Each input gets a WITNESS_UTXO and a BIP32_DERIVATION when its script
+    and key are known. ``change_derivation`` is for the last output, so
+    the signer can recognise it as ours.
+    """
+
+    parts = [PSBT_MAGIC, _pair(bytes([PSBT_GLOBAL_UNSIGNED_TX]), tx), b"\x00"]
+    for spent in inputs:
+        value = struct.pack("<Q", spent.value)
+        if spent.script is not None:
+            parts.append(_pair(bytes([PSBT_IN_WITNESS_UTXO]), value + compact_size(len(spent.script)) + spent.script))
+        else:
+            parts.append(_pair(bytes([PSBT_PROPRIETARY]) + KW_PREFIX + bytes([KW_IN_VALUE]), value))
+        if spent.derivation is not None:
+            parts.append(_bip32_derivation(PSBT_IN_BIP32_DERIVATION, spent.derivation))
+        parts.append(b"\x00")
+    for position in range(output_count):
+        if change_derivation is not None and position == output_count - 1:
+            parts.append(_bip32_derivation(PSBT_OUT_BIP32_DERIVATION, change_derivation))
+        parts.append(b"\x00")
+    return b"".join(parts)
+
+
+def build_xmr_set(
+    destinations: Sequence[Tuple[str, int]],
+    fee: int,
+    inputs: Sequence[Tuple[str, int, int]],
+    change: int,
+    change_address: str,
+) -> bytes:
+    """Unsigned set paying ``destinations`` ``(address, amount)`` from ``inputs`` ``(txid, index, amount)``."""
+
+    parts = [bytes([_XMR_VERSION]), _COUNT16.pack(len(destinations))]
+    for address, amount in destinations:
+        parts.append(bytes([len(address)]) + address.encode("ascii") + _U64.pack(amount))
+    parts.append(_U64.pack(fee) + _COUNT16.pack(len(inputs)))
+    parts.extend(_XMR_INPUT.pack(bytes.fromhex(txid), index, value) for txid, index, value in inputs)
+    parts.append(_U64.pack(change) + bytes([len(change_address)]) + change_address.encode("ascii"))
+    return b"".join(parts)
+
+
+# Writing
+class ContainerWriter:
+    """Stream prepared transactions into a container; :meth:`close` writes the trailer."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.count = 0
+        self._closed = False
+        stream.write(_HEADER.pack(MAGIC, VERSION, 0))
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if exc_info[0] is None:
+            self.close()
+
+    def write(
+        self, symbol: str, tx_id: str, created_at: float, note: str, payload: bytes, kind: int = UNSIGNED
+    ) -> None:
+        if self._closed:
+            raise ValueError("Container is already closed.")
+        symbol_bytes = symbol.encode("ascii")
+        tx_id_bytes = tx_id.encode("ascii")
+        note_bytes = note.encode("utf-8")
+        if len(note_bytes) > 0xFFFF:
+            raise ValueError("Transaction note is too long to export.")
+        head = b"".join(
+            (
+                bytes([len(symbol_bytes)]),
+                symbol_bytes,
+                bytes([len(tx_id_bytes)]),
+                tx_id_bytes,
+                _CREATED.pack(created_at),
+                _NOTE_LENGTH.pack(len(note_bytes)),
+                note_bytes,
+            )
+        )
+        self.stream.write(_RECORD.pack(kind, len(head) + len(payload)))
+        self.stream.write(head)
+        self.stream.write(payload)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self._closed:
+            self.stream.write(_RECORD.pack(_END, _COUNT.size) + _COUNT.pack(self.count))
+            self._closed = True
+
+
+# Reading
+class PreparedView:
+    """One record of a container, as slices of the caller's buffer."""
+
+    __slots__ = ("kind", "_view", "_symbol", "_tx_id", "_created", "_note", "payload")
+
+    def __init__(self, kind: int, view: memoryview) -> None:
+        self.kind = kind
+        self._view = view
+        offset = 0
+        slices = []
+        try:
+            for _ in range(2):
+                length = view[offset]
+                slices.append(view[offset + 1 : offset + 1 + length])
+                offset += 1 + length
+            (note_length,) = _NOTE_LENGTH.unpack_from(view, offset + 8)
+        except (IndexError, struct.error):
+            raise ValueError("Prepared transaction record is truncated.") from None
+        self._symbol, self._tx_id = slices
+        self._created = view[offset : offset + 8]
+        offset += 10
+        self._note = view[offset : offset + note_length]
+        offset += note_length
+        if offset > len(view):
+            raise ValueError("Prepared transaction record is truncated.")
+        self.payload = view[offset:]
+
+    @property
+    def symbol(self) -> str:
+        return str(self._symbol, "ascii")
+
+    @property
+    def tx_id(self) -> str:
+        return str(self._tx_id, "ascii")
+
+    @property
+    def created_at(self) -> float:
+        return _CREATED.unpack(self._created)[0]
+
+    @property
+    def note(self) -> str:
+        return str(self._note, "utf-8")
+
+    def psbt(self) -> "PsbtView":
+        return PsbtView(self.payload)
+
+    def xmr_set(self) -> "XmrSetView":
+        return XmrSetView(self.payload)
+
+    def release(self) -> None:
+        """Drop every slice so the underlying buffer (e.g. an mmap) can be closed."""
+
+        for view in (self._symbol, self._tx_id, self._created, self._note, self.payload, self._view):
+            view.release()
+
+
+def iter_container(buffer: Any) -> Iterator[PreparedView]:
+    """Yield every record of a container; raises ``ValueError`` on a malformed or truncated one."""
+
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise ValueError("Not a prepared-transaction container.")
+    magic, version, _ = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a prepared-transaction container.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported container version {version}.")
+    offset = _HEADER.size
+    count = 0
+    while True:
+        if offset + _RECORD.size > len(view):
+            raise ValueError("Container is truncated.")
+        kind, length = _RECORD.unpack_from(view, offset)
+        offset += _RECORD.size
+        end = offset + length
+        if end > len(view):
+            raise ValueError("Container is truncated.")
+        if kind == _END:
+            (expected,) = _COUNT.unpack_from(view, offset)
+            if expected != count:
+                raise ValueError("Container record count does not match its trailer.")
+            if end != len(view):
+                raise ValueError("Container has trailing data.")
+            return
+        if kind not in (UNSIGNED, PARTIALLY_SIGNED):
+            raise ValueError(f"Unknown container record kind {kind}.")
+        yield PreparedView(kind, view[offset:end])
+        count += 1
+        offset = end
+
+
+class ContainerFile:
+    """Memory-map a container file and iterate it without reading it into memory.
+
+    Views are valid until :meth:`close`; call :meth:`PreparedView.release`
+    on any view kept past the loop first.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._handle = open(path, "rb")
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self) -> "ContainerFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[PreparedView]:
+        return iter_container(self._map)
+
+    def close(self) -> None:
+        self._map.close()
+        self._handle.close()
+
+
+class PsbtView:
+    """BIP-174 key maps as ``(key, value)`` memoryview pairs; nothing is copied or decoded up front."""
+
+    __slots__ = ("globals", "inputs", "outputs")
+
+    def __init__(self, data: Any) -> None:
+        view = memoryview(data)
+        if bytes(view[:5]) != PSBT_MAGIC:
+            raise ValueError("Payload is not a PSBT.")
+        self.inputs: List[List[Tuple[memoryview, memoryview]]] = []
+        self.outputs: List[List[Tuple[memoryview, memoryview]]] = []
+        try:
+            self.globals, offset = self._read_map(view, 5)
+            tx = self.unsigned_tx
+            input_count, position = read_compact_size(tx, 4)
+            for _ in range(input_count):
+                script_length, position = read_compact_size(tx, position + 36)
+                position += script_length + 4
+            output_count, _ = read_compact_size(tx, position)
+            for maps, count in ((self.inputs, input_count), (self.outputs, output_count)):
+                for _ in range(count):
+                    entries, offset = self._read_map(view, offset)
+                    maps.append(entries)
+        except (IndexError, KeyError):
+            raise ValueError("PSBT is truncated.") from None
+        if offset != len(view):
+            raise ValueError("PSBT has trailing data.")
+
+    @staticmethod
+    def _read_map(view: memoryview, offset: int) -> Tuple[List[Tuple[memoryview, memoryview]], int]:
+        entries = []
+        while True:
+            if offset >= len(view):
+                raise ValueError("PSBT is truncated.")
+            key_length, offset = read_compact_size(view, offset)
+            if not key_length:
+                return entries, offset
+            key = view[offset : offset + key_length]
+            value_length, offset = read_compact_size(view, offset + key_length)
+            value = view[offset : offset + value_length]
+            offset += value_length
+            if offset > len(view):
+                raise ValueError("PSBT is truncated.")
+            entries.append((key, value))
+
+    @property
+    def unsigned_tx(self) -> memoryview:
+        for key, value in self.globals:
+            if len(key) == 1 and key[0] == PSBT_GLOBAL_UNSIGNED_TX:
+                return value
+        raise ValueError("PSBT has no unsigned transaction.")
+
+    def partial_signatures(self, index: int) -> List[Tuple[memoryview, memoryview]]:
+        """``(public key, signature)`` pairs already collected for input ``index``."""
+
+        return [(key[1:], value) for key, value in self.inputs[index] if key[0] == PSBT_IN_PARTIAL_SIG]
+
+    @property
+    def is_partially_signed(self) -> bool:
+        return any(self.partial_signatures(index) for index in range(len(self.inputs)))
+
+    def input_value(self, index: int) -> Optional[int]:
+        marker = bytes([PSBT_PROPRIETARY]) + KW_PREFIX + bytes([KW_IN_VALUE])
+        for key, value in self.inputs[index]:
+            if len(key) == 1 and key[0] == PSBT_IN_WITNESS_UTXO:
+                return int.from_bytes(value[:8], "little")
+            if key == marker:
+                return int.from_bytes(value, "little")
+        return None
+
+    def input_script(self, index: int) -> Optional[memoryview]:
+        """scriptPubKey of the output spent by input ``index``, from its WITNESS_UTXO."""
+
+        for key, value in self.inputs[index]:
+            if len(key) == 1 and key[0] == PSBT_IN_WITNESS_UTXO:
+                length, offset = read_compact_size(value, 8)
+                return value[offset : offset + length]
+        return None
+
+    def input_derivations(self, index: int) -> List[Tuple[bytes, bytes, Tuple[int, ...]]]:
+        """``(public key, master fingerprint, path)`` for each key of input ``index``."""
+
+        found = []
+        for key, value in self.inputs[index]:
+            if key[0] == PSBT_IN_BIP32_DERIVATION:
+                path = struct.unpack(f"<{(len(value) - 4) // 4}I", value[4:])
+                found.append((bytes(key[1:]), bytes(value[:4]), path))
+        return found
+
+
+class XmrSetView:
+    """A Monero unsigned set read in place; addresses and txids stay memoryview slices."""
+
+    __slots__ = ("destinations", "fee", "inputs", "change", "change_address")
+
+    def __init__(self, data: Any) -> None:
+        view = memoryview(data)
+        try:
+            if view[0] != _XMR_VERSION:
+                raise ValueError(f"Unsupported Monero set version {view[0]}.")
+            (count,), offset = _COUNT16.unpack_from(view, 1), 3
+            self.destinations: List[Tuple[memoryview, int]] = []
+            for _ in range(count):
+                length = view[offset]
+                address = view[offset + 1 : offset + 1 + length]
+                offset += 1 + length
+                self.destinations.append((address, _U64.unpack_from(view, offset)[0]))
+                offset += _U64.size
+            (self.fee,), (count,) = _U64.unpack_from(view, offset), _COUNT16.unpack_from(view, offset + _U64.size)
+            offset += _U64.size + _COUNT16.size
+            self.inputs: List[Tuple[memoryview, int, int]] = []
+            for _ in range(count):
+                _, index, value = _XMR_INPUT.unpack_from(view, offset)
+                self.inputs.append((view[offset : offset + 32], index, value))
+                offset += _XMR_INPUT.size
+            (self.change,) = _U64.unpack_from(view, offset)
+            length = view[offset + _U64.size]
+            offset += _U64.size + 1
+            self.change_address = view[offset : offset + length]
+        except (IndexError, struct.error):
+            raise ValueError("Monero set is truncated.") from None
+        if offset + length != len(view):
+            raise ValueError("Monero set is truncated or has trailing data.")
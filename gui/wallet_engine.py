@@ -1,15 +1,86 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from decimal import Decimal
+from itertools import accumulate
+from operator import add
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from address_check import address_error, validate_addresses
+from address_index import AddressEntry, AddressIndex, output_script
+from coin_selection import UtxoIndex, select_coins, spend_vsize
+from fee_estimator import FEE_PROFILES, FeeEstimator, parse_mempool
+from hd import (
+    COIN_TYPES,
+    HARDENED,
+    ExtendedKey,
+    GapLimitScanner,
+    KeyChain,
+    Path,
+    ScanResult,
+    account_path,
+    address_for,
+    hash160,
+)
+from journal import JournalStore
+from ledger import Ledger, format_amount, from_atomic, to_atomic
+from metrics import Labels, Metrics, Sample
+from monero import MONERO_COIN_TYPE, MoneroKeys
+from pending import BROADCAST, CANCELLED, CONFIRMED, FAILED, PENDING_STATES, STAGED, HistoryPage, PendingRecord, PendingStore, RetentionPolicy
+from seed import MasterSeed, SeedVault, mnemonic_indices, normalize_mnemonic
+
+if TYPE_CHECKING:
+    from node_router import NodeRouter
+
+
+# Entry points wrapped with call counters and latency histograms when metrics are on.
+INSTRUMENTED_METHODS = (
+    "set_profile",
+    "estimate_fee",
+    "validate_transaction",
+    "send_transaction",
+    "update_transaction_state",
+    "refresh_balances",
+    "validate_batch",
+    "prepare_batch",
+    "list_transactions",
+)
+
+# Message prefix -> reason label for validation-failure counters.
+_NOT_A_NUMBER = "{} must be a finite number."
+_FEE_ROUNDS = 4
+_FAILURE_REASONS = (
+    ("Amount", "amount"),
+    ("Fee", "fee_bounds"),
+    ("Insufficient", "balance"),
+    ("Configure a trusted node", "node"),
+)
 
 
 @dataclass
 class WalletAccount:
-    """Lightweight representation of a wallet account for a single coin."""
+    """Lightweight representation of a wallet account for a single coin.
+
+    The balance lives in the engine's integer :class:`Ledger`; this view only
+    knows which asset and sub-account to read.
+    """
 
     coin: str
+    symbol: str
     address: str
-    balance: float
-    pending: List[str] = field(default_factory=list)
+    ledger: Ledger = field(repr=False, compare=False)
+    pending: PendingStore = field(repr=False, compare=False)
+    ledger_index: int = 0
+
+    @property
+    def balance_units(self) -> int:
+        return self.ledger.balance(self.symbol, self.ledger_index)
+
+    @property
+    def balance(self) -> Decimal:
+        return from_atomic(self.symbol, self.balance_units)
 
 
 @dataclass
@@ -25,12 +96,36 @@ class NodeConfig:
         return f"{scheme}://{self.rpc_address}"
 
 
+@dataclass
+class PayoutBatch:
+    """Outcome of validating or preparing a columnar payout run for one asset.
+
+    ``errors`` is sparse: only failing rows (by zero-based index) get an entry,
+    so a clean run of any size allocates no per-row messages. ``batch_errors``
+    holds problems that apply to the whole run, such as a missing node. Totals
+    are in atomic units.
+    """
+
+    symbol: str
+    row_count: int
+    total_amount: int
+    total_fee: int
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+    batch_errors: List[str] = field(default_factory=list)
+    tx_ids: List[str] = field(default_factory=list)
+
+    @property
+    def accepted(self) -> bool:
+        return not self.errors and not self.batch_errors
+
+
 @dataclass
 class WalletProfile:
     """Represents the locally held seed material and display name."""
 
     name: str
-    seed_phrase: str
+    seed_phrase: str = field(repr=False)
+    master: Optional[MasterSeed] = field(default=None, repr=False, compare=False)
 
 
 class WalletEngine:
@@ -44,55 +139,227 @@ class WalletEngine:
 
     The APIs are structured for production readiness: profile and node
     configuration must be loaded explicitly, validations are deterministic, and
-    no network I/O is performed in this module.
+    no network I/O is performed in this module; node traffic goes through the
+    :class:`NodeRouter` built by :meth:`node_router`.
+
+    When a :class:`JournalStore` is supplied, every mutation is applied through
+    an ``_apply_*`` handler and appended to the journal, and startup replays the
+    latest snapshot plus the journal tail through the same handlers. Seed
+    phrases are never written; only the wallet name is journaled so it can be
+    offered again after a restart.
+
+    The engine is safe to share between threads. Each account has its own
+    lock, held across the whole read-validate-commit sequence of a spend, so
+    two senders on one account are serialized and cannot both pass the
+    balance check or select the same coins, while different accounts
+    proceed independently. ``_commit`` additionally holds a short engine-wide
+    lock around apply-and-append, so journal order always matches the order
+    mutations were applied and snapshots never see a half-applied one.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        pending_retention: Optional[RetentionPolicy] = None,
+        journal: Optional[JournalStore] = None,
+        metrics: Optional[Metrics] = None,
+        seed_vault: Optional[SeedVault] = None,
+        address_index: Optional[AddressIndex] = None,
+        metric_labels: Labels = (),
+    ) -> None:
+        self._seeds = seed_vault or SeedVault()
+        self._owns_seeds = seed_vault is None
+        self._profile_lock = threading.RLock()
+        self._commit_lock = threading.Lock()
+        self._keychain: Optional[KeyChain] = None
+        self._monero_keys: Optional[MoneroKeys] = None
+        self._addresses = address_index if address_index is not None else AddressIndex()
+        self._syncs: List[Any] = []
         self._profile: Optional[WalletProfile] = None
+        self._profile_hint: Optional[str] = None
+        self._ledger = Ledger()
         self._accounts: Dict[str, WalletAccount] = {
             "LTC": WalletAccount(
                 coin="Litecoin",
+                symbol="LTC",
                 address="ltc1qd0mainsignalsample000000000000",
-                balance=12.5,
+                ledger=self._ledger,
+                pending=PendingStore("LTC", pending_retention),
             ),
             "XMR": WalletAccount(
                 coin="Monero",
+                symbol="XMR",
                 address="48ExampleMoneroAddressPlaceholderMain00000000",
-                balance=8.0,
+                ledger=self._ledger,
+                pending=PendingStore("XMR", pending_retention),
             ),
         }
-        self._node_configs: Dict[str, NodeConfig] = {}
+        self._account_locks = {symbol: threading.RLock() for symbol in self._accounts}
+        for symbol in self._accounts:
+            self._ledger.open(symbol)
+        self._ledger.credit("LTC", to_atomic("LTC", "12.5"))
+        self._ledger.credit("XMR", to_atomic("XMR", "8.0"))
+        self._node_configs: Dict[str, List[NodeConfig]] = {}
+        # Endpoint health per asset, shared by every router the engine builds.
+        self._node_health: Dict[str, Dict[str, Any]] = {symbol: {} for symbol in self._accounts}
         self._fee_bounds: Dict[str, Tuple[float, float]] = {
             "LTC": (0.0001, 0.01),
             "XMR": (0.00005, 0.02),
         }
+        self._fee_limits: Dict[str, Tuple[int, int]] = {
+            symbol: (to_atomic(symbol, lower), to_atomic(symbol, upper))
+            for symbol, (lower, upper) in self._fee_bounds.items()
+        }
+        # Coin selection applies to UTXO-based assets once their index holds coins;
+        # Monero's owned outputs, found by the view-key scanner, are tracked the same way.
+        self._utxos: Dict[str, UtxoIndex] = {"LTC": UtxoIndex(), "XMR": UtxoIndex()}
+        # Derivation path of each owned LTC output, so an exported PSBT can say what it spends.
+        self._utxo_paths: Dict[str, Dict[Tuple[str, int], Path]] = {"LTC": {}}
+        self._fee_estimators: Dict[str, FeeEstimator] = {
+            symbol: FeeEstimator(FEE_PROFILES[symbol]) for symbol in self._accounts
+        }
+        self._journal = journal
+        if journal is not None:
+            self._restore()
+        self.metrics = metrics
+        self._metric_labels = tuple(metric_labels)
+        if metrics is not None:
+            self._instrument(metrics)
 
     # Wallet identity management
     def has_profile(self) -> bool:
         return self._profile is not None
 
-    def set_profile(self, name: str, seed_phrase: str) -> WalletProfile:
+    def set_profile(self, name: str, seed_phrase: str, passphrase: str = "") -> WalletProfile:
+        """Load a wallet from a BIP-39 mnemonic, checksum included.
+
+        The PBKDF2 stretch runs in the seed vault's worker process and is
+        cached for the session, so reloading the same wallet is instant.
+        """
+
         cleaned_name = name.strip()
-        cleaned_seed = " ".join(seed_phrase.strip().split())
+        cleaned_seed = normalize_mnemonic(seed_phrase)
 
         if not cleaned_name:
             raise ValueError("Wallet name is required.")
+        mnemonic_indices(cleaned_seed)
 
-        words = cleaned_seed.split()
-        word_count = len(words)
-        if word_count < 12 or word_count > 24:
-            raise ValueError("Seed phrase must contain between 12 and 24 words.")
-        if any(not word.isalpha() for word in words):
-            raise ValueError("Seed phrase should contain only alphabetic words.")
-
-        self._profile = WalletProfile(name=cleaned_name, seed_phrase=cleaned_seed)
-        return self._profile
+        master = self._seeds.derive(cleaned_seed, passphrase)
+        with self._profile_lock:
+            same_keys = self._profile is not None and self._profile.master is master
+            self._profile = WalletProfile(name=cleaned_name, seed_phrase=cleaned_seed, master=master)
+            if self._keychain is None or not same_keys:
+                root = ExtendedKey.from_master(master.master_key, master.master_chain_code)
+                self._keychain = KeyChain(root)
+                self._monero_keys = None
+                for symbol in COIN_TYPES:
+                    self._accounts[symbol].address = self.receive_address(symbol)
+                    # Sends pay change to m/.../1/0; sync has to recognize it.
+                    self.receive_address(symbol, change=True)
+                self._accounts["XMR"].address = self._monero_address()
+            self._commit("profile", {"name": cleaned_name})
+            return self._profile
 
     def get_profile(self) -> WalletProfile:
         if not self._profile:
             raise ValueError("No wallet profile is loaded.")
         return self._profile
 
+    def master_seed(self) -> MasterSeed:
+        """Cached BIP-39 seed and BIP-32 master key of the loaded wallet."""
+
+        master = self.get_profile().master
+        if master is None or master.wiped:
+            raise ValueError("Wallet keys have been cleared; load the wallet again.")
+        return master
+
+    # Address derivation
+    def receive_address(self, symbol: str, index: int = 0, change: bool = False) -> str:
+        """BIP-84 address ``m/84'/coin'/0'/change/index`` of the loaded wallet.
+
+        Interior keys are cached, so walking consecutive indices costs one
+        child derivation each.
+        """
+
+        path = account_path(symbol) + (int(change), index)
+        with self._profile_lock:
+            address = address_for(symbol, self._require_keychain().derive(path).public_bytes)
+            self._addresses.add_address(symbol, address, 0, path)
+        return address
+
+    def scan_addresses(
+        self,
+        symbol: str,
+        is_used: Callable[[Sequence[str]], Iterable[str]],
+        gap_limit: int = 20,
+        change: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> ScanResult:
+        """Gap-limit scan of one account chain, deriving windows in a process pool.
+
+        ``is_used`` receives each window of addresses and returns those seen
+        on chain; the scan stops after ``gap_limit`` consecutive unused ones.
+        """
+
+        base = account_path(symbol)
+        with self._profile_lock:
+            account = self._require_keychain().derive(base)
+        scanner = GapLimitScanner(account.neuter(), is_used, symbol, gap_limit=gap_limit, executor=executor)
+        result = scanner.scan(int(change))
+        with self._profile_lock:
+            for index, address in result.used.items():
+                self._addresses.add_address(symbol, address, 0, base + (int(change), index))
+        return result
+
+    def monero_keys(self) -> MoneroKeys:
+        """Monero spend/view keys of the loaded wallet.
+
+        Derived from the BIP-32 key at ``m/44'/128'/0'`` (spend key =
+        ``sc_reduce32(Keccak(k))``, view key from the spend key as Monero
+        does), so one BIP-39 phrase backs both assets.
+        """
+
+        with self._profile_lock:
+            keychain = self._require_keychain()
+            if self._monero_keys is None:
+                node = keychain.derive((44 + HARDENED, MONERO_COIN_TYPE + HARDENED, HARDENED))
+                assert node.private is not None
+                self._monero_keys = MoneroKeys.from_bip32_key(node.private)
+            return self._monero_keys
+
+    def _monero_address(self) -> str:
+        address = self.monero_keys().address()
+        with self._profile_lock:
+            self._addresses.add_address("XMR", address, 0, (44 + HARDENED, MONERO_COIN_TYPE + HARDENED, HARDENED))
+        return address
+
+    @property
+    def address_index(self) -> AddressIndex:
+        return self._addresses
+
+    def match_script(self, script: bytes) -> Optional[AddressEntry]:
+        """Which owned address, if any, an output script or address pays."""
+
+        return self._addresses.match(script)
+
+    def _account_lock(self, symbol: str) -> "threading.RLock":
+        if symbol not in self._account_locks:
+            raise KeyError(f"Unsupported asset: {symbol}")
+        return self._account_locks[symbol]
+
+    def _require_keychain(self) -> KeyChain:
+        self.master_seed()
+        assert self._keychain is not None
+        return self._keychain
+
+    def last_profile_name(self) -> Optional[str]:
+        """Wallet name from the most recent session recorded in the journal."""
+
+        return self._profile_hint
+
+    @property
+    def ledger(self) -> Ledger:
+        return self._ledger
+
     def list_accounts(self) -> List[WalletAccount]:
         return list(self._accounts.values())
 
@@ -102,6 +369,51 @@ class WalletEngine:
         return self._accounts[symbol]
 
     def set_node(self, symbol: str, rpc_address: str, tls: bool = True) -> NodeConfig:
+        """Make ``rpc_address`` the only endpoint for ``symbol``."""
+
+        clean_address = self._clean_endpoint(symbol, rpc_address)
+        return self._commit(
+            "node", {"symbol": symbol, "rpc_address": clean_address, "tls": bool(tls)}
+        )
+
+    def add_node(self, symbol: str, rpc_address: str, tls: bool = True) -> NodeConfig:
+        """Register an additional endpoint for ``symbol`` alongside the existing ones."""
+
+        clean_address = self._clean_endpoint(symbol, rpc_address)
+        if any(node.rpc_address == clean_address for node in self.get_nodes(symbol)):
+            raise ValueError(f"{clean_address} is already configured for {symbol}.")
+        return self._commit(
+            "node_add", {"symbol": symbol, "rpc_address": clean_address, "tls": bool(tls)}
+        )
+
+    def remove_node(self, symbol: str, rpc_address: str) -> None:
+        if not any(node.rpc_address == rpc_address for node in self.get_nodes(symbol)):
+            raise KeyError(f"No {symbol} node at {rpc_address}")
+        self._commit("node_remove", {"symbol": symbol, "rpc_address": rpc_address})
+
+    def get_node(self, symbol: str) -> Optional[NodeConfig]:
+        """Primary endpoint for ``symbol``: the first one registered."""
+
+        nodes = self._node_configs.get(symbol)
+        return nodes[0] if nodes else None
+
+    def get_nodes(self, symbol: str) -> List[NodeConfig]:
+        return list(self._node_configs.get(symbol, ()))
+
+    def node_router(self, symbol: str, **options: Any) -> "NodeRouter":
+        """A :class:`NodeRouter` over every endpoint configured for ``symbol``.
+
+        Routers share the engine's per-asset endpoint health, so latency
+        history and ejections carry over between sync runs. Build one per
+        event loop; ``options`` are passed to the router.
+        """
+
+        from node_router import NodeRouter  # node_router imports NodeConfig from here
+
+        self.get_account(symbol)
+        return NodeRouter(self.get_nodes(symbol), health=self._node_health[symbol], **options)
+
+    def _clean_endpoint(self, symbol: str, rpc_address: str) -> str:
         if symbol not in self._accounts:
             raise KeyError(f"Unsupported asset: {symbol}")
 
@@ -112,18 +424,55 @@ class WalletEngine:
             host, _, port = clean_address.partition(":")
             if not host or not port.isdigit():
                 raise ValueError("Node endpoint must use host:port form without a scheme.")
+        return clean_address
 
-        node = NodeConfig(symbol=symbol, rpc_address=clean_address, tls=bool(tls))
-        self._node_configs[symbol] = node
-        return node
+    def get_fee_estimator(self, symbol: str) -> FeeEstimator:
+        self.get_account(symbol)
+        return self._fee_estimators[symbol]
 
-    def get_node(self, symbol: str) -> Optional[NodeConfig]:
-        return self._node_configs.get(symbol)
+    def estimate_fee(self, symbol: str, amount: float, target_blocks: int = 2) -> float:
+        """Suggest a fee in coins, clamped to the asset's fee bounds.
+
+        Uses the mempool estimator once it has been fed data; until then the fee
+        is proportional to ``amount``.
+        """
 
-    def estimate_fee(self, symbol: str, amount: float) -> float:
         lower, upper = self._fee_bounds[symbol]
-        proportional = amount * 0.001
-        return min(max(proportional, lower), upper)
+        estimator = self._fee_estimators[symbol]
+        with self._account_lock(symbol):
+            if estimator.has_data:
+                suggested = float(from_atomic(symbol, estimator.fee_for(target=target_blocks)))
+            else:
+                suggested = amount * 0.001
+        return min(max(suggested, lower), upper)
+
+    def refresh_mempool(self, symbol: str) -> int:
+        """Feed ``symbol``'s fee estimator from the configured nodes' mempool.
+
+        Returns the number of mempool transactions now tracked. Node errors
+        surface as :class:`ValueError`.
+        """
+
+        from node_client import NodeRPCError
+
+        router = self.node_router(symbol)
+
+        async def fetch() -> Any:
+            try:
+                if symbol == "XMR":
+                    return await router.post("/get_transaction_pool", {})
+                return await router.call("getrawmempool", [True])
+            finally:
+                await router.close()
+
+        try:
+            entries = parse_mempool(symbol, asyncio.run(fetch()))
+        except NodeRPCError as exc:
+            raise ValueError(f"Could not read the {symbol} mempool: {exc}") from exc
+        estimator = self._fee_estimators[symbol]
+        with self._account_lock(symbol):
+            estimator.sync_mempool(entries)
+            return len(estimator)
 
     def validate_transaction(
         self, symbol: str, address: str, amount: float, fee: float
@@ -131,21 +480,28 @@ class WalletEngine:
         errors: List[str] = []
         account = self.get_account(symbol)
         lower, upper = self._fee_bounds[symbol]
+        fee_floor, fee_ceiling = self._fee_limits[symbol]
+        amount_units = _atomic_or_none(symbol, amount)
+        fee_units = _atomic_or_none(symbol, fee)
 
-        if amount <= 0:
+        if amount_units is None:
+            errors.append(_NOT_A_NUMBER.format("Amount"))
+        elif amount_units <= 0:
             errors.append("Amount must be greater than zero.")
-        if fee < lower or fee > upper:
+        if fee_units is None:
+            errors.append(_NOT_A_NUMBER.format("Fee"))
+        elif fee_units < fee_floor or fee_units > fee_ceiling:
             errors.append(
                 f"Fee must be between {lower} and {upper} {symbol.lower()} for predictable costs."
             )
-        if amount + fee > account.balance:
-            errors.append("Insufficient balance for amount plus fee.")
-        if not address:
-            errors.append("Destination address is required.")
-        elif symbol == "LTC" and not address.lower().startswith("l"):
-            errors.append("Litecoin addresses typically start with l, L, or m.")
-        elif symbol == "XMR" and address[0] not in {"4", "8"}:
-            errors.append("Monero addresses usually start with 4 or 8.")
+        if amount_units is not None and fee_units is not None:
+            with self._account_lock(symbol):
+                spendable = self._spendable_units(account)
+            if amount_units + fee_units > spendable:
+                errors.append("Insufficient balance for amount plus fee.")
+        address_message = address_error(symbol, address)
+        if address_message:
+            errors.append(address_message)
 
         node_configured = self.get_node(symbol)
         if not node_configured:
@@ -156,23 +512,704 @@ class WalletEngine:
     def send_transaction(
         self, symbol: str, address: str, amount: float, fee: float, note: str
     ) -> str:
-        if not self._profile:
-            raise ValueError("Load a wallet name and seed phrase before sending.")
+        with self._account_lock(symbol):
+            if not self._profile:
+                raise ValueError("Load a wallet name and seed phrase before sending.")
+
+            account = self.get_account(symbol)
+            errors = self.validate_transaction(symbol, address, amount, fee)
+            if errors:
+                raise ValueError("; ".join(errors))
+
+            amount_units = to_atomic(symbol, amount)
+            fee_units = to_atomic(symbol, fee)
+            payload = {
+                "symbol": symbol,
+                "address": address,
+                "amount": amount_units,
+                "fee": fee_units,
+                "note": note,
+                "at": time.time(),
+            }
+            payload.update(self._select_inputs(symbol, amount_units, fee_units, outputs=1))
+            return self._commit("send", payload).tx_id
+
+    def get_transaction(self, symbol: str, tx_id: str) -> PendingRecord:
+        return self.get_account(symbol).pending.get(tx_id)
+
+    def list_transactions(
+        self,
+        symbol: str,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "created",
+        descending: bool = True,
+        state: Optional[str] = None,
+        query: str = "",
+    ) -> HistoryPage:
+        """Page through an account's history, sorted and filtered by the store."""
+
+        with self._account_lock(symbol):
+            return self.get_account(symbol).pending.page(offset, limit, sort, descending, state, query)
+
+    def update_transaction_state(self, symbol: str, tx_id: str, state: str) -> PendingRecord:
+        """Advance a prepared transaction; failed or cancelled sends are refunded.
+
+        Rows of a payout batch are one spend, so the whole batch moves together.
+        """
+
+        with self._account_lock(symbol):
+            record = self.get_transaction(symbol, tx_id)
+            if state in (FAILED, CANCELLED):
+                leader = self.get_account(symbol).pending.batch_of(record)[0]
+                utxos = self._utxos.get(symbol)
+                if leader.change and utxos is not None and (leader.tx_id, 1) not in utxos:
+                    raise ValueError(
+                        f"The change of {tx_id} is spent by a later send; cancel that send first."
+                    )
+            return self._commit(
+                "state", {"symbol": symbol, "tx_id": tx_id, "state": state, "at": time.time()}
+            )
+
+    def broadcast_transaction(self, symbol: str, tx_id: str, raw_hex: str) -> PendingRecord:
+        """Relay the signed form of a staged transaction and mark it broadcast.
+
+        The transaction goes to the best configured node and fails over to the
+        others; node errors surface as :class:`ValueError`.
+        """
+
+        from node_client import NodeRPCError
+
+        record = self.get_transaction(symbol, tx_id)
+        if record.state != STAGED:
+            raise ValueError(f"Only staged transactions can be broadcast; {tx_id} is {record.state}.")
+        try:
+            bytes.fromhex(raw_hex)
+        except ValueError:
+            raise ValueError("Signed transaction must be hex encoded.") from None
+        router = self.node_router(symbol)
+
+        async def relay() -> None:
+            try:
+                await router.broadcast(raw_hex)
+            finally:
+                await router.close()
+
+        try:
+            asyncio.run(relay())
+        except NodeRPCError as exc:
+            raise ValueError(f"Broadcast failed: {exc}") from exc
+        return self.update_transaction_state(symbol, tx_id, BROADCAST)
+
+    def get_utxos(self, symbol: str) -> UtxoIndex:
+        self.get_account(symbol)
+        if symbol not in self._utxos:
+            raise KeyError(f"{symbol} does not use unspent outputs.")
+        return self._utxos[symbol]
+
+    def add_utxo(
+        self, symbol: str, txid: str, vout: int, value: int, path: Optional[Sequence[int]] = None
+    ) -> None:
+        """Register a received output worth ``value`` atomic units and credit it.
+
+        ``path`` is the derivation path of the address it pays, when known.
+        """
+
+        with self._account_lock(symbol):
+            if (txid, vout) in self.get_utxos(symbol):
+                return
+            payload: Dict[str, Any] = {"symbol": symbol, "txid": txid, "vout": vout, "value": value}
+            if path is not None:
+                payload["path"] = list(path)
+            self._commit("utxo", payload)
+
+    def utxo_path(self, symbol: str, txid: str, vout: int) -> Optional[Path]:
+        """Derivation path recorded for an owned output, if any."""
+
+        return self._utxo_paths.get(symbol, {}).get((txid, vout))
+
+    def spend_utxo(self, symbol: str, txid: str, vout: int) -> None:
+        """Drop an output that was spent outside this engine and debit it."""
+
+        with self._account_lock(symbol):
+            if (txid, vout) not in self.get_utxos(symbol):
+                raise KeyError(f"Unknown or already spent output {txid}:{vout}")
+            self._commit("utxo_spent", {"symbol": symbol, "txid": txid, "vout": vout})
+
+    def pending_inputs(self, symbol: str) -> Dict[Tuple[str, int], str]:
+        """Outpoint -> tx_id of the staged or broadcast send that spends it."""
+
+        with self._account_lock(symbol):
+            return {
+                (txid, vout): record.tx_id
+                for record in self.get_account(symbol).pending.active()
+                for txid, vout, _ in record.inputs
+            }
+
+    def settle_spend(
+        self, symbol: str, tx_id: str, txid: str, outputs: Sequence[Tuple[int, bytes, int]]
+    ) -> PendingRecord:
+        """Confirm our send ``tx_id``, seen on chain as ``txid``.
+
+        ``outputs`` are the chain transaction's ``(vout, script, value)``. Its
+        change output replaces the ``(tx_id, 1)`` placeholder coin without
+        touching the ledger, so a sync does not credit the change twice.
+        """
+
+        with self._account_lock(symbol):
+            record = self.get_transaction(symbol, tx_id)
+            change_vout = None
+            if record.change:
+                _, change_script = self._change_output(symbol)
+                for vout, script, value in outputs:
+                    if script == change_script and value == record.change:
+                        change_vout = vout
+                        break
+            return self._commit(
+                "settle",
+                {"symbol": symbol, "tx_id": tx_id, "txid": txid, "change_vout": change_vout, "at": time.time()},
+            )
+
+    def set_balance(self, symbol: str, units: int, index: int = 0) -> None:
+        """Record an authoritative balance, in atomic units, for a sub-account."""
+
+        with self._account_lock(symbol):
+            self.get_account(symbol)
+            if units < 0:
+                raise ValueError("Balance cannot be negative.")
+            self._commit("balance", {"symbol": symbol, "units": units, "index": index})
+
+    def attach_sync(self, sync: Any) -> None:
+        """Register a chain sync (``ltc_sync.FilterSync``, ``xmr_scan.MoneroScanner``) for :meth:`refresh_balances`."""
+
+        self._syncs.append(sync)
+
+    def refresh_balances(self, mempool: bool = True) -> None:
+        """Catch up every attached chain sync, then refresh fee estimates.
+
+        Each sync credits and debits coins through the journaled UTXO
+        operations, so the ledger is current when this returns. Without an
+        attached sync there is nothing to fetch and the ledger is already
+        exact. With ``mempool`` on, every asset with a configured node also
+        gets :meth:`refresh_mempool`.
+        """
+
+        for sync in self._syncs:
+            sync.run_blocking()
+        if mempool:
+            for symbol in self._accounts:
+                if self.get_nodes(symbol):
+                    self.refresh_mempool(symbol)
+
+    # Batch payouts
+    def validate_batch(
+        self,
+        symbol: str,
+        addresses: Sequence[str],
+        amounts: Sequence[float],
+        fees: Sequence[float],
+    ) -> PayoutBatch:
+        """Validate a payout run given as parallel columns.
+
+        Each rule runs as one pass over its column with the account, fee bounds
+        and node lookups hoisted out of the loop. Balance is checked against the
+        running total of ``amount + fee`` so the row that first overdraws the
+        account, and every row after it, is reported.
+        """
+
+        with self._account_lock(symbol):
+            batch, _, _ = self._validate_batch(symbol, addresses, amounts, fees)
+            return batch
+
+    def prepare_batch(
+        self,
+        symbol: str,
+        addresses: Sequence[str],
+        amounts: Sequence[float],
+        fees: Sequence[float],
+        notes: Optional[Sequence[str]] = None,
+    ) -> PayoutBatch:
+        """Validate a payout run and stage it atomically.
+
+        Either every row is staged and the account is debited once for the
+        whole run, or nothing changes and the returned batch carries the
+        per-row errors.
+        """
+
+        with self._account_lock(symbol):
+            if not self._profile:
+                raise ValueError("Load a wallet name and seed phrase before sending.")
+            if notes is not None and len(notes) != len(addresses):
+                raise ValueError("Payout columns must all have the same length.")
+
+            batch, amount_units, fee_units = self._validate_batch(symbol, addresses, amounts, fees)
+            if not batch.accepted:
+                return batch
+
+            payload = {
+                "symbol": symbol,
+                "addresses": list(addresses),
+                "amounts": amount_units,
+                "fees": fee_units,
+                "notes": list(notes) if notes is not None else [""] * batch.row_count,
+                "at": time.time(),
+            }
+            selected = self._select_inputs(symbol, batch.total_amount, batch.total_fee, outputs=batch.row_count)
+            extra = selected.pop("fee") - batch.total_fee
+            if extra:
+                # A bigger spend or a changeless surplus is paid as fee on the first row.
+                fee_units = list(fee_units)
+                fee_units[0] += extra
+                payload["fees"] = fee_units
+                batch.total_fee += extra
+            payload.update(selected)
+            records = self._commit("batch", payload)
+            batch.tx_ids = [record.tx_id for record in records]
+            return batch
+
+    def _validate_batch(
+        self,
+        symbol: str,
+        addresses: Sequence[str],
+        amounts: Sequence[float],
+        fees: Sequence[float],
+    ) -> Tuple[PayoutBatch, List[int], List[int]]:
+        row_count = len(addresses)
+        if len(amounts) != row_count or len(fees) != row_count:
+            raise ValueError("Payout columns must all have the same length.")
 
         account = self.get_account(symbol)
-        errors = self.validate_transaction(symbol, address, amount, fee)
-        if errors:
-            raise ValueError("; ".join(errors))
-
-        account.balance -= amount + fee
-        tx_id = f"{symbol.lower()}-{len(account.pending) + 1:04d}"
-        summary = f"{symbol} send {amount:.8f} to {address} (fee {fee:.8f})"
-        if note:
-            summary += f" — {note}"
-
-        account.pending.append(summary)
-        return tx_id
-
-    def refresh_balances(self) -> None:
-        for account in self._accounts.values():
-            account.balance = round(account.balance, 8)
+        lower, upper = self._fee_bounds[symbol]
+        fee_floor, fee_ceiling = self._fee_limits[symbol]
+        balance = self._spendable_units(account)
+        parsed_amounts = [_atomic_or_none(symbol, amount) for amount in amounts]
+        parsed_fees = [_atomic_or_none(symbol, fee) for fee in fees]
+        errors: Dict[int, List[str]] = {}
+
+        def flag(rows: Iterable[int], message: str) -> None:
+            for row in rows:
+                errors.setdefault(row, []).append(message)
+
+        flag((row for row, amount in enumerate(parsed_amounts) if amount is None), _NOT_A_NUMBER.format("Amount"))
+        flag(
+            (row for row, amount in enumerate(parsed_amounts) if amount is not None and amount <= 0),
+            "Amount must be greater than zero.",
+        )
+        flag((row for row, fee in enumerate(parsed_fees) if fee is None), _NOT_A_NUMBER.format("Fee"))
+        flag(
+            (
+                row
+                for row, fee in enumerate(parsed_fees)
+                if fee is not None and (fee < fee_floor or fee > fee_ceiling)
+            ),
+            f"Fee must be between {lower} and {upper} {symbol.lower()} for predictable costs.",
+        )
+        # Unreadable rows are already flagged; they count as zero in the totals.
+        amount_units = [amount or 0 for amount in parsed_amounts]
+        fee_units = [fee or 0 for fee in parsed_fees]
+        spend = accumulate(map(add, amount_units, fee_units))
+        flag(
+            (row for row, running in enumerate(spend) if running > balance),
+            "Insufficient balance for amount plus fee.",
+        )
+        for row, message in validate_addresses(symbol, addresses).items():
+            errors.setdefault(row, []).append(message)
+
+        batch_errors: List[str] = []
+        if not self.get_node(symbol):
+            batch_errors.append("Configure a trusted node endpoint before broadcasting.")
+
+        batch = PayoutBatch(
+            symbol=symbol,
+            row_count=row_count,
+            total_amount=sum(amount_units),
+            total_fee=sum(fee_units),
+            errors=dict(sorted(errors.items())),
+            batch_errors=batch_errors,
+        )
+        return batch, amount_units, fee_units
+
+    # Offline signing
+    def export_prepared(self, stream: BinaryIO, symbol: str, states: Sequence[str] = (STAGED,)) -> int:
+        """Stream an account's prepared transactions to ``stream`` as a ``tx_container``.
+
+        Litecoin spends become BIP-174 PSBTs, Monero spends unsigned sets.
+        A payout batch is one spend, so its rows share a single record.
+        Returns the number of records written.
+        """
+
+        # Only exports need the container code, so a daemon or GUI start skips it.
+        from tx_container import ContainerWriter, transaction_id
+
+        with self._account_lock(symbol):
+            account = self.get_account(symbol)
+            batches: Dict[str, List[PendingRecord]] = {}
+            for record in account.pending:
+                batches.setdefault(record.batch or record.tx_id, []).append(record)
+            # A batch whose first row was pruned is finished and has lost its inputs.
+            groups = [group for key, group in batches.items() if group[0].tx_id == key]
+            # Change is keyed by our tx_id until sync sees it on chain; the
+            # unsigned transaction fixes its real txid, and groups are in
+            # creation order, so every parent is built before its children.
+            txids: Dict[str, str] = {}
+            change_output = None
+            if symbol != "XMR" and any(group[0].change for group in groups):
+                change_output = self._change_output(symbol)
+            writer = ContainerWriter(stream)
+            for group in groups:
+                leader = group[0]
+                exported = leader.state in states
+                if symbol == "XMR":
+                    if exported:
+                        payload = self._xmr_unsigned_set(group)
+                else:
+                    tx, payload = self._ltc_psbt(symbol, group, txids, change_output, exported)
+                    if leader.change:
+                        txids[leader.tx_id] = transaction_id(tx)
+                if exported:
+                    note = "\n".join(record.note for record in group if record.note)
+                    writer.write(symbol, leader.tx_id, leader.created_at, note, payload)
+            writer.close()
+            return writer.count
+
+    def _ltc_psbt(
+        self,
+        symbol: str,
+        group: Sequence[PendingRecord],
+        txids: Dict[str, str],
+        change_output: Optional[Tuple[Tuple[bytes, bytes, Path], bytes]],
+        build: bool,
+    ) -> Tuple[bytes, bytes]:
+        from tx_container import PsbtInput, build_psbt, unsigned_transaction
+
+        leader = group[0]
+        inputs = [(txids.get(txid, txid), vout) for txid, vout, _ in leader.inputs]
+        outputs = []
+        for record in group:
+            script = output_script(symbol, record.address)
+            if script is None:
+                raise ValueError(f"Cannot build an output script for {record.address}.")
+            outputs.append((record.amount, script))
+        change_derivation = None
+        if leader.change:
+            assert change_output is not None
+            change_derivation, change_script = change_output
+            outputs.append((leader.change, change_script))
+        tx = unsigned_transaction(inputs, outputs)
+        if not build:
+            return tx, b""
+        psbt_inputs = []
+        for txid, vout, value in leader.inputs:
+            path = self._utxo_paths[symbol].get((txid, vout))
+            if path is None:
+                # Credited without a path (a bare add_utxo); the signer gets the value only.
+                psbt_inputs.append(PsbtInput(value))
+            else:
+                derivation, script = self._derived_output(path)
+                psbt_inputs.append(PsbtInput(value, script, derivation))
+        return tx, build_psbt(tx, psbt_inputs, len(outputs), change_derivation)
+
+    def _change_output(self, symbol: str) -> Tuple[Tuple[bytes, bytes, Path], bytes]:
+        """Derivation and P2WPKH script of the change address ``m/84'/coin'/0'/1/0``."""
+
+        return self._derived_output(account_path(symbol) + (1, 0))
+
+    def _derived_output(self, path: Path) -> Tuple[Tuple[bytes, bytes, Path], bytes]:
+        """``(public key, master fingerprint, path)`` and P2WPKH script of the key at ``path``."""
+
+        with self._profile_lock:
+            keychain = self._require_keychain()
+            node = keychain.derive(path)
+            return (node.public_bytes, keychain.master.fingerprint, path), b"\x00\x14" + hash160(node.public_bytes)
+
+    def _xmr_unsigned_set(self, group: Sequence[PendingRecord]) -> bytes:
+        from tx_container import build_xmr_set
+
+        leader = group[0]
+        for txid, index, _ in leader.inputs:
+            if txid in self._accounts["XMR"].pending:
+                raise ValueError(f"Transaction {leader.tx_id} spends change of unsigned transaction {txid}.")
+        destinations = [(record.address, record.amount) for record in group]
+        fee = sum(record.fee for record in group)
+        return build_xmr_set(destinations, fee, leader.inputs, leader.change, self._monero_address())
+
+    # Instrumentation
+    def _instrument(self, metrics: Metrics) -> None:
+        """Shadow the hot entry points with instrumented wrappers on this instance.
+
+        With metrics off nothing is wrapped, so the disabled path costs nothing.
+        Every series carries the engine's ``metric_labels``, so engines sharing
+        one :class:`Metrics` (see ``registry``) stay apart.
+        """
+
+        extra = self._metric_labels
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, metrics.instrument(name, getattr(self, name), extra))
+        validate_transaction = self.validate_transaction
+        validate_batch = self.validate_batch
+
+        def counted_transaction(*args: Any, **kwargs: Any) -> List[str]:
+            errors = validate_transaction(*args, **kwargs)
+            for message in errors:
+                metrics.inc("validation_failures_total", (("reason", _failure_reason(message)),) + extra)
+            return errors
+
+        def counted_batch(*args: Any, **kwargs: Any) -> PayoutBatch:
+            batch = validate_batch(*args, **kwargs)
+            reasons: Dict[str, int] = {}
+            for messages in batch.errors.values():
+                for message in messages:
+                    reason = _failure_reason(message)
+                    reasons[reason] = reasons.get(reason, 0) + 1
+            for message in batch.batch_errors:
+                reason = _failure_reason(message)
+                reasons[reason] = reasons.get(reason, 0) + 1
+            for reason, count in reasons.items():
+                metrics.inc("validation_failures_total", (("reason", reason),) + extra, count)
+            return batch
+
+        self.validate_transaction = counted_transaction
+        self.validate_batch = counted_batch
+        metrics.add_collector(self._collect_gauges)
+
+    def _collect_gauges(self) -> Iterable[Sample]:
+        extra = self._metric_labels
+        for symbol, account in self._accounts.items():
+            asset = ("asset", symbol)
+            for state in PENDING_STATES:
+                yield "pending_depth", (asset, ("state", state)) + extra, account.pending.count(state)
+            yield "mempool_transactions", (asset,) + extra, len(self._fee_estimators[symbol])
+            if symbol in self._utxos:
+                yield "utxos", (asset,) + extra, len(self._utxos[symbol])
+
+    # Persistence
+    def flush(self) -> None:
+        """Make every journaled mutation durable now instead of at the next group commit."""
+
+        if self._journal is not None:
+            with self._commit_lock:
+                self._journal.commit()
+
+    def close(self) -> None:
+        if self.metrics is not None:
+            self.metrics.remove_collector(self._collect_gauges)
+        if self._keychain is not None:
+            self._keychain.clear()
+            self._keychain = None
+        self._monero_keys = None
+        if self._owns_seeds:
+            self._seeds.close()
+        if self._journal is not None:
+            self._journal.close()
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        return {
+            "profile": self._profile_hint,
+            "ledger": {symbol: list(self._ledger.balances(symbol)) for symbol in self._accounts},
+            "nodes": [
+                {"symbol": node.symbol, "rpc_address": node.rpc_address, "tls": node.tls}
+                for nodes in self._node_configs.values()
+                for node in nodes
+            ],
+            "pending": {
+                symbol: account.pending.export() for symbol, account in self._accounts.items()
+            },
+            "utxos": {
+                symbol: [[txid, vout, value] for value, txid, vout in utxos]
+                for symbol, utxos in self._utxos.items()
+            },
+            "utxo_paths": {
+                symbol: [[txid, vout, list(path)] for (txid, vout), path in paths.items()]
+                for symbol, paths in self._utxo_paths.items()
+            },
+        }
+
+    def _restore(self) -> None:
+        state, entries = self._journal.load()
+        if state is not None:
+            self._profile_hint = state["profile"]
+            for symbol, balances in state["ledger"].items():
+                self._ledger.load(symbol, balances)
+            for node in state["nodes"]:
+                self._apply_node_add(node)
+            for symbol, pending in state["pending"].items():
+                self._accounts[symbol].pending.restore(pending)
+            for symbol, outputs in state["utxos"].items():
+                self._utxos[symbol].add_many(outputs)
+            for symbol, rows in state.get("utxo_paths", {}).items():
+                self._utxo_paths[symbol].update(((txid, vout), tuple(path)) for txid, vout, path in rows)
+        for op, payload in entries:
+            getattr(self, f"_apply_{op}")(payload)
+
+    def _commit(self, op: str, payload: Dict[str, Any]) -> Any:
+        with self._commit_lock:
+            result = getattr(self, f"_apply_{op}")(payload)
+            if self._journal is not None:
+                self._journal.append(op, payload)
+                if self._journal.snapshot_due:
+                    self._journal.write_snapshot(self.snapshot_state())
+            return result
+
+    def _apply_profile(self, payload: Dict[str, Any]) -> None:
+        self._profile_hint = payload["name"]
+
+    def _apply_node(self, payload: Dict[str, Any]) -> NodeConfig:
+        self._node_configs[payload["symbol"]] = []
+        return self._apply_node_add(payload)
+
+    def _apply_node_add(self, payload: Dict[str, Any]) -> NodeConfig:
+        node = NodeConfig(
+            symbol=payload["symbol"], rpc_address=payload["rpc_address"], tls=payload["tls"]
+        )
+        self._node_configs.setdefault(node.symbol, []).append(node)
+        return node
+
+    def _apply_node_remove(self, payload: Dict[str, Any]) -> None:
+        nodes = self._node_configs.get(payload["symbol"], [])
+        self._node_configs[payload["symbol"]] = [
+            node for node in nodes if node.rpc_address != payload["rpc_address"]
+        ]
+
+    def _apply_send(self, payload: Dict[str, Any]) -> PendingRecord:
+        account = self._accounts[payload["symbol"]]
+        amount, fee = payload["amount"], payload["fee"]
+        self._ledger.debit(account.symbol, amount + fee, account.ledger_index)
+        record = account.pending.add(payload["address"], amount, fee, payload["note"], payload["at"])
+        self._consume_inputs(record, payload)
+        return record
+
+    def _apply_batch(self, payload: Dict[str, Any]) -> List[PendingRecord]:
+        account = self._accounts[payload["symbol"]]
+        total = sum(payload["amounts"]) + sum(payload["fees"])
+        self._ledger.debit(account.symbol, total, account.ledger_index)
+        records = account.pending.add_many(
+            payload["addresses"], payload["amounts"], payload["fees"], payload["notes"], payload["at"], batch=True
+        )
+        # The whole run is one spend; its inputs and change ride on the first row.
+        self._consume_inputs(records[0], payload)
+        return records
+
+    def _apply_state(self, payload: Dict[str, Any]) -> PendingRecord:
+        account = self._accounts[payload["symbol"]]
+        # A batch row moves with its whole batch, so the refund covers every row.
+        record = account.pending.set_state(payload["tx_id"], payload["state"], payload["at"])
+        if record.state in (FAILED, CANCELLED):
+            members = account.pending.batch_of(record)
+            refund = sum(member.amount + member.fee for member in members)
+            self._ledger.credit(account.symbol, refund, account.ledger_index)
+            leader = members[0]
+            utxos = self._utxos.get(account.symbol)
+            if utxos is not None and leader.inputs:
+                if leader.change and (leader.tx_id, 1) in utxos:
+                    utxos.spend(leader.tx_id, 1)
+                    self._utxo_paths.get(account.symbol, {}).pop((leader.tx_id, 1), None)
+                for txid, vout, value in leader.inputs:
+                    utxos.add(txid, vout, value)
+        return record
+
+    def _apply_settle(self, payload: Dict[str, Any]) -> PendingRecord:
+        account = self._accounts[payload["symbol"]]
+        tx_id, at = payload["tx_id"], payload["at"]
+        record = account.pending.get(tx_id)
+        if record.state == STAGED:
+            account.pending.set_state(tx_id, BROADCAST, at)
+        account.pending.set_state(tx_id, CONFIRMED, at)
+        paths = self._utxo_paths.get(account.symbol)
+        if paths is not None:
+            for txid, vout, _ in record.inputs:
+                paths.pop((txid, vout), None)
+        change_vout = payload["change_vout"]
+        if change_vout is not None:
+            if paths is not None and (tx_id, 1) in paths:
+                paths[(payload["txid"], change_vout)] = paths.pop((tx_id, 1))
+            utxos = self._utxos[account.symbol]
+            if (tx_id, 1) in utxos:
+                utxos.add(payload["txid"], change_vout, utxos.spend(tx_id, 1))
+            else:
+                # A later send already spends the change; point it at the real output.
+                for other in account.pending.active():
+                    for entry in other.inputs:
+                        if entry[0] == tx_id and entry[1] == 1:
+                            entry[0], entry[1] = payload["txid"], change_vout
+        return record
+
+    def _apply_utxo(self, payload: Dict[str, Any]) -> None:
+        self._utxos[payload["symbol"]].add(payload["txid"], payload["vout"], payload["value"])
+        self._ledger.credit(payload["symbol"], payload["value"])
+        if payload.get("path") is not None and payload["symbol"] in self._utxo_paths:
+            self._utxo_paths[payload["symbol"]][(payload["txid"], payload["vout"])] = tuple(payload["path"])
+
+    def _apply_utxo_spent(self, payload: Dict[str, Any]) -> None:
+        value = self._utxos[payload["symbol"]].spend(payload["txid"], payload["vout"])
+        self._ledger.debit(payload["symbol"], value)
+        self._utxo_paths.get(payload["symbol"], {}).pop((payload["txid"], payload["vout"]), None)
+
+    def _spendable_units(self, account: WalletAccount) -> int:
+        utxos = self._utxos.get(account.symbol)
+        if utxos:
+            return min(utxos.total, account.balance_units)
+        return account.balance_units
+
+    def _select_inputs(self, symbol: str, amount: int, fee: int, outputs: int) -> Dict[str, Any]:
+        """Inputs, change and final fee for paying ``amount`` to ``outputs`` recipients.
+
+        The fee is raised to what the selected inputs and outputs need at the
+        current fee rate, and a changeless surplus is added to it; either way
+        the result must stay under the asset's fee ceiling.
+        """
+
+        utxos = self._utxos.get(symbol)
+        if not utxos:
+            return {"fee": fee}
+        fee_rate = self._fee_estimators[symbol].fee_rate()
+        # More inputs cost more fee, which can need another input; this settles in a round or two.
+        for _ in range(_FEE_ROUNDS):
+            selection = select_coins(utxos, amount + fee, fee_rate)
+            needed = spend_vsize(len(selection.inputs), outputs + bool(selection.change)) * fee_rate
+            if fee >= needed:
+                break
+            fee = needed
+        else:
+            raise ValueError(f"Fee could not cover the inputs this {symbol} spend needs; try a smaller amount.")
+        total_fee = fee + selection.excess
+        if total_fee > self._fee_limits[symbol][1]:
+            raise ValueError(
+                f"Fee would be {format_amount(symbol, total_fee)} {symbol} with the inputs this spend needs, "
+                f"above the {self._fee_bounds[symbol][1]} {symbol.lower()} cap."
+            )
+        inputs = [[txid, vout, value] for (txid, vout), value in zip(selection.inputs, selection.values)]
+        return {"inputs": inputs, "change": selection.change, "fee": total_fee}
+
+    def _consume_inputs(self, record: PendingRecord, payload: Dict[str, Any]) -> None:
+        if not payload.get("inputs"):
+            return
+        utxos = self._utxos[record.symbol]
+        for txid, vout, _ in payload["inputs"]:
+            utxos.spend(txid, vout)
+        record.inputs = payload["inputs"]
+        record.change = payload["change"]
+        if record.change:
+            # The change output's real txid is only known once signed; key it by
+            # our transaction id until sync replaces it.
+            utxos.add(record.tx_id, 1, record.change)
+            if record.symbol in self._utxo_paths:
+                self._utxo_paths[record.symbol][(record.tx_id, 1)] = account_path(record.symbol) + (1, 0)
+
+    def _apply_balance(self, payload: Dict[str, Any]) -> None:
+        self._ledger.set_balance(payload["symbol"], payload["units"], payload["index"])
+
+
+def _atomic_or_none(symbol: str, value: Any) -> Optional[int]:
+    """``to_atomic`` for user input: ``None`` instead of an error if it is not a finite number."""
+
+    try:
+        return to_atomic(symbol, value)
+    except ValueError:
+        return None
+
+
+def _failure_reason(message: str) -> str:
+    for prefix, reason in _FAILURE_REASONS:
+        if message.startswith(prefix):
+            return reason
+    return "address"
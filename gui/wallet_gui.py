@@ -1,18 +1,34 @@
+import os
 import tkinter as tk
 from tkinter import messagebox, ttk
 from tkinter import scrolledtext
-from datetime import datetime
+from typing import Optional
 
+from activity_log import ActivityLog
+from history_view import HistoryView
+from ledger import format_amount
+from metrics import Metrics
+from pending import ACTIVE_STATES
 from wallet_engine import WalletEngine
+from worker import EngineWorker
 
 
 class WalletGUI:
-    def __init__(self, root: tk.Tk, engine: WalletEngine) -> None:
+    def __init__(
+        self,
+        root: tk.Tk,
+        engine: WalletEngine,
+        log_capacity: int = 1_000,
+        log_path: Optional[str] = None,
+    ) -> None:
         self.root = root
         self.engine = engine
+        self.worker = EngineWorker(root)
+        self.activity = ActivityLog(log_capacity, spill_path=log_path)
+        self._log_flush_pending = False
         self.root.title("Kernel Wallet — Litecoin & Monero")
-        self.root.geometry("900x620")
-        self.root.minsize(840, 560)
+        self.root.geometry("1100x760")
+        self.root.minsize(960, 680)
 
         self.selected_symbol = tk.StringVar(value="LTC")
         self.wallet_name = tk.StringVar()
@@ -27,6 +43,7 @@ class WalletGUI:
 
         self._apply_style()
         self._build_layout()
+        self.root.protocol("WM_DELETE_WINDOW", self._close)
         self._update_account_view()
         self._append_log(
             "Interface ready. Load your self-custodial wallet (name + seed phrase)"
@@ -118,9 +135,10 @@ class WalletGUI:
             style="Subtitle.TLabel",
         )
         self.wallet_status.grid(row=0, column=0, sticky="w")
-        ttk.Button(
+        self.load_button = ttk.Button(
             identity_footer, text="Load wallet", style="Accent.TButton", command=self._load_wallet
-        ).grid(row=0, column=1, sticky="e")
+        )
+        self.load_button.grid(row=0, column=1, sticky="e")
 
         controls = ttk.Frame(outer)
         controls.pack(fill="x", pady=(0, 8))
@@ -138,9 +156,8 @@ class WalletGUI:
         ttk.Label(controls, text="Offline", style="Badge.TLabel").pack(side="left")
         ttk.Label(controls, text="Bring your node", style="InfoBadge.TLabel").pack(side="left", padx=(8, 0))
         ttk.Label(controls, text="Self-custody", style="Warn.TLabel").pack(side="left", padx=(8, 0))
-        ttk.Button(controls, text="Refresh", command=self._refresh_balances).pack(
-            side="right"
-        )
+        self.refresh_button = ttk.Button(controls, text="Refresh", command=self._refresh_balances)
+        self.refresh_button.pack(side="right")
 
         node_frame = ttk.Labelframe(outer, text="Node connectivity", style="Card.TLabelframe")
         node_frame.pack(fill="x", pady=(0, 8))
@@ -164,9 +181,12 @@ class WalletGUI:
             style="Subtitle.TLabel",
         )
         self.node_status.grid(row=0, column=0, sticky="w")
-        ttk.Button(node_actions, text="Save node", style="Accent.TButton", command=self._save_node).grid(
-            row=0, column=1, sticky="e"
+        self.add_node_button = ttk.Button(node_actions, text="Add backup", command=self._add_backup_node)
+        self.add_node_button.grid(row=0, column=1, sticky="e", padx=(0, 8))
+        self.save_node_button = ttk.Button(
+            node_actions, text="Save node", style="Accent.TButton", command=self._save_node
         )
+        self.save_node_button.grid(row=0, column=2, sticky="e")
 
         summary = ttk.Frame(outer)
         summary.pack(fill="x", pady=8)
@@ -200,12 +220,13 @@ class WalletGUI:
         fee_row.grid(row=2, column=1, padx=12, pady=6, sticky="w")
         fee_entry = ttk.Entry(fee_row, textvariable=self.fee, width=12)
         fee_entry.pack(side="left")
-        ttk.Button(
+        self.estimate_button = ttk.Button(
             fee_row,
             text="Estimate",
             style="Accent.TButton",
             command=self._estimate_fee,
-        ).pack(side="left", padx=(8, 0))
+        )
+        self.estimate_button.pack(side="left", padx=(8, 0))
 
         ttk.Label(send_frame, text="Note (local)").grid(row=3, column=0, sticky="w", padx=12, pady=6)
         ttk.Entry(send_frame, textvariable=self.note).grid(
@@ -224,11 +245,20 @@ class WalletGUI:
         )
         self.send_button.pack(side="right")
 
-        log_frame = ttk.Labelframe(outer, text="Activity", style="Card.TLabelframe")
-        log_frame.pack(fill="both", expand=True, pady=(8, 0))
+        bottom = ttk.Frame(outer)
+        bottom.pack(fill="both", expand=True, pady=(8, 0))
+
+        history_frame = ttk.Labelframe(bottom, text="History", style="Card.TLabelframe")
+        history_frame.pack(side="left", fill="both", expand=True, padx=(0, 8))
+        self.history = HistoryView(history_frame, self._request_history_page, rows=8)
+        self.history.pack(fill="both", expand=True, padx=12, pady=12)
+
+        log_frame = ttk.Labelframe(bottom, text="Activity", style="Card.TLabelframe")
+        log_frame.pack(side="left", fill="both", expand=True, padx=(8, 0))
         self.log_text = scrolledtext.ScrolledText(
             log_frame,
             height=8,
+            width=40,
             wrap="word",
             state="disabled",
             background="#0b1324",
@@ -238,44 +268,115 @@ class WalletGUI:
         )
         self.log_text.pack(fill="both", expand=True, padx=12, pady=12)
 
+        if self.engine.metrics is not None:
+            diagnostics = ttk.Labelframe(bottom, text="Diagnostics", style="Card.TLabelframe")
+            diagnostics.pack(side="left", fill="y", padx=(16, 0))
+            self.diagnostics_label = ttk.Label(
+                diagnostics, text="Collecting…", style="Subtitle.TLabel", font=("Courier", 9), justify="left"
+            )
+            self.diagnostics_label.pack(anchor="nw", padx=12, pady=12)
+            self.root.after(1000, self._refresh_diagnostics)
+
+    def _refresh_diagnostics(self) -> None:
+        snapshot = self.engine.metrics.snapshot()
+        lines = ["call           n    p95"]
+        for series, summary in snapshot["histograms"].items():
+            if not summary["count"]:
+                continue
+            method = series.split('"')[1]
+            p95 = summary["p95"]
+            lines.append(f"{method[:13]:<13}{summary['count']:>6} {p95 * 1000:>6.2f}ms")
+        failures = sum(
+            value for series, value in snapshot["counters"].items()
+            if series.startswith("validation_failures_total")
+        )
+        symbol = self.selected_symbol.get()
+        depth = sum(
+            snapshot["gauges"].get(f'pending_depth{{asset="{symbol}",state="{state}"}}', 0)
+            for state in ACTIVE_STATES
+        )
+        lines.append(f"validation failures {failures}")
+        lines.append(f"{symbol} in flight {depth}")
+        self.diagnostics_label.config(text="\n".join(lines))
+        metrics_file = os.environ.get("KERNEL_WALLET_METRICS_FILE")
+        if metrics_file:
+            self.engine.metrics.write_prometheus(metrics_file)
+        self.root.after(1000, self._refresh_diagnostics)
+
     def _update_account_view(self) -> None:
         self._node_values[self._last_symbol] = self.node_endpoint.get().strip()
         symbol = self.selected_symbol.get()
         account = self.engine.get_account(symbol)
-        self.balance_label.config(text=f"{account.balance:.8f} {symbol}")
+        self.balance_label.config(text=f"{format_amount(symbol, account.balance_units)} {symbol}")
         self.address_label.config(text=f"Address: {account.address}")
-        if account.pending:
-            pending_text = "\n".join(account.pending)
+        in_flight = sum(account.pending.count(state) for state in ACTIVE_STATES)
+        if in_flight:
+            pending_text = f"{in_flight:,} in flight — see History"
             self.pending_label.configure(style="Danger.TLabel")
         else:
             pending_text = "None"
             self.pending_label.configure(style="Subtitle.TLabel")
         self.pending_label.config(text=f"Pending: {pending_text}")
+        if symbol == self._last_symbol:
+            self.history.reload()
+        else:
+            self.history.reset()
 
         self.node_endpoint.set(self._node_values.get(symbol, ""))
-        node = self.engine.get_node(symbol)
-        if node:
-            self.node_status.config(text=f"{symbol} node set to {node.display_label()}")
-        else:
-            self.node_status.config(text="No node configured for this asset.")
+        self._show_node_status(symbol)
         self._last_symbol = symbol
         self._update_send_button_state()
 
+    def _request_history_page(self, request: dict, deliver) -> None:
+        self.worker.submit(
+            "history",
+            self.engine.list_transactions,
+            self.selected_symbol.get(),
+            request["offset"],
+            request["limit"],
+            request["sort"],
+            request["descending"],
+            request["state"],
+            request["query"],
+            on_done=deliver,
+            on_error=lambda exc: self._append_log(f"History unavailable: {exc}"),
+            watch_cursor=False,
+        )
+
     def _switch_asset(self, symbol: str) -> None:
         self.selected_symbol.set(symbol)
         self._update_account_view()
 
     def _refresh_balances(self) -> None:
-        self.engine.refresh_balances()
-        self._update_account_view()
-        self._append_log("Balances refreshed locally.")
+        def done(_: None) -> None:
+            self._update_account_view()
+            self._append_log("Balances and fee estimates refreshed.")
+
+        self.worker.submit(
+            "refresh",
+            self.engine.refresh_balances,
+            on_done=done,
+            on_error=lambda exc: messagebox.showerror("Cannot refresh", str(exc)),
+            busy=[self.refresh_button],
+        )
 
     def _estimate_fee(self) -> None:
         symbol = self.selected_symbol.get()
         amount = self.amount.get()
-        fee = self.engine.estimate_fee(symbol, amount)
-        self.fee.set(round(fee, 8))
-        self._append_log(f"Estimated fee for {symbol}: {fee:.8f}")
+
+        def done(fee: float) -> None:
+            self.fee.set(round(fee, 8))
+            self._append_log(f"Estimated fee for {symbol}: {fee:.8f}")
+
+        self.worker.submit(
+            "estimate",
+            self.engine.estimate_fee,
+            symbol,
+            amount,
+            on_done=done,
+            on_error=lambda exc: messagebox.showerror("Cannot estimate fee", str(exc)),
+            busy=[self.estimate_button],
+        )
 
     def _confirm_and_send(self) -> None:
         if not self.engine.has_profile():
@@ -288,36 +389,69 @@ class WalletGUI:
         symbol = self.selected_symbol.get()
         address = self.recipient.get().strip()
         amount = self.amount.get()
-        fee = self.fee.get() or self.engine.estimate_fee(symbol, amount)
         note = self.note.get().strip()
+        # Tk variables are only read here; the worker gets plain values.
+        entered_fee = self.fee.get()
+
+        def prepare() -> tuple:
+            fee = entered_fee or self.engine.estimate_fee(symbol, amount)
+            return fee, self.engine.validate_transaction(symbol, address, amount, fee)
+
+        def validated(outcome: tuple) -> None:
+            fee, errors = outcome
+            if errors:
+                messagebox.showerror("Validation failed", "\n".join(errors))
+                return
+
+            summary = (
+                f"Send {amount:.8f} {symbol} to {address} with fee {fee:.8f}.\n\n"
+                "Confirm to proceed. Broadcasting requires your trusted node connection."
+            )
+            if not messagebox.askyesno("Confirm transfer", summary):
+                self._append_log("User cancelled send request.")
+                return
+
+            self.worker.submit(
+                "send",
+                self.engine.send_transaction,
+                symbol,
+                address,
+                amount,
+                fee,
+                note,
+                on_done=sent,
+                on_error=lambda exc: messagebox.showerror("Cannot send", str(exc)),
+                busy=[self.send_button],
+            )
 
-        errors = self.engine.validate_transaction(symbol, address, amount, fee)
-        if errors:
-            messagebox.showerror("Validation failed", "\n".join(errors))
-            return
-
-        summary = (
-            f"Send {amount:.8f} {symbol} to {address} with fee {fee:.8f}.\n\n"
-            "Confirm to proceed. Broadcasting requires your trusted node connection."
+        def sent(tx_id: str) -> None:
+            self._update_account_view()
+            self._append_log(f"Prepared {symbol} transaction {tx_id}.")
+            self._clear_form()
+
+        self.worker.submit(
+            "send",
+            prepare,
+            on_done=validated,
+            on_error=lambda exc: messagebox.showerror("Validation failed", str(exc)),
+            busy=[self.send_button],
         )
-        if not messagebox.askyesno("Confirm transfer", summary):
-            self._append_log("User cancelled send request.")
-            return
-
-        try:
-            tx_id = self.engine.send_transaction(symbol, address, amount, fee, note)
-        except ValueError as exc:
-            messagebox.showerror("Cannot send", str(exc))
-            return
-
-        self._update_account_view()
-        self._append_log(f"Prepared {symbol} transaction {tx_id}.")
-        self._clear_form()
 
     def _append_log(self, message: str) -> None:
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.activity.append(message)
+        if not self._log_flush_pending:
+            self._log_flush_pending = True
+            self.root.after(16, self._flush_log)
+
+    def _flush_log(self) -> None:
+        self._log_flush_pending = False
+        text, trim = self.activity.drain()
+        if not text:
+            return
         self.log_text.configure(state="normal")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self.log_text.insert(tk.END, text)
+        if trim:
+            self.log_text.delete("1.0", f"{trim + 1}.0")
         self.log_text.configure(state="disabled")
         self.log_text.see(tk.END)
 
@@ -331,33 +465,76 @@ class WalletGUI:
         name = self.wallet_name.get().strip()
         seed_phrase = self.seed_box.get("1.0", tk.END).strip()
 
-        try:
-            profile = self.engine.set_profile(name, seed_phrase)
-        except ValueError as exc:
-            messagebox.showerror("Cannot load wallet", str(exc))
-            return
-
-        self.wallet_status.config(
-            text=f"Loaded wallet '{profile.name}'. Seed stays local to this session."
+        def loaded(profile) -> None:
+            self.wallet_status.config(
+                text=f"Loaded wallet '{profile.name}'. Seed stays local to this session."
+            )
+            self._append_log("Wallet profile loaded locally for self-custody.")
+            self._update_account_view()
+
+        self.worker.submit(
+            "load",
+            self.engine.set_profile,
+            name,
+            seed_phrase,
+            on_done=loaded,
+            on_error=lambda exc: messagebox.showerror("Cannot load wallet", str(exc)),
+            busy=[self.load_button],
         )
-        self._append_log("Wallet profile loaded locally for self-custody.")
-        self._update_send_button_state()
 
     def _save_node(self) -> None:
         symbol = self.selected_symbol.get()
         endpoint = self.node_endpoint.get().strip()
         tls = self.node_tls.get()
 
-        try:
-            node = self.engine.set_node(symbol, endpoint, tls)
-        except (ValueError, KeyError) as exc:
-            messagebox.showerror("Cannot save node", str(exc))
-            return
+        def saved(node) -> None:
+            self._node_values[symbol] = endpoint
+            self._show_node_status(symbol)
+            self._append_log(f"Updated {symbol} node endpoint to {node.display_label()}.")
+            self._update_send_button_state()
+
+        # set_node journals the change, so it runs on the worker like every other engine write.
+        self.worker.submit(
+            "save_node",
+            self.engine.set_node,
+            symbol,
+            endpoint,
+            tls,
+            on_done=saved,
+            on_error=lambda exc: messagebox.showerror("Cannot save node", str(exc)),
+            busy=[self.save_node_button, self.add_node_button],
+        )
 
-        self._node_values[symbol] = endpoint
-        self.node_status.config(text=f"{symbol} node set to {node.display_label()}")
-        self._append_log(f"Updated {symbol} node endpoint to {node.display_label()}.")
-        self._update_send_button_state()
+    def _add_backup_node(self) -> None:
+        symbol = self.selected_symbol.get()
+        endpoint = self.node_endpoint.get().strip()
+        tls = self.node_tls.get()
+
+        def added(node) -> None:
+            self._show_node_status(symbol)
+            self._append_log(f"Added {symbol} backup node {node.display_label()}.")
+            self._update_send_button_state()
+
+        self.worker.submit(
+            "add_node",
+            self.engine.add_node,
+            symbol,
+            endpoint,
+            tls,
+            on_done=added,
+            on_error=lambda exc: messagebox.showerror("Cannot add node", str(exc)),
+            busy=[self.save_node_button, self.add_node_button],
+        )
+
+    def _show_node_status(self, symbol: str) -> None:
+        nodes = self.engine.get_nodes(symbol)
+        if not nodes:
+            self.node_status.config(text="No node configured for this asset.")
+            return
+        text = f"{symbol} node set to {nodes[0].display_label()}"
+        if len(nodes) > 1:
+            text += f" (+{len(nodes) - 1} backup)"
+        self.node_status.config(text=text)
 
     def _update_send_button_state(self) -> None:
         symbol = self.selected_symbol.get()
@@ -368,9 +545,26 @@ class WalletGUI:
         else:
             self.send_button.state(["disabled"])
 
+    def _close(self) -> None:
+        # Let a running engine call finish before the engine zeroizes the seed,
+        # stops its seed worker and flushes the journal.
+        self.worker.shutdown(wait=True)
+        self.activity.close()
+        self.engine.close()
+        self.root.destroy()
+
 
 def main() -> None:
-    engine = WalletEngine()
+    # With KERNEL_WALLET_DAEMON_SOCKET set, attach to a running daemon.py as a thin client.
+    socket_path = os.environ.get("KERNEL_WALLET_DAEMON_SOCKET")
+    if socket_path:
+        from daemon_client import RemoteEngine
+
+        engine = RemoteEngine(socket_path)
+    else:
+        # Instrumentation is opt-in; set KERNEL_WALLET_METRICS=1 to enable it.
+        metrics = Metrics() if os.environ.get("KERNEL_WALLET_METRICS") else None
+        engine = WalletEngine(metrics=metrics)
     root = tk.Tk()
     WalletGUI(root, engine)
     root.mainloop()
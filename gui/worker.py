@@ -0,0 +1,154 @@
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Callback = Callable[[Any], None]
+
+
+class _Job:
+    __slots__ = ("key", "generation", "signature", "future", "on_done", "on_error", "busy", "cursor")
+
+    def __init__(self, key: str, generation: int, signature: Tuple[Any, ...]) -> None:
+        self.key = key
+        self.generation = generation
+        self.signature = signature
+        self.future: Optional[Future] = None
+        self.on_done: List[Callback] = []
+        self.on_error: List[Callback] = []
+        self.busy: List[Tuple[Any, bool]] = []
+        self.cursor = False
+
+
+class EngineWorker:
+    """Run engine calls off the Tk event loop and deliver results back on it.
+
+    Jobs are keyed by purpose (``"send"``, ``"estimate"`` and so on). Submitting
+    a key that is already in flight with the same arguments joins the existing
+    job instead of starting another. Different arguments supersede it: the
+    older job is cancelled if it has not started, and its result is dropped if
+    it has. Results travel through a queue that the Tk thread drains with
+    ``root.after`` only while work is outstanding, so an idle window does no
+    polling.
+
+    ``exclusive`` jobs (the default) run one at a time, in submission order,
+    on a dedicated thread, so the engine sees the user's actions in the order
+    they were made: a node saved before a send is in place when the send
+    runs. The engine is thread-safe in itself, so reads and pure
+    computations can opt out and run alongside on the pool. Widgets passed as ``busy`` are disabled and the
+    cursor shows a watch until their job settles; ``watch_cursor=False`` keeps
+    the cursor alone for frequent background reads such as scrolling.
+    """
+
+    def __init__(self, root: Any, max_workers: int = 2, poll_interval_ms: int = 16) -> None:
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="engine")
+        self._serial = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine-serial")
+        self._results: "queue.SimpleQueue[Tuple[_Job, bool, Any]]" = queue.SimpleQueue()
+        self._jobs: Dict[str, _Job] = {}
+        self._generations: Dict[str, int] = {}
+        self._polling = False
+        self._busy_count = 0
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callback] = None,
+        on_error: Optional[Callback] = None,
+        busy: Sequence[Any] = (),
+        exclusive: bool = True,
+        watch_cursor: bool = True,
+    ) -> None:
+        signature = (fn, args)
+        current = self._jobs.get(key)
+        if current is not None and current.signature == signature:
+            self._attach(current, on_done, on_error)
+            return
+        if current is not None:
+            if current.future is not None:
+                current.future.cancel()
+            self._settle(current)
+
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        job = _Job(key, generation, signature)
+        self._attach(job, on_done, on_error)
+        for widget in busy:
+            job.busy.append((widget, widget.instate(["disabled"])))
+            widget.state(["disabled"])
+        if watch_cursor:
+            job.cursor = True
+            self._set_cursor(+1)
+        self._jobs[key] = job
+        executor = self._serial if exclusive else self._executor
+        job.future = executor.submit(self._run, job, fn, args)
+        self._schedule_poll()
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._jobs
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancel queued jobs; ``wait`` blocks until the running ones finish."""
+
+        for job in list(self._jobs.values()):
+            if job.future is not None:
+                job.future.cancel()
+        self._jobs.clear()
+        self._serial.shutdown(wait=wait, cancel_futures=True)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # Worker threads
+    def _run(self, job: _Job, fn: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        if self._generations.get(job.key) != job.generation:
+            return  # superseded while queued
+        try:
+            result = fn(*args)
+        except Exception as exc:  # delivered to on_error on the Tk thread
+            self._results.put((job, False, exc))
+        else:
+            self._results.put((job, True, result))
+
+    # Tk thread
+    def _schedule_poll(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._polling = False
+        while True:
+            try:
+                job, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if self._jobs.get(job.key) is not job:
+                continue  # superseded while running
+            self._settle(job)
+            if not ok and not job.on_error:
+                self.root.report_callback_exception(type(value), value, value.__traceback__)
+            for callback in job.on_done if ok else job.on_error:
+                callback(value)
+        if self._jobs:
+            self._schedule_poll()
+
+    def _attach(self, job: _Job, on_done: Optional[Callback], on_error: Optional[Callback]) -> None:
+        if on_done is not None:
+            job.on_done.append(on_done)
+        if on_error is not None:
+            job.on_error.append(on_error)
+
+    def _settle(self, job: _Job) -> None:
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        for widget, was_disabled in job.busy:
+            widget.state(["disabled" if was_disabled else "!disabled"])
+        job.busy.clear()
+        if job.cursor:
+            job.cursor = False
+            self._set_cursor(-1)
+
+    def _set_cursor(self, delta: int) -> None:
+        self._busy_count += delta
+        self.root.configure(cursor="watch" if self._busy_count > 0 else "")
@@ -0,0 +1,480 @@
+"""Monero output discovery with the private view key, spread over a process pool.
+
+Every output on chain has to be tested: the shared secret ``8 * a * R`` is
+computed once per transaction, then each output is either rejected on its
+one-byte view tag or checked by comparing ``Hs(D || i) * G + B`` with its
+one-time key. That is CPU-bound, so:
+
+1. the parent fetches a batch of blocks and packs their transactions as
+   fixed-layout records into one ``multiprocessing.shared_memory`` block;
+2. the batch is cut into contiguous record ranges, and ``spawn``-started
+   workers scan their range straight out of the shared buffer, so only
+   offsets cross the process boundary on the way in and only hits on the
+   way out;
+3. hits are merged back in range order, which is block-height order, and
+   credited through the engine's journaled ``add_utxo``;
+4. the parent derives each owned output's key image with the spend key;
+   when an input of a later transaction carries that image the output has
+   been spent, and it is debited through the journaled ``spend_utxo``;
+5. the scanned height and the key images of unspent outputs are
+   checkpointed after each batch, and the cancel event is polled while a
+   batch is in flight, so a stopped scan resumes at the first unfinished
+   batch.
+
+Workers only ever receive the private view key; the spend key stays in the
+parent process.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context, shared_memory
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from monero import (
+    _base_table,
+    base_mult,
+    compress,
+    decode_amount,
+    decode_legacy_amount,
+    decompress,
+    derive_output_scalar,
+    key_derivation,
+    key_image,
+    point_add,
+    view_tag,
+)
+
+_TX = struct.Struct("<Q32s32sH")  # height, txid, tx public key, output count
+_OUTPUT = struct.Struct("<32sBB32s")  # one-time key, flags, view tag, amount bytes
+_HAS_VIEW_TAG = 1
+_CLEARTEXT = 2
+_ENCRYPTED = 4
+_LEGACY = 8  # 32-byte pre-Bulletproofs-2 ecdhInfo amount
+# RingCT types whose ecdhInfo carries the compact 8-byte amount (Bulletproofs 2 onward).
+_COMPACT_RCT_TYPES = frozenset({4, 5, 6})
+_POLL_SECONDS = 0.1
+
+
+class ScanOutput(NamedTuple):
+    key: bytes
+    view_tag: Optional[int] = None
+    encrypted_amount: Optional[bytes] = None  # 8 bytes compact, 32 bytes legacy
+    amount: Optional[int] = None  # cleartext (pre-RingCT and coinbase) amounts only
+
+
+class ScanTransaction(NamedTuple):
+    height: int
+    txid: str
+    tx_public_key: bytes
+    outputs: Tuple[ScanOutput, ...]
+    key_images: Tuple[bytes, ...] = ()  # of the inputs; never leaves the parent
+
+
+class FoundOutput(NamedTuple):
+    height: int
+    txid: str
+    index: int
+    amount: Optional[int]  # None if the output carried no amount at all
+    key: bytes
+    scalar: int  # Hs(8aR || i); the one-time secret is this plus the spend secret
+
+
+# Shared-memory records
+def packed_size(transactions: Sequence[ScanTransaction]) -> int:
+    return sum(_TX.size + _OUTPUT.size * len(tx.outputs) for tx in transactions)
+
+
+def pack_transactions(buffer: Any, transactions: Sequence[ScanTransaction]) -> List[int]:
+    """Write ``transactions`` into ``buffer`` and return each record's start offset."""
+
+    offsets = []
+    offset = 0
+    pack_tx, pack_output = _TX.pack_into, _OUTPUT.pack_into
+    for tx in transactions:
+        offsets.append(offset)
+        pack_tx(buffer, offset, tx.height, bytes.fromhex(tx.txid), tx.tx_public_key, len(tx.outputs))
+        offset += _TX.size
+        for output in tx.outputs:
+            flags = 0
+            tag = 0
+            amount = bytes(32)
+            if output.view_tag is not None:
+                flags |= _HAS_VIEW_TAG
+                tag = output.view_tag
+            if output.encrypted_amount is not None:
+                flags |= _ENCRYPTED if len(output.encrypted_amount) == 8 else _LEGACY
+                amount = output.encrypted_amount
+            elif output.amount is not None:
+                flags |= _CLEARTEXT
+                amount = output.amount.to_bytes(8, "little")
+            pack_output(buffer, offset, output.key, flags, tag, amount)
+            offset += _OUTPUT.size
+    return offsets
+
+
+def split_ranges(offsets: Sequence[int], size: int, parts: int) -> List[Tuple[int, int]]:
+    """Cut the record stream into at most ``parts`` contiguous byte ranges on record boundaries."""
+
+    if not offsets:
+        return []
+    parts = max(1, min(parts, len(offsets)))
+    step = len(offsets) / parts
+    starts = [offsets[int(part * step)] for part in range(parts)]
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def scan_records(buffer: Any, view_secret: int, spend_public: bytes) -> List[FoundOutput]:
+    """Test every output in a packed record range against one account's keys."""
+
+    spend_point = decompress(spend_public)
+    if spend_point is None:
+        raise ValueError("Spend public key is not a valid ed25519 point.")
+    view = memoryview(buffer)
+    found = []
+    offset = 0
+    end = len(view)
+    unpack_tx, unpack_output = _TX.unpack_from, _OUTPUT.unpack_from
+    while offset < end:
+        height, txid, tx_key, count = unpack_tx(view, offset)
+        offset += _TX.size
+        first = offset
+        offset += count * _OUTPUT.size
+        tx_point = decompress(tx_key)
+        if tx_point is None:
+            continue
+        derivation = key_derivation(tx_point, view_secret)
+        for index in range(count):
+            key, flags, tag, amount = unpack_output(view, first + index * _OUTPUT.size)
+            if flags & _HAS_VIEW_TAG and view_tag(derivation, index) != tag:
+                continue
+            scalar = derive_output_scalar(derivation, index)
+            if compress(point_add(base_mult(scalar), spend_point)) != key:
+                continue
+            if flags & _ENCRYPTED:
+                value: Optional[int] = decode_amount(amount[:8], scalar)
+            elif flags & _LEGACY:
+                value = decode_legacy_amount(amount, scalar)
+            elif flags & _CLEARTEXT:
+                value = int.from_bytes(amount[:8], "little")
+            else:
+                value = None
+            found.append(FoundOutput(height, txid.hex(), index, value, key, scalar))
+    return found
+
+
+def _scan_shared(name: str, start: int, end: int, view_secret: int, spend_public: bytes) -> List[FoundOutput]:
+    """Worker entry point: scan ``[start, end)`` of a shared block created by the parent."""
+
+    # Spawned workers share the parent's resource tracker, which unlinks the block once.
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return scan_records(block.buf[start:end], view_secret, spend_public)
+    finally:
+        block.close()
+
+
+# Node access
+def _tx_public_key(extra: Sequence[int]) -> Optional[bytes]:
+    """First tx public key (tag 0x01) in a tx_extra field."""
+
+    data = bytes(extra)
+    position = 0
+    while position < len(data):
+        tag = data[position]
+        position += 1
+        if tag == 0x01:
+            return data[position : position + 32] if position + 32 <= len(data) else None
+        if tag == 0x00:
+            continue
+        length = 0
+        shift = 0
+        while position < len(data):
+            byte = data[position]
+            position += 1
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        if tag == 0x04:
+            length *= 32  # additional public keys: a count of 32-byte keys
+        elif tag not in (0x02, 0xDE):
+            return None
+        position += length
+    return None
+
+
+def parse_transaction(height: int, txid: str, tx: Dict[str, Any]) -> Optional[ScanTransaction]:
+    """Outputs and input key images of one monerod ``as_json`` transaction.
+
+    A transaction without a tx key cannot pay us but may still spend our
+    outputs, so only its key images are kept; ``None`` if it has neither.
+    """
+
+    key_images = tuple(bytes.fromhex(vin["key"]["k_image"]) for vin in tx.get("vin", ()) if "key" in vin)
+    tx_key = _tx_public_key(tx.get("extra", ()))
+    if tx_key is None:
+        return ScanTransaction(height, txid, bytes(32), (), key_images) if key_images else None
+    rct = tx.get("rct_signatures") or {}
+    ecdh = rct.get("ecdhInfo") or []
+    compact = rct.get("type") in _COMPACT_RCT_TYPES
+    outputs = []
+    for index, vout in enumerate(tx.get("vout", ())):
+        target = vout["target"]
+        tagged = target.get("tagged_key")
+        key = tagged["key"] if tagged else target["key"]
+        tag = int(tagged["view_tag"], 16) if tagged else None
+        if vout.get("amount"):
+            outputs.append(ScanOutput(bytes.fromhex(key), tag, amount=vout["amount"]))
+        elif index < len(ecdh):
+            # Compact ecdhInfo is 8 bytes; older RingCT types carry a 32-byte scalar.
+            amount = bytes.fromhex(ecdh[index]["amount"])
+            outputs.append(ScanOutput(bytes.fromhex(key), tag, amount[:8] if compact else amount))
+        else:
+            outputs.append(ScanOutput(bytes.fromhex(key), tag))
+    return ScanTransaction(height, txid, tx_key, tuple(outputs), key_images)
+
+
+class NodeBlockSource:
+    """Reads blocks from monerod through a :class:`NodeClient` (``get_block`` plus ``/get_transactions``)."""
+
+    def __init__(self, client_factory: Callable[[], Any], tx_batch: int = 100) -> None:
+        self.client_factory = client_factory
+        self.tx_batch = tx_batch
+
+    def tip(self) -> int:
+        return asyncio.run(self._with_client(lambda client: client.get_block_count())) - 1
+
+    def fetch(self, start: int, end: int) -> List[ScanTransaction]:
+        """Transactions of blocks ``start`` to ``end`` inclusive, in chain order."""
+
+        return asyncio.run(self._with_client(lambda client: self._fetch(client, start, end)))
+
+    async def _with_client(self, action: Callable[[Any], Any]) -> Any:
+        client = self.client_factory()
+        try:
+            return await action(client)
+        finally:
+            await client.close()
+
+    async def _fetch(self, client: Any, start: int, end: int) -> List[ScanTransaction]:
+        blocks = await asyncio.gather(
+            *(client.call("get_block", {"height": height}) for height in range(start, end + 1))
+        )
+        ordered: List[Tuple[int, str, Optional[Dict[str, Any]]]] = []
+        for height, block in zip(range(start, end + 1), blocks):
+            body = json.loads(block["json"])
+            ordered.append((height, block["miner_tx_hash"], body["miner_tx"]))
+            ordered.extend((height, tx_hash, None) for tx_hash in block.get("tx_hashes", ()))
+
+        wanted = [tx_hash for _, tx_hash, body in ordered if body is None]
+        replies = await asyncio.gather(
+            *(
+                client.post("/get_transactions", {"txs_hashes": wanted[first : first + self.tx_batch], "decode_as_json": True})
+                for first in range(0, len(wanted), self.tx_batch)
+            )
+        )
+        bodies = {entry["tx_hash"]: json.loads(entry["as_json"]) for reply in replies for entry in reply.get("txs", ())}
+
+        transactions = []
+        for height, tx_hash, body in ordered:
+            body = body if body is not None else bodies.get(tx_hash)
+            if body is None:
+                raise ValueError(f"Node did not return transaction {tx_hash}.")
+            parsed = parse_transaction(height, tx_hash, body)
+            if parsed is not None:
+                transactions.append(parsed)
+        return transactions
+
+
+# Checkpoints
+@dataclass
+class ScanCheckpoint:
+    """Highest block whose outputs have all been applied, and the key images still unspent.
+
+    ``key_images`` maps a key image (hex) to the ``[txid, index]`` of the
+    owned output it would spend.
+    """
+
+    height: int
+    key_images: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ScanCheckpoint"]:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                return cls(**json.load(handle))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str) -> None:
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(asdict(self), handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+
+@dataclass
+class ScanReport:
+    start_height: int
+    tip_height: int
+    scanned_height: int
+    transactions: int = 0
+    outputs_checked: int = 0
+    outputs_found: int = 0
+    outputs_spent: int = 0
+    # Owned outputs with no amount to credit, as (txid, index); not added to the ledger.
+    undecoded: List[Tuple[str, int]] = field(default_factory=list)
+    cancelled: bool = False
+
+
+class MoneroScanner:
+    """Find the engine's XMR outputs from ``birthday`` to the tip.
+
+    ``source`` provides ``tip()`` and ``fetch(start, end)``; ``None`` reads
+    through a :class:`NodeBlockSource` on the engine's XMR router. With ``processes=0`` scanning runs in the
+    calling thread, which is what tests and small catch-ups want. Pass
+    ``cancel`` to :meth:`run` to stop between (or during) batches; the next
+    run resumes from the checkpoint.
+    """
+
+    symbol = "XMR"
+
+    def __init__(
+        self,
+        engine: Any,
+        source: Optional[Any],
+        checkpoint_path: str,
+        birthday: int = 0,
+        batch_blocks: int = 100,
+        processes: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.engine = engine
+        self.source = source if source is not None else NodeBlockSource(lambda: engine.node_router(self.symbol))
+        self.checkpoint_path = checkpoint_path
+        self.birthday = birthday
+        self.batch_blocks = batch_blocks
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+
+    def run_blocking(self) -> ScanReport:
+        """Same as :meth:`run`; lets the engine drive it like the other chain syncs."""
+
+        return self.run()
+
+    def run(self, cancel: Optional[threading.Event] = None, tip: Optional[int] = None) -> ScanReport:
+        keys = self.engine.monero_keys()
+        checkpoint = ScanCheckpoint.load(self.checkpoint_path)
+        start = max(self.birthday, checkpoint.height + 1 if checkpoint else 0)
+        owned = dict(checkpoint.key_images) if checkpoint else {}
+        tip = self.source.tip() if tip is None else tip
+        report = ScanReport(start_height=start, tip_height=tip, scanned_height=start - 1)
+        for first in range(start, tip + 1, self.batch_blocks):
+            if cancel is not None and cancel.is_set():
+                report.cancelled = True
+                break
+            last = min(first + self.batch_blocks - 1, tip)
+            transactions = self.source.fetch(first, last)
+            found = self._scan(transactions, keys.view_secret, keys.spend_public, cancel)
+            if found is None:
+                report.cancelled = True
+                break
+            self._apply(transactions, found, keys.spend_secret, owned, report)
+            report.transactions += len(transactions)
+            report.outputs_checked += sum(len(tx.outputs) for tx in transactions)
+            report.scanned_height = last
+            self.engine.flush()
+            ScanCheckpoint(last, owned).save(self.checkpoint_path)
+        return report
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _scan(
+        self,
+        transactions: Sequence[ScanTransaction],
+        view_secret: int,
+        spend_public: bytes,
+        cancel: Optional[threading.Event],
+    ) -> Optional[List[FoundOutput]]:
+        transactions = sorted(transactions, key=lambda tx: tx.height)
+        size = packed_size(transactions)
+        if not size:
+            return []
+        if self.processes <= 0:
+            buffer = bytearray(size)
+            pack_transactions(buffer, transactions)
+            return scan_records(buffer, view_secret, spend_public)
+
+        block = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            offsets = pack_transactions(block.buf, transactions)
+            executor = self._pool()
+            futures: List[Future] = [
+                executor.submit(_scan_shared, block.name, start, end, view_secret, spend_public)
+                for start, end in split_ranges(offsets, size, 4 * self.processes)
+            ]
+            pending = set(futures)
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    wait(pending)
+                    return None
+                _, pending = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            # Ranges are contiguous and in order, so concatenating keeps height order.
+            return [output for future in futures for output in future.result()]
+        finally:
+            block.close()
+            block.unlink()
+
+    def _apply(
+        self,
+        transactions: Sequence[ScanTransaction],
+        found: Iterable[FoundOutput],
+        spend_secret: int,
+        owned: Dict[str, List[Any]],
+        report: ScanReport,
+    ) -> None:
+        """Debit spent and credit received outputs, one transaction at a time in chain order."""
+
+        engine = self.engine
+        utxos = engine.get_utxos(self.symbol)
+        received: Dict[str, List[FoundOutput]] = {}
+        for output in found:
+            received.setdefault(output.txid, []).append(output)
+        for tx in sorted(transactions, key=lambda tx: tx.height):
+            for image in tx.key_images:
+                outpoint = owned.pop(image.hex(), None)
+                # Our own sends already took their inputs out of the index.
+                if outpoint is not None and tuple(outpoint) in utxos:
+                    engine.spend_utxo(self.symbol, outpoint[0], outpoint[1])
+                    report.outputs_spent += 1
+            for output in received.get(tx.txid, ()):
+                report.outputs_found += 1
+                if output.amount is None:
+                    report.undecoded.append((output.txid, output.index))
+                    continue
+                owned[key_image(output.scalar + spend_secret, output.key).hex()] = [output.txid, output.index]
+                if (output.txid, output.index) not in utxos:
+                    engine.add_utxo(self.symbol, output.txid, output.index, output.amount)
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=get_context("spawn"), initializer=_base_table
+                )
+            return self._executor
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The wallet modules live flat in gui/ and import each other by module name.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gui"))
+
+# BIP-39 test vector: all-zero entropy.
+TEST_MNEMONIC = " ".join(["abandon"] * 11 + ["about"])
+
+
+@pytest.fixture
+def engine():
+    """A wallet engine with the test mnemonic loaded; PBKDF2 runs in-process."""
+
+    from seed import SeedVault
+    from wallet_engine import WalletEngine
+
+    vault = SeedVault(use_process=False)
+    wallet = WalletEngine(seed_vault=vault)
+    wallet.set_profile("Test", TEST_MNEMONIC)
+    yield wallet
+    wallet.close()
+    vault.close()
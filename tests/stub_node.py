@@ -0,0 +1,141 @@
+"""In-process HTTP JSON-RPC node for client and router tests."""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+Handler = Callable[[str, Any], Any]
+
+
+class RPCFailure(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class StubNode:
+    """Keep-alive HTTP/1.1 server answering JSON-RPC (single or batch) with ``handler``.
+
+    ``delay`` holds every response back; ``digest`` is ``(user, password)``
+    to demand HTTP Digest auth the way monerod's ``--rpc-login`` does.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        delay: float = 0.0,
+        digest: Optional[Tuple[str, str]] = None,
+    ) -> None:
+        self.handler = handler
+        self.delay = delay
+        self.digest = digest
+        self.requests: List[Dict[str, Any]] = []
+        self.connections = 0
+        self.challenges = 0
+        self.nonce_counts: List[int] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port = 0
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    async def __aenter__(self) -> "StubNode":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        assert self._server is not None
+        self._server.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                self.requests.append({"path": path, "headers": headers, "body": body})
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                if self.digest is not None and not self._authorized(headers.get("authorization", "")):
+                    self.challenges += 1
+                    challenge = 'Digest qop="auth",algorithm=MD5,realm="monero-rpc",nonce="abc123"'
+                    self._respond(writer, 401, b"", f"WWW-Authenticate: {challenge}\r\n")
+                    continue
+                self._respond(writer, 200, json.dumps(self._answer(json.loads(body))).encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _answer(self, message: Any) -> Any:
+        if isinstance(message, list):
+            return [self._answer(item) for item in message]
+        try:
+            result = self.handler(message["method"], message.get("params"))
+        except RPCFailure as exc:
+            return {"id": message["id"], "result": None, "error": {"code": exc.code, "message": str(exc)}}
+        return {"id": message["id"], "result": result, "error": None}
+
+    def _authorized(self, header: str) -> bool:
+        if not header.startswith("Digest "):
+            return False
+        fields = {name: quoted or bare for name, quoted, bare in re.findall(r'(\w+)=(?:"([^"]*)"|([^,\s]*))', header)}
+        user, password = self.digest
+
+        def md5(text: str) -> str:
+            return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+        secret = md5(f"{user}:{fields.get('realm')}:{password}")
+        target = md5(f"POST:{fields.get('uri')}")
+        expected = md5(
+            f"{secret}:{fields.get('nonce')}:{fields.get('nc')}:{fields.get('cnonce')}:{fields.get('qop')}:{target}"
+        )
+        if fields.get("username") != user or fields.get("response") != expected:
+            return False
+        self.nonce_counts.append(int(fields["nc"], 16))
+        return True
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, extra: str = "") -> None:
+        head = (
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Unauthorized'}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{extra}\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+@contextlib.contextmanager
+def serve_in_thread(handler: Handler, **options: Any) -> Iterator[StubNode]:
+    """Run a :class:`StubNode` on its own loop thread, for code that calls ``asyncio.run`` itself."""
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    node = StubNode(handler, **options)
+    asyncio.run_coroutine_threadsafe(node.__aenter__(), loop).result()
+    try:
+        yield node
+    finally:
+        asyncio.run_coroutine_threadsafe(node.__aexit__(None, None, None), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
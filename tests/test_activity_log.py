@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from activity_log import ActivityLog
+
+NOON = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_lines_are_stamped_and_drained_as_one_block():
+    log = ActivityLog(capacity=5)
+    assert log.append("hello", now=NOON) == "[12:00:00] hello"
+    log.append("world", now=NOON)
+
+    assert log.has_pending
+    assert log.drain() == ("[12:00:00] hello\n[12:00:00] world\n", 0)
+    assert not log.has_pending
+    assert log.drain() == ("", 0)
+
+
+def test_ring_rotates_and_the_view_is_trimmed_to_capacity():
+    log = ActivityLog(capacity=3)
+    for index in range(2):
+        log.append(f"a{index}", now=NOON)
+    assert log.drain()[1] == 0
+
+    for index in range(2):
+        log.append(f"b{index}", now=NOON)
+    text, trim = log.drain()
+    # Four lines were shown in total, so one scrolls off the top of the widget.
+    assert text.count("\n") == 2 and trim == 1
+    assert [line[11:] for line in log] == ["a1", "b0", "b1"]
+
+
+def test_lines_that_rotate_out_before_a_flush_never_reach_the_view():
+    log = ActivityLog(capacity=3)
+    log.append("old", now=NOON)
+    log.drain()
+
+    for index in range(10):
+        log.append(f"burst {index}", now=NOON)
+    text, trim = log.drain()
+
+    assert text.splitlines() == [f"[12:00:00] burst {index}" for index in range(7, 10)]
+    assert trim == 1  # only "old" is still on screen
+    assert len(log) == 3
+
+
+def test_spill_keeps_the_full_history(tmp_path):
+    path = tmp_path / "activity.log"
+    log = ActivityLog(capacity=4, spill_path=str(path))
+    for index in range(10):
+        log.append(f"line {index}", now=NOON)
+    # The spill buffer is flushed every ``capacity`` lines even without a drain.
+    assert path.read_text(encoding="utf-8").count("\n") == 8
+
+    log.drain()
+    log.append("last", now=NOON)
+    log.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [line[11:] for line in lines] == [f"line {index}" for index in range(10)] + ["last"]
+    assert len(log) == 4
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        ActivityLog(capacity=0)
@@ -0,0 +1,257 @@
+import pytest
+
+from address_check import AddressValidator
+from hd import (
+    BECH32_CHARSET,
+    BECH32_CONST,
+    BECH32M_CONST,
+    P2PKH_VERSION,
+    P2SH_VERSIONS,
+    base58check_decode,
+    base58check_encode,
+    bech32_hrp_expand,
+    bech32_polymod,
+    convert_bits,
+    segwit_address,
+    segwit_decode,
+)
+from monero import MAINNET_INTEGRATED_PREFIX, base58_decode, base58_encode, keccak256
+
+CHECKSUM = "checksum does not match"
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Published vectors, none of them produced by the code under test.
+# BIP-173 and BIP-350: strings whose checksum is valid bech32 / bech32m.
+BECH32_VALID = [
+    "A12UEL5L",
+    "a12uel5l",
+    "an83characterlonghumanreadablepartthatcontainsthenumber1andtheexcludedcharactersbio1tt5tgs",
+    "abcdef1qpzry9x8gf2tvdw0s3jn54khce6mua7lmqqqxw",
+    "split1checkupstagehandshakeupstreamerranterredcaperred2y9e3w",
+    "?1ezyfcl",
+]
+BECH32M_VALID = [
+    "A1LQFN3A",
+    "a1lqfn3a",
+    "an83characterlonghumanreadablepartthatcontainsthetheexcludedcharactersbioandnumber11sg7hg6",
+    "abcdef1l7aum6echk45nj3s0wdvt2fg8x9yrzpqzd3ryx",
+    "split1checkupstagehandshakeupstreamerranterredcaperredlc445v",
+    "?1v759aa",
+]
+# BIP-350 valid segwit addresses and their scriptPubKeys.
+SEGWIT_VALID = [
+    ("BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4", "0014751e76e8199196d454941c45d1b3a323f1433bd6"),
+    (
+        "tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7",
+        "00201863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262",
+    ),
+    (
+        "bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y",
+        "5128751e76e8199196d454941c45d1b3a323f1433bd6751e76e8199196d454941c45d1b3a323f1433bd6",
+    ),
+    ("BC1SW50QGDZ25J", "6002751e"),
+    ("bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcs", "5210751e76e8199196d454941c45d1b3a323"),
+    (
+        "tb1qqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesrxh6hy",
+        "0020000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433",
+    ),
+    (
+        "tb1pqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesf3hn0c",
+        "5120000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433",
+    ),
+    (
+        "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+        "512079be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798",
+    ),
+]
+# BIP-350 invalid segwit addresses, with the reason each one fails.
+SEGWIT_INVALID = [
+    ("tb", "tc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq5zuyut"),  # wrong hrp
+    ("bc", "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqh2y7hd"),  # v1 with bech32
+    ("tb", "tb1z0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqglt7rf"),  # v2 with bech32
+    ("bc", "BC1S0XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ54WELL"),  # v16 with bech32
+    ("bc", "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kemeawh"),  # v0 with bech32m
+    ("tb", "tb1q0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq24jc47"),  # v0 with bech32m
+    ("bc", "bc1p38j9r5y49hruaue7wxjce0updqjuyyx0kh56v8s25huc6995vvpql3jow4"),  # invalid character
+    ("bc", "BC130XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ7ZWS8R"),  # witness version 17
+    ("bc", "bc1pw5dgrnzv"),  # 1-byte program
+    ("bc", "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7v8n0nx0muaewav253zgeav"),  # 41-byte program
+    ("bc", "BC1QR508D6QEJXTDG4Y5R3ZARVARYV98GJ9P"),  # 16-byte v0 program
+    ("tb", "tb1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq47Zagq"),  # mixed case
+    ("bc", "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7v07qwwzcrf"),  # more than 4 padding bits
+    ("tb", "tb1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vpggkg4j"),  # non-zero padding
+    ("bc", "bc1gmk9yu"),  # empty data
+]
+# Litecoin mainnet addresses seen in the wild. The first two carry the
+# BIP-173 example key hash 751e76e8..., as P2PKH and as P2WPKH.
+LTC_P2PKH = [
+    "LVuDpNCSSj6pQ7t9Pv6d6sUkLKoqDEVUnJ",
+    "LdP8Qox1VAhCzLJNqrr74YovaWYyNBUWvL",
+    "LM2WMpR1Rp6j3Sa59cMXMs1SPzj9eXpGc1",
+    "LaMT348PWRnrqeeWArpwQPbuanpXDZGEUz",
+]
+LTC_P2WPKH = "ltc1qw508d6qejxtdg4y5r3zarvary0c5xw7kgmn4n9"
+LTC_P2SH = [
+    "MQMcJhpWHYVeQArcZR3sBgyPZxxRtnH441",
+    "MTf4tP1TCNBn8dNkyxeBVoPrFCcVzxJvvh",
+    "3CDJNfdWX8m2NwuGUV3nhXHXEeLygMXoAj",  # legacy P2SH version byte, shared with Bitcoin
+]
+# The Monero General Fund donation address.
+XMR_GENERAL_FUND = "44AFFq5kSiGBoZ4NMDwYtN18obc8AemS33DBLWs3H7otXft3XjrpDtQGv7SqSsaBYBb98uNbr2VBBEt7f2wfn3RVGQBEP3A"
+
+
+def corrupt(address: str, position: int, alphabet: str) -> str:
+    """``address`` with one character swapped for another from ``alphabet``."""
+
+    char = address[position]
+    replacement = alphabet[(alphabet.index(char) + 1) % len(alphabet)]
+    return address[:position] + replacement + address[position + 1 :]
+
+
+def test_litecoin_addresses_of_every_kind_pass(engine):
+    validator = AddressValidator()
+    addresses = [
+        engine.receive_address("LTC"),
+        engine.receive_address("LTC", 1, change=True),
+        engine.receive_address("LTC").upper(),
+        segwit_address("ltc", 0, bytes(range(32))),
+        segwit_address("ltc", 1, bytes(range(32))),
+        base58check_encode(bytes([P2PKH_VERSION["LTC"]]) + bytes(20)),
+        base58check_encode(bytes([P2SH_VERSIONS["LTC"][0]]) + bytes(20)),
+        base58check_encode(bytes([P2SH_VERSIONS["LTC"][1]]) + bytes(20)),
+    ]
+
+    assert validator.validate_column("LTC", addresses) == {}
+
+
+def test_litecoin_typos_fail_the_checksum(engine):
+    validator = AddressValidator()
+    bech32 = engine.receive_address("LTC")
+    legacy = base58check_encode(bytes([P2PKH_VERSION["LTC"]]) + bytes(range(20)))
+
+    for position in range(4, len(bech32)):
+        assert CHECKSUM in validator.error("LTC", corrupt(bech32, position, BECH32_CHARSET))
+    for position in (1, 10, len(legacy) - 1):
+        assert CHECKSUM in validator.error("LTC", corrupt(legacy, position, BASE58))
+
+
+def bech32_with_constant(hrp: str, version: int, program: bytes, constant: int) -> str:
+    data = [version] + convert_bits(program, 8, 5)
+    polymod = bech32_polymod(bech32_hrp_expand(hrp) + data + [0] * 6) ^ constant
+    checksum = [(polymod >> 5 * (5 - position)) & 31 for position in range(6)]
+    return hrp + "1" + "".join(BECH32_CHARSET[value] for value in data + checksum)
+
+
+def test_litecoin_rejects_the_wrong_checksum_variant_and_foreign_versions():
+    validator = AddressValidator()
+    program = bytes(range(32))
+    # Witness v0 must use the bech32 constant and v1+ bech32m; the swapped pairs are invalid.
+    assert validator.error("LTC", bech32_with_constant("ltc", 0, program, BECH32_CONST)) is None
+    assert validator.error("LTC", bech32_with_constant("ltc", 1, program, BECH32M_CONST)) is None
+    assert CHECKSUM in validator.error("LTC", bech32_with_constant("ltc", 0, program, BECH32M_CONST))
+    assert CHECKSUM in validator.error("LTC", bech32_with_constant("ltc", 1, program, BECH32_CONST))
+    mixed_case = segwit_address("ltc", 0, program)
+    assert validator.error("LTC", mixed_case[:6] + mixed_case[6:].upper()) is not None
+
+    bitcoin_p2pkh = base58check_encode(bytes([0x00]) + bytes(20))
+    assert validator.error("LTC", bitcoin_p2pkh) == "Not a Litecoin address."
+    assert validator.error("LTC", "") == "Destination address is required."
+
+
+def test_monero_standard_and_integrated_addresses(engine):
+    validator = AddressValidator()
+    standard = engine.get_account("XMR").address
+    body = bytes([MAINNET_INTEGRATED_PREFIX]) + base58_decode(standard)[1:65] + bytes(8)
+    integrated = base58_encode(body + keccak256(body)[:4])
+
+    assert len(standard) == 95 and len(integrated) == 106
+    assert validator.validate_column("XMR", [standard, integrated]) == {}
+
+    # The last block carries the checksum, so a typo there must still be caught.
+    for position in (2, 50, 94):
+        assert validator.error("XMR", corrupt(standard, position, BASE58)) is not None
+    assert CHECKSUM in validator.error("XMR", corrupt(standard, 50, BASE58))
+    assert validator.error("XMR", standard[:-1]) == "Not a Monero address."
+    assert validator.error("XMR", engine.receive_address("LTC")) == "Not a Monero address."
+
+
+def test_validate_column_reports_rows_and_checks_each_address_once(engine):
+    validator = AddressValidator()
+    good = engine.receive_address("LTC")
+    bad = corrupt(good, 10, BECH32_CHARSET)
+
+    errors = validator.validate_column("LTC", [good, bad, good, "", bad])
+
+    assert sorted(errors) == [1, 3, 4]
+    assert CHECKSUM in errors[1] and errors[4] == errors[1]
+    assert errors[3] == "Destination address is required."
+    assert validator.misses == 2
+
+    validator.validate_column("LTC", [good, bad])
+    assert validator.hits == 2 and validator.misses == 2
+
+
+def test_the_verdict_cache_is_bounded_and_evicts_least_recently_used(engine):
+    validator = AddressValidator(max_entries=2)
+    first, second, third = (engine.receive_address("LTC", index) for index in range(3))
+
+    validator.error("LTC", first)
+    validator.error("LTC", second)
+    validator.error("LTC", first)  # refreshes first, so second is now the oldest
+    validator.error("LTC", third)
+    assert (validator.hits, validator.misses) == (1, 3)
+
+    validator.error("LTC", first)
+    validator.error("LTC", second)
+    assert (validator.hits, validator.misses) == (2, 4)
+
+
+def checksum_constant(text):
+    lowered = text.lower()
+    separator = lowered.rfind("1")
+    data = [BECH32_CHARSET.index(char) for char in lowered[separator + 1 :]]
+    return bech32_polymod(bech32_hrp_expand(lowered[:separator]) + data)
+
+
+def test_published_bech32_and_bech32m_checksums():
+    assert {checksum_constant(text) for text in BECH32_VALID} == {BECH32_CONST}
+    assert {checksum_constant(text) for text in BECH32M_VALID} == {BECH32M_CONST}
+
+
+@pytest.mark.parametrize("address, script", SEGWIT_VALID)
+def test_published_segwit_addresses_decode_to_their_scripts(address, script):
+    version, program = segwit_decode(address[:2].lower(), address)
+    op = 0 if version == 0 else 0x50 + version
+    assert bytes([op, len(program)]) + program == bytes.fromhex(script)
+
+
+@pytest.mark.parametrize("hrp, address", SEGWIT_INVALID)
+def test_published_invalid_segwit_addresses_are_rejected(hrp, address):
+    assert segwit_decode(hrp, address) is None
+
+
+def test_known_litecoin_addresses():
+    validator = AddressValidator()
+    assert validator.validate_column("LTC", LTC_P2PKH + LTC_P2SH + [LTC_P2WPKH]) == {}
+    key_hash = bytes.fromhex("751e76e8199196d454941c45d1b3a323f1433bd6")
+    assert base58check_decode(LTC_P2PKH[0]) == bytes([P2PKH_VERSION["LTC"]]) + key_hash
+    assert segwit_decode("ltc", LTC_P2WPKH) == (0, key_hash)
+    assert [base58check_decode(address)[0] for address in LTC_P2SH] == [0x32, 0x32, 0x05]
+
+    for address in LTC_P2PKH + LTC_P2SH:
+        assert CHECKSUM in validator.error("LTC", corrupt(address, 20, BASE58))
+    assert CHECKSUM in validator.error("LTC", corrupt(LTC_P2WPKH, 20, BECH32_CHARSET))
+    # The Bitcoin form of the same key is not a Litecoin address.
+    assert validator.error("LTC", SEGWIT_VALID[0][0]) is not None
+
+
+def test_a_real_monero_address_and_a_corrupted_checksum():
+    validator = AddressValidator()
+    assert validator.error("XMR", XMR_GENERAL_FUND) is None
+
+    raw = base58_decode(XMR_GENERAL_FUND)
+    assert raw[0] == 18 and keccak256(raw[:-4])[:4] == raw[-4:]
+    broken = base58_encode(raw[:-1] + bytes([raw[-1] ^ 1]))
+    assert len(broken) == 95
+    assert CHECKSUM in validator.error("XMR", broken)
+    assert CHECKSUM in validator.error("XMR", corrupt(XMR_GENERAL_FUND, 40, BASE58))
@@ -0,0 +1,93 @@
+import hashlib
+
+import pytest
+
+from address_index import AddressEntry, AddressIndex, BloomFilter, output_script, script_for_address
+from hd import HARDENED, P2PKH_VERSION, P2SH_VERSIONS, account_path, base58check_encode, segwit_address
+
+PROGRAM = bytes.fromhex("751e76e8199196d454941c45d1b3a323f1433bd6")
+
+
+def keys(prefix: bytes, count: int):
+    return [hashlib.sha256(prefix + index.to_bytes(4, "big")).digest() for index in range(count)]
+
+
+def false_positive_rate(bloom: BloomFilter, probes) -> float:
+    return sum(key in bloom for key in probes) / len(probes)
+
+
+def test_bloom_filter_never_misses_and_stays_near_its_error_rate():
+    bloom = BloomFilter(capacity=2_000, error_rate=0.01)
+    members = keys(b"in", 2_000)
+    for key in members:
+        bloom.add(key)
+
+    assert all(key in bloom for key in members)
+    assert false_positive_rate(bloom, keys(b"out", 20_000)) < 0.02
+
+
+def test_index_regrows_its_filter_to_keep_the_bound():
+    index = AddressIndex(capacity=100, error_rate=0.01)
+    members = keys(b"in", 1_000)
+    for position, key in enumerate(members):
+        index.add(key, "LTC", 0, (position,))
+
+    assert index.bloom.capacity >= 1_000
+    assert all(index.might_contain(key) for key in members)
+    assert false_positive_rate(index.bloom, keys(b"out", 20_000)) < 0.02
+
+
+def test_output_scripts_for_every_litecoin_address_kind():
+    assert output_script("LTC", segwit_address("ltc", 0, PROGRAM)) == b"\x00\x14" + PROGRAM
+    assert output_script("LTC", segwit_address("ltc", 1, bytes(32))) == b"\x51\x20" + bytes(32)
+    p2pkh = base58check_encode(bytes([P2PKH_VERSION["LTC"]]) + PROGRAM)
+    assert output_script("LTC", p2pkh) == b"\x76\xa9\x14" + PROGRAM + b"\x88\xac"
+    for version in P2SH_VERSIONS["LTC"]:
+        assert output_script("LTC", base58check_encode(bytes([version]) + PROGRAM)) == b"\xa9\x14" + PROGRAM + b"\x87"
+    assert output_script("LTC", base58check_encode(b"\x00" + PROGRAM)) is None
+    assert script_for_address("XMR", "4abc") == b"4abc"
+
+
+def test_derived_addresses_are_found_by_their_output_script(engine):
+    receive = engine.receive_address("LTC", 7)
+    change = engine.receive_address("LTC", 2, change=True)
+    index = engine.address_index
+
+    assert index.match(script_for_address("LTC", receive)) == AddressEntry("LTC", 0, account_path("LTC") + (0, 7))
+    assert index.match(script_for_address("LTC", change)) == AddressEntry("LTC", 0, account_path("LTC") + (1, 2))
+    xmr = engine.get_account("XMR").address
+    assert index.match(script_for_address("XMR", xmr)).symbol == "XMR"
+
+    outputs = [b"\x00\x14" + bytes(20), script_for_address("LTC", change)]
+    assert [entry.path[-2:] for _, entry in index.match_many(outputs)] == [(1, 2)]
+    assert script_for_address("LTC", segwit_address("ltc", 0, bytes(20))) not in index
+
+
+def test_serialization_round_trip(tmp_path):
+    index = AddressIndex(capacity=8)
+    for position, key in enumerate(keys(b"k", 20)):
+        index.add(key, "LTC" if position % 2 else "XMR", position, (84 + HARDENED, position))
+
+    path = str(tmp_path / "addresses.idx")
+    index.save(path)
+    loaded = AddressIndex.load(path)
+
+    assert len(loaded) == 20
+    assert loaded.keys() == index.keys()
+    assert all(loaded.match(key) == index.match(key) for key in index.keys())
+    assert loaded.keys("LTC") == index.keys("LTC")
+    assert loaded.bloom._bits == index.bloom._bits
+    assert (loaded.bloom.bit_count, loaded.bloom.hash_count) == (index.bloom.bit_count, index.bloom.hash_count)
+    assert loaded.to_bytes() == index.to_bytes()
+
+    loaded.add(b"new", "LTC", 0, ())
+    assert loaded.match(b"new") == AddressEntry("LTC", 0, ())
+
+
+def test_corrupt_images_are_rejected():
+    image = AddressIndex().to_bytes()
+
+    with pytest.raises(ValueError, match="Not an address index"):
+        AddressIndex.from_bytes(b"XXXX" + image[4:])
+    with pytest.raises(ValueError, match="trailing data"):
+        AddressIndex.from_bytes(image + b"\0")
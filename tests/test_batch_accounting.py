@@ -0,0 +1,126 @@
+import pytest
+
+from journal import JournalStore
+from pending import BROADCAST, CANCELLED, CONFIRMED, FAILED, STAGED, PendingStore
+from seed import SeedVault
+from wallet_engine import WalletEngine
+
+from conftest import TEST_MNEMONIC
+
+
+def fund(engine, values=(200_000_000, 300_000_000)):
+    engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+    engine.set_balance("LTC", 0)
+    for vout, value in enumerate(values):
+        engine.add_utxo("LTC", f"{vout + 1:064x}", 0, value)
+
+
+def prepare(engine, rows=3):
+    addresses = [engine.receive_address("LTC", 10 + row) for row in range(rows)]
+    batch = engine.prepare_batch("LTC", addresses, [0.5] * rows, [0.0001] * rows)
+    assert batch.accepted, batch.errors
+    return batch
+
+
+def balances(engine):
+    return engine.get_account("LTC").balance_units, engine.get_utxos("LTC").total
+
+
+@pytest.mark.parametrize("row", [0, 1, 2])
+@pytest.mark.parametrize("state", [CANCELLED, FAILED])
+def test_cancelling_any_row_refunds_the_whole_batch_once(engine, row, state):
+    fund(engine)
+    before = balances(engine)
+    batch = prepare(engine)
+    ledger, coins = balances(engine)
+    assert ledger == coins == before[0] - batch.total_amount - batch.total_fee
+
+    engine.update_transaction_state("LTC", batch.tx_ids[row], state)
+
+    assert balances(engine) == before
+    assert {engine.get_transaction("LTC", tx_id).state for tx_id in batch.tx_ids} == {state}
+    with pytest.raises(ValueError):
+        engine.update_transaction_state("LTC", batch.tx_ids[(row + 1) % 3], CANCELLED)
+    assert balances(engine) == before
+
+
+def test_batch_advances_as_one_spend(engine):
+    fund(engine)
+    batch = prepare(engine)
+    spent = balances(engine)
+    engine.update_transaction_state("LTC", batch.tx_ids[2], BROADCAST)
+    engine.update_transaction_state("LTC", batch.tx_ids[1], CONFIRMED)
+    assert [engine.get_transaction("LTC", tx_id).state for tx_id in batch.tx_ids] == [CONFIRMED] * 3
+    assert balances(engine) == spent
+
+
+def test_single_sends_stay_independent(engine):
+    fund(engine)
+    first = engine.send_transaction("LTC", engine.receive_address("LTC", 20), 0.5, 0.0001, "")
+    second = engine.send_transaction("LTC", engine.receive_address("LTC", 21), 0.5, 0.0001, "")
+    engine.update_transaction_state("LTC", second, CANCELLED)
+    assert engine.get_transaction("LTC", first).state == STAGED
+    ledger, coins = balances(engine)
+    assert ledger == coins
+
+
+def test_cancel_waits_for_sends_that_spend_its_change(engine):
+    fund(engine, values=(200_000_000,))
+    before = balances(engine)
+    first = engine.send_transaction("LTC", engine.receive_address("LTC", 20), 0.5, 0.0001, "")
+    second = engine.send_transaction("LTC", engine.receive_address("LTC", 21), 0.5, 0.0001, "")
+    assert engine.get_transaction("LTC", second).inputs[0][0] == first  # spends first's change
+
+    with pytest.raises(ValueError):
+        engine.update_transaction_state("LTC", first, CANCELLED)
+    engine.update_transaction_state("LTC", second, CANCELLED)
+    engine.update_transaction_state("LTC", first, CANCELLED)
+    assert balances(engine) == before
+
+
+def test_batch_ids_survive_journal_replay_and_snapshots(tmp_path):
+    vault = SeedVault(use_process=False)
+    key = bytes(32)
+    engine = WalletEngine(journal=JournalStore(str(tmp_path), key), seed_vault=vault)
+    engine.set_profile("Test", TEST_MNEMONIC)
+    fund(engine)
+    before = balances(engine)
+    batch = prepare(engine)
+    engine.close()
+
+    for snapshot in (False, True):
+        engine = WalletEngine(journal=JournalStore(str(tmp_path), key), seed_vault=vault)
+        assert [engine.get_transaction("LTC", tx_id).batch for tx_id in batch.tx_ids] == [batch.tx_ids[0]] * 3
+        if snapshot:
+            engine.flush()
+            engine.update_transaction_state("LTC", batch.tx_ids[1], CANCELLED)
+            assert balances(engine) == before
+        engine.close()
+    vault.close()
+
+
+def test_restore_reads_rows_without_a_batch_column():
+    store = PendingStore("LTC")
+    rows = store.add_many(["a", "b"], [1, 2], [1, 1], ["", ""], now=1.0, batch=True)
+    data = store.export()
+    legacy = {"sequence": data["sequence"], "records": [row[:10] for row in data["records"]]}
+
+    restored = PendingStore("LTC")
+    restored.restore(data)
+    assert [record.tx_id for record in restored.batch_of(restored.get(rows[1].tx_id))] == [rows[0].tx_id, rows[1].tx_id]
+    restored.restore(legacy)
+    assert restored.get(rows[1].tx_id).batch is None
+
+
+def test_unreadable_rows_are_flagged_without_staging_anything(engine):
+    fund(engine)
+    before = balances(engine)
+    addresses = [engine.receive_address("LTC", 10 + row) for row in range(3)]
+
+    batch = engine.prepare_batch("LTC", addresses, [0.5, float("nan"), "abc"], [0.0001, 0.0001, float("inf")])
+
+    assert not batch.accepted and batch.tx_ids == []
+    assert 0 not in batch.errors
+    assert batch.errors[1] == ["Amount must be a finite number."]
+    assert batch.errors[2] == ["Amount must be a finite number.", "Fee must be a finite number."]
+    assert balances(engine) == before
@@ -0,0 +1,22 @@
+from benchmarks import Result, compare
+
+
+def result(ops, p50, p95):
+    return Result("case", ops=ops, ops_per_sec=100.0, p50_us=p50, p95_us=p95, p99_us=p95, peak_kib=1.0)
+
+
+def baseline(ops, p50, p95):
+    return {"results": {"case": vars(result(ops, p50, p95))}}
+
+
+def test_tail_latency_is_only_gated_with_enough_samples():
+    assert compare(baseline(20, 100.0, 100.0), [result(20, 100.0, 400.0)], 0.25) == []
+    assert compare(baseline(500, 100.0, 100.0), [result(500, 100.0, 400.0)], 0.25) == [
+        "case.p95_us: 100.0 -> 400.0 (+300.0%)"
+    ]
+
+
+def test_slow_cases_are_still_gated_on_the_median():
+    assert compare(baseline(20, 100.0, 100.0), [result(20, 200.0, 200.0)], 0.25) == [
+        "case.p50_us: 100.0 -> 200.0 (+100.0%)"
+    ]
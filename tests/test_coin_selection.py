@@ -0,0 +1,123 @@
+import pytest
+
+from coin_selection import CHANGE_OUTPUT_VSIZE, INPUT_VSIZE, UtxoIndex, select_coins, spend_vsize
+
+COST_OF_CHANGE = CHANGE_OUTPUT_VSIZE + INPUT_VSIZE  # at 1 unit per vbyte
+
+
+def index_of(*values):
+    index = UtxoIndex()
+    for n, value in enumerate(values):
+        index.add(f"{n:064x}", 0, value)
+    return index
+
+
+def test_index_stays_sorted_through_adds_and_spends():
+    index = index_of(500, 100, 300)
+    index.add_many([("ff" * 32, 1, 200), ("ff" * 32, 2, 0), (f"{0:064x}", 0, 999)])
+    assert [value for value, _, _ in index] == [100, 200, 300, 500]
+    assert index.total == 1_100 and len(index) == 4
+
+    assert index.spend(f"{1:064x}", 0) == 100
+    with pytest.raises(KeyError):
+        index.spend(f"{1:064x}", 0)
+    with pytest.raises(ValueError):
+        index.add("aa" * 32, 0, 0)
+    assert index.smallest_at_least(250)[0] == 300
+    assert [value for value, _, _ in index.below(400, 5)] == [300, 200]
+    assert [value for value, _, _ in index.largest(2)] == [500, 300]
+
+
+def test_branch_and_bound_finds_a_changeless_set():
+    index = index_of(10_000, 700, 400, 350, 50)
+    selection = select_coins(index, 1_100, fee_rate=1)
+
+    assert selection.algorithm == "bnb"
+    assert sorted(selection.values) == [400, 700]
+    assert (selection.change, selection.excess) == (0, 0)
+
+
+def test_branch_and_bound_absorbs_a_surplus_below_the_cost_of_change():
+    index = index_of(10_000, 1_050)
+    selection = select_coins(index, 1_000, fee_rate=1)
+
+    assert selection.algorithm == "bnb" and selection.values == [1_050]
+    assert (selection.change, selection.excess) == (0, 50)
+
+
+def test_knapsack_beats_a_large_single_coin():
+    index = index_of(600, 500, 10_000)
+    selection = select_coins(index, 1_000, fee_rate=1)
+
+    assert selection.algorithm == "knapsack"
+    assert sorted(selection.values) == [500, 600]
+    assert (selection.change, selection.excess) == (100, 0)
+
+
+def test_single_coin_when_small_coins_cannot_cover_the_change():
+    selection = select_coins(index_of(600, 300, 5_000), 1_000, fee_rate=1)
+
+    assert selection.algorithm == "single" and selection.values == [5_000]
+    assert selection.change == 4_000
+
+
+def test_largest_first_is_the_last_resort_and_goes_in_descending_order():
+    # No search time: branch-and-bound gives up, and the coins only just cover the target.
+    index = index_of(300, 700, 400)
+    target = 1_350
+    assert index.total < target + COST_OF_CHANGE
+
+    selection = select_coins(index, target, fee_rate=1, max_tries=0)
+
+    assert selection.algorithm == "largest-first"
+    assert selection.values == [700, 400, 300]
+    assert (selection.change, selection.excess) == (0, 50)
+
+
+def test_targets_outside_the_index_are_rejected():
+    index = index_of(100)
+    with pytest.raises(ValueError, match="greater than zero"):
+        select_coins(index, 0, fee_rate=1)
+    with pytest.raises(ValueError, match="Insufficient"):
+        select_coins(index, 101, fee_rate=1)
+
+
+def test_spend_size_counts_inputs_and_outputs():
+    assert spend_vsize(1, 2) == 141
+    assert spend_vsize(3, 2) - spend_vsize(1, 2) == 2 * INPUT_VSIZE
+
+
+def fund(engine, values):
+    engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+    engine.set_balance("LTC", 0)
+    for n, value in enumerate(values):
+        engine.add_utxo("LTC", f"{n + 1:064x}", 0, value)
+
+
+def test_the_fee_grows_with_the_inputs_a_send_needs(engine, monkeypatch):
+    fund(engine, [100_000] * 40)
+    monkeypatch.setattr(engine._fee_estimators["LTC"], "fee_rate", lambda target=2: 100)
+    tx_id = engine.send_transaction("LTC", engine.receive_address("LTC", 9), 0.02, 0.0001, "")
+
+    record = engine.get_transaction("LTC", tx_id)
+    outputs = 1 + bool(record.change)
+    assert len(record.inputs) > 20
+    assert record.fee >= spend_vsize(len(record.inputs), outputs) * 100 > 10_000
+    spent = sum(value for _, _, value in record.inputs)
+    assert spent == record.amount + record.fee + record.change
+    assert engine.get_account("LTC").balance_units == 4_000_000 - record.amount - record.fee
+
+
+def test_a_surplus_absorbed_as_fee_cannot_break_the_fee_cap(engine, monkeypatch):
+    fund(engine, [100_000_000])
+    monkeypatch.setattr(engine._fee_estimators["LTC"], "fee_rate", lambda target=2: 5_000)
+    address = engine.receive_address("LTC", 9)
+    assert engine.validate_transaction("LTC", address, 0.9855, 0.0099) == []
+
+    with pytest.raises(ValueError, match="^Fee would be 0.01450000 LTC"):
+        engine.send_transaction("LTC", address, 0.9855, 0.0099, "")
+    assert engine.get_account("LTC").balance_units == engine.get_utxos("LTC").total == 100_000_000
+
+    batch_address = [engine.receive_address("LTC", 10)]
+    with pytest.raises(ValueError, match="^Fee would be"):
+        engine.prepare_batch("LTC", batch_address, [0.9855], [0.0099])
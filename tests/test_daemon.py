@@ -0,0 +1,141 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from daemon import INTERNAL_ERROR, INVALID_PARAMS, METHOD_NOT_FOUND, NOT_FOUND, WALLET_ERROR, WalletDaemon
+from daemon_client import DaemonClient, DaemonError
+
+
+def request(method, *params, request_id=1):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": list(params)}
+
+
+def code(reply):
+    return reply["error"]["code"]
+
+
+@pytest.fixture
+def daemon(engine):
+    return WalletDaemon(engine, "unused.sock")
+
+
+def test_engine_exceptions_map_to_error_codes(daemon):
+    assert code(daemon.handle(request("close"))) == METHOD_NOT_FOUND
+    assert code(daemon.handle(request("get_account"))) == INVALID_PARAMS
+    assert code(daemon.handle(request("get_account", "DOGE"))) == NOT_FOUND
+    assert code(daemon.handle(request("set_node", "LTC", " "))) == WALLET_ERROR
+    assert daemon.handle(request("get_account", "LTC"))["result"]["symbol"] == "LTC"
+
+
+def broken(symbol, amount, target_blocks=2):
+    raise RuntimeError("estimator state is corrupt")
+
+
+@pytest.mark.parametrize("amount", ["abc", "inf", "nan"])
+def test_unreadable_amounts_are_validation_messages(daemon, amount):
+    reply = daemon.handle(request("validate_transaction", "LTC", "ltc1q", amount, amount, request_id=7))
+    assert "Amount must be a finite number." in reply["result"]
+    assert "Fee must be a finite number." in reply["result"]
+    assert code(daemon.handle(request("send_transaction", "LTC", "ltc1q", amount, 0.001, ""))) == WALLET_ERROR
+
+
+def test_unexpected_exceptions_become_internal_errors(daemon, engine):
+    engine.estimate_fee = broken
+    reply = daemon.handle(request("estimate_fee", "LTC", 0.5, request_id=7))
+    assert reply["id"] == 7 and code(reply) == INTERNAL_ERROR
+
+
+def test_a_failing_call_does_not_abort_its_batch(daemon, engine):
+    engine.estimate_fee = broken
+    replies = daemon.handle(
+        [
+            request("has_profile", request_id=1),
+            request("estimate_fee", "LTC", 0.5, request_id=2),
+            {"jsonrpc": "2.0", "method": "flush", "params": []},  # notification: no reply
+            request("get_account", "XMR", request_id=3),
+        ]
+    )
+    assert [reply["id"] for reply in replies] == [1, 2, 3]
+    assert replies[0]["result"] is True
+    assert code(replies[1]) == INTERNAL_ERROR
+    assert replies[2]["result"]["symbol"] == "XMR"
+
+
+def test_client_round_trip_survives_internal_errors(engine, tmp_path):
+    engine.estimate_fee = broken
+    daemon = WalletDaemon(engine, str(tmp_path / "wallet.sock"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(daemon.start(), loop).result()
+    serving = asyncio.run_coroutine_threadsafe(daemon.serve_forever(), loop)
+    client = DaemonClient(daemon.socket_path, timeout=5.0)
+    try:
+        with pytest.raises(DaemonError) as raised:
+            client.call("estimate_fee", "LTC", 0.5)
+        assert raised.value.code == INTERNAL_ERROR
+        results = client.batch(
+            [("has_profile", None), ("estimate_fee", ["LTC", 0.5]), ("get_profile", None)],
+            return_exceptions=True,
+        )
+        assert results[0] is True and results[2] == {"name": "Test"}
+        assert isinstance(results[1], DaemonError) and results[1].code == INTERNAL_ERROR
+    finally:
+        client.close()
+        loop.call_soon_threadsafe(daemon.stop)
+        serving.result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_only_argument_binding_errors_are_invalid_params(daemon, engine):
+    def estimate_fee(symbol, amount, target_blocks=2):
+        return len(amount)  # a bug inside the engine, not a bad call
+
+    engine.estimate_fee = estimate_fee
+    assert code(daemon.handle(request("estimate_fee", "LTC", 0.5))) == INTERNAL_ERROR
+    assert code(daemon.handle(request("estimate_fee", "LTC"))) == INVALID_PARAMS
+    assert code(daemon.handle(request("estimate_fee", "LTC", 0.5, 2, 3))) == INVALID_PARAMS
+    reply = daemon.handle({"jsonrpc": "2.0", "id": 4, "method": "estimate_fee", "params": {"symbol": "LTC", "fee": 1}})
+    assert code(reply) == INVALID_PARAMS
+
+
+GUI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gui")
+# Modules only a sync, a scan, an export or the GUI needs; the daemon must not pay for them at start.
+DEFERRED = ("multiprocessing", "concurrent.futures.process", "tx_container", "ltc_sync", "xmr_scan", "tkinter", "http.server")
+
+
+def test_daemon_import_skips_deferred_modules():
+    script = f"import sys, daemon; print(','.join(name for name in {DEFERRED!r} if name in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", script], cwd=GUI, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
+
+
+def test_daemon_answers_soon_after_launch(tmp_path):
+    socket_path = str(tmp_path / "wallet.sock")
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(GUI, "daemon.py"), "--socket", socket_path], stderr=subprocess.DEVNULL
+    )
+    client = DaemonClient(socket_path, timeout=5.0)
+    try:
+        while True:
+            try:
+                assert client.call("has_profile") is False
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                assert time.monotonic() - started < 10, "daemon never came up"
+                time.sleep(0.005)
+        elapsed = time.monotonic() - started
+    finally:
+        client.close()
+        process.terminate()
+        process.wait(10)
+    # Generous for slow CI; a start-up that regressed to loading the GUI or pools would blow it.
+    assert elapsed < 2.0
@@ -0,0 +1,52 @@
+from fee_estimator import FEE_PROFILES, FeeEstimator, parse_mempool
+from ledger import from_atomic
+from stub_node import serve_in_thread
+
+
+def test_full_mempool_prices_the_spill_bucket():
+    estimator = FeeEstimator(FEE_PROFILES["LTC"], ttl=0)
+    # 1.5 MvB paying 100 litoshi/vB on top of 1 MvB paying 20: one block fits only the top.
+    estimator.sync_mempool([(f"hi{n}", 100 * 1_000, 1_000) for n in range(1_500)])
+    estimator.sync_mempool(
+        [(f"hi{n}", 100 * 1_000, 1_000) for n in range(1_500)]
+        + [(f"lo{n}", 20 * 1_000, 1_000) for n in range(1_000)]
+    )
+    assert len(estimator) == 2_500
+    assert 100 <= estimator.fee_rate(target=1) <= 111
+    assert 20 <= estimator.fee_rate(target=2) <= 23
+    assert estimator.fee_rate(target=3) == FEE_PROFILES["LTC"].relay_floor
+
+
+def test_sync_drops_transactions_that_left_the_mempool():
+    estimator = FeeEstimator(FEE_PROFILES["LTC"], ttl=0)
+    estimator.sync_mempool([("a", 5_000, 100), ("b", 5_000, 100)])
+    estimator.sync_mempool([("b", 5_000, 100)])
+    assert len(estimator) == 1
+    estimator.add_block(["b"], min_fee_rate=30)
+    assert len(estimator) == 0 and estimator.fee_rate() == 30
+
+
+def test_parse_mempool_reads_both_node_formats():
+    ltc = {"aa": {"vsize": 141, "fees": {"base": 0.0000141}}, "bb": {"vsize": 200, "fee": 0.00001}}
+    assert parse_mempool("LTC", ltc) == [("aa", 1410, 141), ("bb", 1000, 200)]
+    xmr = {"transactions": [{"id_hash": "cc", "fee": 30_000_000, "weight": 1_500, "blob_size": 1_400}]}
+    assert parse_mempool("XMR", xmr) == [("cc", 30_000_000, 1_500)]
+
+
+def test_engine_estimates_fees_from_the_node_mempool(engine):
+    listing = {f"{n:064x}": {"vsize": 1_000, "fees": {"base": 0.001}} for n in range(2_000)}
+
+    def node_answer(method, params):
+        assert (method, params) == ("getrawmempool", [True])
+        return listing
+
+    assert engine.estimate_fee("LTC", 1.0) == 0.001  # proportional fallback
+    with serve_in_thread(node_answer) as node:
+        engine.set_node("LTC", node.address, tls=False)
+        engine.refresh_balances()
+
+    assert len(engine.get_fee_estimator("LTC")) == 2_000
+    # 2 MvB paying 100 litoshi/vB fills both target blocks; outbid that bucket.
+    rate = engine.get_fee_estimator("LTC").fee_rate(2)
+    assert 100 <= rate <= 111
+    assert engine.estimate_fee("LTC", 1.0) == float(from_atomic("LTC", rate * 141))
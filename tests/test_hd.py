@@ -0,0 +1,129 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import hd
+from hd import HARDENED, ExtendedKey, GapLimitScanner, KeyChain, hash160, p2wpkh_address, parse_path
+from seed import mnemonic_to_seed
+
+from conftest import TEST_MNEMONIC
+
+# BIP-32 test vector 1.
+VECTOR_1_SEED = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+VECTOR_1 = [
+    (
+        "m",
+        "xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8",
+        "xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi",
+    ),
+    (
+        "m/0H",
+        "xpub68Gmy5EdvgibQVfPdqkBBCHxA5htiqg55crXYuXoQRKfDBFA1WEjWgP6LHhwBZeNK1VTsfTFUHCdrfp1bgwQ9xv5ski8PX9rL2dZXvgGDnw",
+        "xprv9uHRZZhk6KAJC1avXpDAp4MDc3sQKNxDiPvvkX8Br5ngLNv1TxvUxt4cV1rGL5hj6KCesnDYUhd7oWgT11eZG7XnxHrnYeSvkzY7d2bhkJ7",
+    ),
+    (
+        "m/0H/1",
+        "xpub6ASuArnXKPbfEwhqN6e3mwBcDTgzisQN1wXN9BJcM47sSikHjJf3UFHKkNAWbWMiGj7Wf5uMash7SyYq527Hqck2AxYysAA7xmALppuCkwQ",
+        "xprv9wTYmMFdV23N2TdNG573QoEsfRrWKQgWeibmLntzniatZvR9BmLnvSxqu53Kw1UmYPxLgboyZQaXwTCg8MSY3H2EU4pWcQDnRnrVA1xe8fs",
+    ),
+    (
+        "m/0H/1/2H/2/1000000000",
+        "xpub6H1LXWLaKsWFhvm6RVpEL9P4KfRZSW7abD2ttkWP3SSQvnyA8FSVqNTEcYFgJS2UaFcxupHiYkro49S8yGasTvXEYBVPamhGW6cFJodrTHy",
+        "xprvA41z7zogVVwxVSgdKUHDy1SKmdb533PjDz7J6N6mV6uS3ze1ai8FHa8kmHScGpWmj4WggLyQjgPie1rFSruoUihUZREPSL39UNdE3BBDu76",
+    ),
+]
+
+# BIP-84 vectors for the "abandon ... about" mnemonic (Bitcoin mainnet, coin type 0).
+BIP84 = [
+    ("m/84'/0'/0'/0/0", "bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu"),
+    ("m/84'/0'/0'/0/1", "bc1qnjg0jd8228aq7egyzacy8cys3knf9xvrerkf9g"),
+    ("m/84'/0'/0'/1/0", "bc1q8c6fshw2dlwun7ekn9qwf37cu2rn755upcp6el"),
+]
+
+# RIPEMD-160 vectors from the algorithm's reference page; the 56-byte one spans two blocks.
+RIPEMD160 = [
+    (b"", "9c1185a5c5e9fc54612808977ee8f548b2258d31"),
+    (b"abc", "8eb208f7e05d987a9b044a8e98c6b087f15a0bfc"),
+    (b"message digest", "5d0689ef49d2fae572b881b123a85ffa21595f36"),
+    (b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq", "12a053384a9c0c88e405a06c27dcf49ada62eb2b"),
+    (b"1234567890" * 8, "9b752e45573d4b39f4dbd3323cab82bf63326bfb"),
+]
+
+
+@pytest.mark.parametrize("path, xpub, xprv", VECTOR_1)
+def test_bip32_vector_1(path, xpub, xprv):
+    node = KeyChain(ExtendedKey.from_seed(VECTOR_1_SEED)).derive_path(path)
+
+    assert node.serialize(private=True) == xprv
+    assert node.serialize() == xpub
+
+
+def test_public_derivation_matches_private_for_normal_children():
+    account = KeyChain(ExtendedKey.from_seed(VECTOR_1_SEED)).derive_path("m/0H/1")
+    public = account.neuter().child(2)
+
+    assert public.public_bytes == account.child(2).public_bytes
+    with pytest.raises(ValueError, match="hardened child"):
+        account.neuter().child(HARDENED)
+
+
+@pytest.mark.parametrize("path, address", BIP84)
+def test_bip84_vectors(path, address):
+    chain = KeyChain(ExtendedKey.from_seed(mnemonic_to_seed(TEST_MNEMONIC)))
+
+    assert p2wpkh_address(chain.derive_path(path).public_bytes, "bc") == address
+
+
+def test_keychain_caches_interior_nodes():
+    chain = KeyChain(ExtendedKey.from_seed(VECTOR_1_SEED), max_nodes=8)
+    chain.derive_path("m/84'/2'/0'/0/0")
+    steps = chain.steps
+
+    chain.derive_path("m/84'/2'/0'/0/1")
+
+    assert chain.steps == steps + 1
+    assert len(chain) == 4
+
+
+def test_parse_path_rejects_malformed_paths():
+    assert parse_path("m/84'/2h/0H/1/5") == (84 + HARDENED, 2 + HARDENED, HARDENED, 1, 5)
+    for path in ("84'/0'", "m/x", f"m/{HARDENED}"):
+        with pytest.raises(ValueError):
+            parse_path(path)
+
+
+@pytest.mark.parametrize("message, digest", RIPEMD160)
+def test_ripemd160_fallback(message, digest):
+    assert hd._ripemd160(message).hex() == digest
+
+
+def test_hash160_uses_the_fallback_without_hashlib_ripemd(monkeypatch):
+    key = bytes.fromhex("0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798")
+    real_new = hashlib.new
+
+    def no_ripemd(name, *args, **kwargs):
+        if name == "ripemd160":
+            raise ValueError("unsupported hash type")
+        return real_new(name, *args, **kwargs)
+
+    monkeypatch.setattr(hd.hashlib, "new", no_ripemd)
+
+    # hash160 of the generator point, as in the BIP-173 P2WPKH example.
+    assert hash160(key).hex() == "751e76e8199196d454941c45d1b3a323f1433bd6"
+
+
+def test_gap_limit_scan_stops_after_the_gap():
+    account = KeyChain(ExtendedKey.from_seed(VECTOR_1_SEED)).derive_path("m/84'/2'/0'")
+    addresses = hd.derive_public_window(account.public_bytes, account.chain_code, 0, 0, 40)
+    used = {addresses[3], addresses[9]}
+
+    def is_used(window):
+        return [address for address in window if address in used]
+
+    with ThreadPoolExecutor(2) as executor:
+        result = GapLimitScanner(account, is_used, gap_limit=5, window=4, prefetch=2, executor=executor).scan()
+
+    assert result.used == {3: addresses[3], 9: addresses[9]}
+    assert result.next_index == 10
+    assert result.scanned == 16
@@ -0,0 +1,93 @@
+from history_view import HistoryCursor
+from pending import CANCELLED, PendingStore, RetentionPolicy
+
+
+def history(count):
+    store = PendingStore("LTC", RetentionPolicy(max_records=None))
+    for index in range(count):
+        store.add(f"ltc1q{index:05d}", index + 1, 1, "rent" if index % 10 == 0 else "", now=float(index))
+    return store
+
+
+def show(cursor, store, offset):
+    request = cursor.request(offset)
+    page = store.page(**request)
+    assert cursor.accept(request, page)
+    return page
+
+
+def test_only_the_visible_window_is_fetched_and_offsets_are_clamped():
+    store = history(100_000)
+    cursor = HistoryCursor(rows=10)
+
+    page = show(cursor, store, 0)
+    assert [record.tx_id for record in page.records][:2] == ["ltc-100000", "ltc-99999"]
+    assert (cursor.offset, cursor.total, len(page.records)) == (0, 100_000, 10)
+
+    show(cursor, store, cursor.scrolled("moveto", "0.5"))
+    assert cursor.offset == 50_000
+    show(cursor, store, cursor.scrolled("scroll", "1", "pages"))
+    assert cursor.offset == 50_010
+    show(cursor, store, cursor.scrolled("scroll", "-3", "units"))
+    assert cursor.offset == 50_007
+    assert cursor.scrolled("noop", "0") is None
+
+    assert cursor.request(10**9)["offset"] == 99_990
+    assert cursor.request(-5)["offset"] == 0
+
+
+def test_sort_and_filters_are_pushed_down_with_the_request():
+    store = history(50)
+    cursor = HistoryCursor(rows=5)
+    cursor.sort_by("amount")
+    assert (cursor.sort, cursor.descending) == ("amount", True)
+    cursor.sort_by("amount")
+    assert cursor.descending is False
+    cursor.sort_by("address")
+    assert (cursor.sort, cursor.descending) == ("address", False)
+
+    cursor.sort_by("amount")
+    cursor.query = "RENT"
+    page = show(cursor, store, 0)
+    assert cursor.total == 5
+    assert [record.amount for record in page.records] == [41, 31, 21, 11, 1]
+
+    store.set_state("ltc-0021", CANCELLED)
+    cursor.query = ""
+    cursor.state = CANCELLED
+    page = show(cursor, store, 0)
+    assert [record.tx_id for record in page.records] == ["ltc-0021"]
+
+
+def test_replies_to_superseded_requests_are_dropped():
+    store = history(100)
+    cursor = HistoryCursor(rows=10)
+    show(cursor, store, 0)
+
+    slow = cursor.request(30)
+    fast = cursor.request(60)
+    assert cursor.accept(fast, store.page(**fast))
+    assert not cursor.accept(slow, store.page(**slow))
+    assert cursor.offset == 60
+
+
+def test_a_reload_after_the_store_changes_shows_the_new_state():
+    store = history(30)
+    cursor = HistoryCursor(rows=10)
+    before = show(cursor, store, 25)
+    assert cursor.offset == 20
+
+    # A reply computed before the change, for a request since replaced by a reload.
+    stale = cursor.request(cursor.offset)
+    stale_page = store.page(**stale)
+    store.retention.max_records = 12
+    for index in range(25):
+        store.set_state(f"ltc-{index + 1:04d}", CANCELLED, now=100.0 + index)
+    reload = cursor.request(cursor.offset)
+    fresh = store.page(**reload)
+
+    assert not cursor.accept(stale, stale_page)
+    assert cursor.accept(reload, fresh)
+    assert fresh.version != before.version
+    assert (cursor.total, cursor.offset) == (12, 2)
+    assert len(fresh.records) == 10
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from journal import JournalStore
+
+KEY = bytes(range(32))
+
+
+def _segment_bytes(directory):
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.startswith("journal-")
+    )
+
+
+def test_idle_group_is_flushed_without_further_appends(tmp_path):
+    store = JournalStore(str(tmp_path), KEY, group_size=64, group_interval=0.05)
+    store.load()
+    store.append("profile", {"name": "a"})
+    store.append("node", {"symbol": "LTC"})
+    store.append("send", {"amount": 1})
+    deadline = time.monotonic() + 2
+    while _segment_bytes(tmp_path) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # No close(): a second store sees what a crash would have left on disk.
+    _, entries = JournalStore(str(tmp_path), KEY).load()
+    assert [op for op, _ in entries] == ["profile", "node", "send"]
+    store.close()
+
+
+def test_close_commits_and_stops_the_flusher(tmp_path):
+    store = JournalStore(str(tmp_path), KEY, group_interval=60)
+    store.load()
+    store.append("send", {"amount": 1})
+    flusher = store._flusher
+    store.close()
+    assert flusher is not None and not flusher.is_alive()
+    _, entries = JournalStore(str(tmp_path), KEY).load()
+    assert entries == [("send", {"amount": 1})]
+
+
+def test_torn_tail_is_dropped_and_appends_continue(tmp_path):
+    store = JournalStore(str(tmp_path), KEY)
+    store.load()
+    store.append("a", {})
+    store.append("b", {})
+    store.close()
+    (name,) = [name for name in os.listdir(tmp_path) if name.startswith("journal-")]
+    with open(os.path.join(tmp_path, name), "ab") as handle:
+        handle.write(b"\x00\x00\x01\x00partial")
+
+    reopened = JournalStore(str(tmp_path), KEY)
+    _, entries = reopened.load()
+    assert [op for op, _ in entries] == ["a", "b"]
+    reopened.append("c", {})
+    reopened.close()
+    _, entries = JournalStore(str(tmp_path), KEY).load()
+    assert [op for op, _ in entries] == ["a", "b", "c"]
+
+
+def test_tampered_record_is_rejected(tmp_path):
+    store = JournalStore(str(tmp_path), KEY)
+    store.load()
+    store.append("send", {"amount": 1})
+    store.close()
+    (name,) = [name for name in os.listdir(tmp_path) if name.startswith("journal-")]
+    path = os.path.join(tmp_path, name)
+    data = bytearray(open(path, "rb").read())
+    data[30] ^= 1
+    open(path, "wb").write(bytes(data))
+    with pytest.raises(ValueError):
+        JournalStore(str(tmp_path), KEY).load()
+
+
+def test_wrong_key_is_rejected(tmp_path):
+    store = JournalStore(str(tmp_path), KEY)
+    store.load()
+    store.append("send", {"amount": 1})
+    store.close()
+    with pytest.raises(ValueError):
+        JournalStore(str(tmp_path), bytes(32)).load()
+
+
+def test_snapshot_compacts_and_tail_replays(tmp_path):
+    store = JournalStore(str(tmp_path), KEY, snapshot_every=3)
+    store.load()
+    for index in range(3):
+        store.append("n", {"i": index})
+    assert store.snapshot_due
+    store.write_snapshot({"count": 3})
+    store.append("n", {"i": 3})
+    store.close()
+
+    reopened = JournalStore(str(tmp_path), KEY)
+    state, entries = reopened.load()
+    assert state == {"count": 3}
+    assert entries == [("n", {"i": 3})]
+    assert reopened.append("n", {"i": 4}) == 5
+    reopened.close()
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+
+from ledger import MAX_UNITS, Ledger, format_amount, from_atomic, to_atomic
+
+
+def test_to_atomic_is_exact_and_rounds_half_to_even():
+    assert to_atomic("LTC", 0.1) == 10_000_000
+    assert to_atomic("LTC", 0.1 + 0.2) == 30_000_000
+    assert to_atomic("LTC", "12.5") == 1_250_000_000
+    assert to_atomic("XMR", Decimal("0.000000000001")) == 1
+    assert to_atomic("LTC", "0.000000005") == 0
+    assert to_atomic("LTC", "0.000000015") == 2
+    assert to_atomic("LTC", "0.000000025") == 2
+    assert to_atomic("LTC", "-0.000000015") == -2
+    assert to_atomic("LTC", 3) == 300_000_000
+    assert format_amount("LTC", 1) == "0.00000001"
+    assert from_atomic("XMR", 1_500_000_000_000) == Decimal("1.5")
+
+
+@pytest.mark.parametrize("amount", ["abc", "", float("nan"), float("inf"), "-Infinity", "sNaN", None])
+def test_to_atomic_rejects_anything_but_finite_numbers(amount):
+    with pytest.raises(ValueError):
+        to_atomic("LTC", amount)
+
+
+def test_unknown_assets_are_key_errors():
+    with pytest.raises(KeyError):
+        to_atomic("DOGE", 1)
+    with pytest.raises(KeyError):
+        Ledger().balance("DOGE")
+
+
+def test_credit_and_debit_stay_within_the_unsigned_64_bit_range():
+    ledger = Ledger()
+    ledger.open("LTC")
+    assert ledger.credit("LTC", MAX_UNITS - 5) == MAX_UNITS - 5
+    assert ledger.credit("LTC", 5) == MAX_UNITS
+    with pytest.raises(ValueError, match="overflow"):
+        ledger.credit("LTC", 1)
+    assert ledger.balance("LTC") == MAX_UNITS
+
+    assert ledger.debit("LTC", MAX_UNITS) == 0
+    with pytest.raises(ValueError, match="Insufficient"):
+        ledger.debit("LTC", 1)
+    for method in (ledger.credit, ledger.debit):
+        with pytest.raises(ValueError, match="negative"):
+            method("LTC", -1)
+    assert ledger.balance("LTC") == 0
+
+
+def test_multi_row_updates_are_all_or_nothing():
+    ledger = Ledger()
+    ledger.open("XMR", sub_accounts=3)
+    ledger.apply("XMR", [0, 1], [100, 50])
+    with pytest.raises(ValueError, match="Sub-account 1 would be overdrawn"):
+        ledger.apply("XMR", [0, 1, 1], [10, -30, -30])
+    with pytest.raises(ValueError, match="Sub-account 2 would overflow"):
+        ledger.apply("XMR", [0, 2], [1, MAX_UNITS + 1])
+    assert list(ledger.balances("XMR")) == [100, 50, 0]
+
+    ledger.apply("XMR", [1, 1, 2], [-30, -20, 7])
+    assert list(ledger.balances("XMR")) == [100, 0, 7]
+    with pytest.raises(ValueError):
+        ledger.apply("XMR", [0], [1, 2])
+
+
+def test_sub_accounts_load_grow_and_reconcile():
+    ledger = Ledger()
+    ledger.open("LTC", sub_accounts=2)
+    ledger.load("LTC", [5, 6, 7, 8])
+    assert ledger.sub_account_count("LTC") == 4 and ledger.total("LTC") == 26
+    assert ledger.add_sub_accounts("LTC", 1000) == 4
+    assert ledger.sub_account_count("LTC") == 1004 and ledger.balance("LTC", 1003) == 0
+
+    view = ledger.balances("LTC")
+    with pytest.raises(TypeError):
+        view[0] = 1
+    expected = [5, 6, 9, 8] + [0] * 1000
+    assert ledger.reconcile("LTC", expected) == [2]
+    with pytest.raises(ValueError):
+        ledger.reconcile("LTC", [5])
+    with pytest.raises(ValueError):
+        ledger.open("XMR", sub_accounts=0)
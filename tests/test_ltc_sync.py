@@ -0,0 +1,122 @@
+import hashlib
+
+from address_index import output_script
+from hd import account_path
+from ledger import from_atomic
+from ltc_sync import FilterSync, build_filter, filter_header, filter_matches
+from pending import CONFIRMED
+
+OTHER = bytes.fromhex("0014" + "77" * 20)
+
+
+def txid(label):
+    return hashlib.sha256(label.encode()).hexdigest()
+
+
+class FakeChain:
+    """In-memory litecoind answering the calls FilterSync makes.
+
+    ``blocks`` is a list of transaction lists: ``(label, [(txid, vout)], [(script, coins)])``.
+    """
+
+    def __init__(self, blocks, fork=""):
+        self.hashes, self.filters, self.bodies = [], [], []
+        scripts = {}
+        previous = bytes(32)
+        for height, txs in enumerate(blocks):
+            block_hash = hashlib.sha256(f"{fork}{height}".encode()).hexdigest()
+            elements, body = [], []
+            for label, spends, outputs in txs:
+                elements += [scripts[outpoint] for outpoint in spends if outpoint in scripts]
+                body.append(
+                    {
+                        "txid": txid(label),
+                        "vin": [{"txid": spent, "vout": vout} for spent, vout in spends],
+                        "vout": [
+                            {"n": n, "value": coins, "scriptPubKey": {"hex": script.hex()}}
+                            for n, (script, coins) in enumerate(outputs)
+                        ],
+                    }
+                )
+                for n, (script, _) in enumerate(outputs):
+                    scripts[(txid(label), n)] = script
+                    elements.append(script)
+            filter_bytes = build_filter(block_hash, elements)
+            previous = filter_header(filter_bytes, previous)
+            self.hashes.append(block_hash)
+            self.filters.append({"filter": filter_bytes.hex(), "header": previous[::-1].hex()})
+            self.bodies.append({"tx": body})
+
+    def factory(self):
+        return self
+
+    async def call(self, method, params=None):
+        if method == "getblockcount":
+            return len(self.hashes) - 1
+        if method == "getblockhash":
+            return self.hashes[params[0]]
+        height = self.hashes.index(params[0])
+        return self.filters[height] if method == "getblockfilter" else self.bodies[height]
+
+    async def close(self):
+        pass
+
+
+def coins(engine):
+    return engine.get_account("LTC").balance_units, engine.get_utxos("LTC").total
+
+
+def test_filters_match_only_their_scripts():
+    block_hash = "11" * 32
+    ours = [bytes([0, 20]) + bytes([n]) * 20 for n in range(5)]
+    encoded = build_filter(block_hash, ours)
+    assert filter_matches(block_hash, encoded, [ours[3]])
+    assert not filter_matches(block_hash, encoded, [OTHER])
+
+
+def test_own_send_confirms_and_change_is_not_credited_twice(engine, tmp_path):
+    engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+    engine.set_balance("LTC", 0)
+    receive = output_script("LTC", engine.receive_address("LTC"))
+    change = output_script("LTC", engine.receive_address("LTC", change=True))
+    funding = [("funding", [], [(receive, 1.0)])]
+    chain = FakeChain([[], funding])
+    sync = FilterSync(engine, chain.factory, str(tmp_path / "ltc.json"))
+    sync.run_blocking()
+    assert coins(engine) == (10**8, 10**8)
+    assert engine.utxo_path("LTC", txid("funding"), 0) == account_path("LTC") + (0, 0)
+
+    tx_id = engine.send_transaction("LTC", engine.receive_address("LTC", 9), 0.3, 0.0001, "")
+    record = engine.get_transaction("LTC", tx_id)
+    assert record.change and (tx_id, 1) in engine.get_utxos("LTC")
+    spend = ("spend", [(txid("funding"), 0)], [(OTHER, 0.3), (change, float(from_atomic("LTC", record.change)))])
+    chain = FakeChain([[], funding, [spend]])
+    sync.client_factory = chain.factory
+    report = sync.run_blocking()
+
+    assert report.sends_confirmed == 1 and report.outputs_received == 0
+    assert engine.get_transaction("LTC", tx_id).state == CONFIRMED
+    utxos = engine.get_utxos("LTC")
+    assert (tx_id, 1) not in utxos and utxos.get(txid("spend"), 1) == record.change
+    assert coins(engine) == (record.change, record.change)
+    assert engine.utxo_path("LTC", txid("funding"), 0) is None
+    assert engine.utxo_path("LTC", txid("spend"), 1) == account_path("LTC") + (1, 0)
+
+
+def test_reorg_rolls_back_coins_from_disconnected_blocks(engine, tmp_path):
+    engine.set_balance("LTC", 0)
+    receive = output_script("LTC", engine.receive_address("LTC"))
+    kept = [("kept", [], [(receive, 1.0)])]
+    orphaned = [("paid", [], [(receive, 0.5)]), ("swept", [(txid("kept"), 0)], [(OTHER, 0.9)])]
+    chain = FakeChain([[], kept, orphaned])
+    sync = FilterSync(engine, chain.factory, str(tmp_path / "ltc.json"), reorg_depth=1)
+    sync.run_blocking()
+    assert coins(engine) == (50_000_000, 50_000_000)
+
+    sync.client_factory = FakeChain([[], kept, [], []], fork="b").factory
+    report = sync.run_blocking()
+
+    assert report.blocks_rolled_back == 1 and report.start_height == 2
+    assert coins(engine) == (10**8, 10**8)
+    assert engine.get_utxos("LTC").get(txid("kept"), 0) == 10**8
+    assert engine.utxo_path("LTC", txid("kept"), 0) == account_path("LTC") + (0, 0)
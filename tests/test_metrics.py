@@ -0,0 +1,142 @@
+import threading
+import urllib.request
+
+import pytest
+
+from metrics import Histogram, Metrics
+from seed import SeedVault
+from wallet_engine import INSTRUMENTED_METHODS, WalletEngine
+
+
+class CountingLock:
+    """A lock that counts acquisitions, to check how often the hot path takes it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.acquired += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+
+def test_instrumented_calls_take_the_lock_once_even_when_they_fail():
+    metrics = Metrics()
+    lock = metrics._lock = CountingLock()
+
+    def work(fail):
+        if fail:
+            raise ValueError("no")
+        return "done"
+
+    wrapped = metrics.instrument("work", work, (("wallet", "a"),))
+    before = lock.acquired
+    assert wrapped(False) == "done"
+    with pytest.raises(ValueError):
+        wrapped(True)
+
+    assert lock.acquired - before == 2
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {
+        'calls_total{method="work",wallet="a"}': 2,
+        'errors_total{method="work",wallet="a"}': 1,
+    }
+    assert snapshot["histograms"]['call_seconds{method="work",wallet="a"}']["count"] == 2
+    assert wrapped.__name__ == "work"
+
+
+def test_prometheus_text_format():
+    metrics = Metrics(namespace="kw")
+    metrics.inc("sends_total", (("asset", "LTC"),))
+    metrics.inc("sends_total", (("asset", "LTC"),), 2)
+    metrics.set_gauge("height", 1.5)
+    metrics.set_gauge("note", 3, (("text", 'say "hi"\\\n'),))
+    metrics.observe("latency", 0.003)
+    metrics.observe("latency", 20.0)
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert lines[:2] == ["# TYPE kw_sends_total counter", 'kw_sends_total{asset="LTC"} 3']
+    assert "# TYPE kw_height gauge" in lines
+    assert "kw_height 1.5" in lines
+    assert 'kw_note{text="say \\"hi\\"\\\\\\n"} 3' in lines
+    assert lines.count("# TYPE kw_latency histogram") == 1
+    assert 'kw_latency_bucket{le="0.0025"} 0' in lines
+    assert 'kw_latency_bucket{le="0.005"} 1' in lines
+    assert 'kw_latency_bucket{le="10.0"} 1' in lines
+    assert 'kw_latency_bucket{le="+Inf"} 2' in lines
+    assert "kw_latency_sum 20.003" in lines
+    assert lines[-1] == "kw_latency_count 2"
+
+
+def test_collector_gauges_are_read_at_export_time():
+    metrics = Metrics()
+    depth = [3]
+
+    def collector():
+        yield "queue_depth", (("queue", "send"),), depth[0]
+
+    metrics.add_collector(collector)
+    assert metrics.snapshot()["gauges"] == {'queue_depth{queue="send"}': 3}
+    depth[0] = 7
+    assert 'kernel_wallet_queue_depth{queue="send"} 7' in metrics.to_prometheus()
+
+    metrics.remove_collector(collector)
+    metrics.remove_collector(collector)
+    assert metrics.snapshot()["gauges"] == {}
+
+
+def test_engine_gauges_come_from_its_collector():
+    metrics = Metrics()
+    vault = SeedVault(use_process=False)
+    instrumented = WalletEngine(metrics=metrics, seed_vault=vault, metric_labels=(("wallet", "w"),))
+    try:
+        gauges = metrics.snapshot()["gauges"]
+        assert gauges['pending_depth{asset="LTC",state="staged",wallet="w"}'] == 0
+        assert instrumented.validate_transaction("LTC", "", 0.0, 0.0)
+        counters = metrics.snapshot()["counters"]
+        assert counters['calls_total{method="validate_transaction",wallet="w"}'] == 1
+        assert any(key.startswith("validation_failures_total") for key in counters)
+    finally:
+        instrumented.close()
+        vault.close()
+    assert metrics.snapshot()["gauges"] == {}
+
+
+def test_disabled_metrics_leave_the_engine_unwrapped(engine):
+    assert engine.metrics is None
+    for name in INSTRUMENTED_METHODS:
+        assert name not in vars(engine)
+        assert getattr(engine, name).__func__ is getattr(WalletEngine, name)
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0, 9.0):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 2.0
+    assert histogram.quantile(0.8) == 4.0
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_file_and_socket_export(tmp_path):
+    metrics = Metrics()
+    metrics.inc("calls_total")
+    path = tmp_path / "wallet.prom"
+    metrics.write_prometheus(str(path))
+    assert path.read_text(encoding="utf-8") == metrics.to_prometheus()
+
+    server = metrics.serve(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.read().decode() == metrics.to_prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
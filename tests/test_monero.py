@@ -0,0 +1,69 @@
+from monero import (
+    IDENTITY,
+    L,
+    MoneroKeys,
+    base58_decode,
+    base58_encode,
+    base_mult,
+    compress,
+    decode_amount,
+    decode_legacy_amount,
+    decompress,
+    hash_to_point,
+    hash_to_scalar,
+    keccak256,
+    key_image,
+    scalar_mult,
+)
+
+
+def test_keccak_uses_the_original_padding():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    assert keccak256(b"abc").hex() == "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45"
+
+
+def test_hash_to_ec_matches_monero():
+    # tests/crypto/tests.txt in the Monero source tree.
+    data = bytes.fromhex("da66e9ba613919dec28ef367a125bb310d6d83fb9052e71034164b6dc4f392d0")
+    assert compress(hash_to_point(data)).hex() == "52b3f38753b4e13b74624862e253072cf12f745d43fcfafbe8c217701a6e5875"
+
+
+def test_hashed_points_are_in_the_prime_order_subgroup():
+    for seed in range(32):
+        point = decompress(compress(hash_to_point(bytes([seed]) * 32)))
+        assert point is not None
+        assert compress(scalar_mult(L, point)) == compress(IDENTITY)
+
+
+def test_key_images_depend_on_the_secret_and_the_key():
+    secret = hash_to_scalar(b"one-time")
+    public = compress(base_mult(secret))
+    image = key_image(secret, public)
+
+    assert image == key_image(secret + L, public)
+    assert image == compress(scalar_mult(secret, hash_to_point(public)))
+    assert image != key_image(secret + 1, compress(base_mult(secret + 1)))
+
+
+def test_amount_decoding_round_trips():
+    scalar = hash_to_scalar(b"output")
+    mask = keccak256(b"amount" + scalar.to_bytes(32, "little"))[:8]
+    compact = bytes(a ^ b for a, b in zip((123_456_789).to_bytes(8, "little"), mask))
+    assert decode_amount(compact, scalar) == 123_456_789
+
+    offset = hash_to_scalar(hash_to_scalar(scalar.to_bytes(32, "little")).to_bytes(32, "little"))
+    legacy = ((987_654_321 + offset) % L).to_bytes(32, "little")
+    assert decode_legacy_amount(legacy, scalar) == 987_654_321
+
+
+def test_base58_blocks_and_keys():
+    for size in (0, 1, 7, 8, 9, 69):
+        data = bytes(range(size))
+        assert base58_decode(base58_encode(data)) == data
+    assert base58_decode("0OIl") is None
+
+    keys = MoneroKeys(7)
+    assert keys.spend_public == compress(base_mult(7))
+    assert keys.view_secret == hash_to_scalar((7).to_bytes(32, "little"))
+    assert keys.address().startswith("4") and len(keys.address()) == 95
+    assert "7" not in repr(keys)
@@ -0,0 +1,113 @@
+import asyncio
+import base64
+
+import pytest
+
+from node_client import NodeClient, NodeConnectionError, NodeRPCError
+from stub_node import RPCFailure, StubNode
+from wallet_engine import NodeConfig
+
+
+def echo(method, params):
+    if method == "fail":
+        raise RPCFailure(-5, "No such block")
+    return [method, params]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_calls_in_one_tick_are_batched_and_answered_in_order():
+    async def scenario():
+        async with StubNode(echo) as node:
+            async with NodeClient(NodeConfig("LTC", node.address, tls=False), batch_size=100) as client:
+                results = await client.call_many(("getblockhash", [height]) for height in range(250))
+            return node, results
+
+    node, results = run(scenario())
+    assert results == [["getblockhash", [height]] for height in range(250)]
+    assert len(node.requests) == 3  # 100 + 100 + 50
+
+
+def test_pool_bounds_connections_and_pipelines_requests():
+    async def scenario():
+        async with StubNode(echo, delay=0.01) as node:
+            client = NodeClient(NodeConfig("XMR", node.address, tls=False), pool_size=2, pipeline_depth=8)
+            async with client:
+                results = await asyncio.gather(*(client.call("get_info", {"n": n}) for n in range(40)))
+            return node, results
+
+    node, results = run(scenario())
+    assert results == [["get_info", {"n": n}] for n in range(40)]
+    assert len(node.requests) == 40
+    assert node.connections <= 2
+
+
+def test_rpc_error_keeps_its_code_and_other_batch_entries_succeed():
+    async def scenario():
+        async with StubNode(echo) as node:
+            async with NodeClient(NodeConfig("LTC", node.address, tls=False)) as client:
+                return await client.call_many([("getblockcount", None), ("fail", None)], return_exceptions=True)
+
+    ok, error = run(scenario())
+    assert ok == ["getblockcount", None]
+    assert isinstance(error, NodeRPCError) and error.code == -5
+
+
+def test_timeout_drops_the_connection_and_the_client_recovers():
+    async def scenario():
+        async with StubNode(echo, delay=0.3) as node:
+            async with NodeClient(NodeConfig("XMR", node.address, tls=False), timeout=0.05) as client:
+                with pytest.raises(NodeConnectionError):
+                    await client.call("get_info")
+                node.delay = 0.0
+                return await client.call("get_info")
+
+    assert run(scenario()) == ["get_info", None]
+
+
+def test_unreachable_node_is_a_connection_error():
+    async def scenario():
+        async with NodeClient(NodeConfig("LTC", "127.0.0.1:1", tls=False), timeout=1.0) as client:
+            await client.call("getblockcount")
+
+    with pytest.raises(NodeConnectionError):
+        run(scenario())
+
+
+def test_litecoin_credentials_use_basic_auth():
+    async def scenario():
+        async with StubNode(echo) as node:
+            async with NodeClient(NodeConfig("LTC", node.address, tls=False), auth=("rpc", "secret")) as client:
+                await client.call("getblockcount")
+            return node
+
+    node = run(scenario())
+    expected = "Basic " + base64.b64encode(b"rpc:secret").decode("ascii")
+    assert node.requests[0]["headers"]["authorization"] == expected
+
+
+def test_monero_digest_challenge_is_answered_once_then_reused():
+    async def scenario():
+        async with StubNode(echo, digest=("monero", "hunter2")) as node:
+            client = NodeClient(NodeConfig("XMR", node.address, tls=False), auth=("monero", "hunter2"))
+            async with client:
+                results = [await client.call("get_block_count") for _ in range(5)]
+            return node, results
+
+    node, results = run(scenario())
+    assert results == [["get_block_count", None]] * 5
+    assert node.challenges == 1
+    assert node.nonce_counts == [1, 2, 3, 4, 5]
+
+
+def test_monero_wrong_password_is_reported_as_bad_credentials():
+    async def scenario():
+        async with StubNode(echo, digest=("monero", "hunter2")) as node:
+            async with NodeClient(NodeConfig("XMR", node.address, tls=False), auth=("monero", "wrong")) as client:
+                await client.call("get_block_count")
+
+    with pytest.raises(NodeRPCError) as caught:
+        run(scenario())
+    assert caught.value.code == 401
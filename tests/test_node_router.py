@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from node_client import NodeClient, NodeConnectionError, NodeRPCError
+from node_router import NodeRouter
+from pending import BROADCAST, STAGED
+from stub_node import RPCFailure, StubNode, serve_in_thread
+from wallet_engine import NodeConfig
+
+# Nothing listens here: connections are refused straight away.
+DEAD = "127.0.0.1:1"
+
+
+def answer(method, params):
+    if method == "fail":
+        raise RPCFailure(-8, "Block height out of range")
+    return method
+
+
+def plain(node):
+    return NodeClient(node, timeout=2.0)
+
+
+def test_failover_when_the_primary_is_down():
+    async def scenario():
+        async with StubNode(answer) as node:
+            router = NodeRouter(
+                [NodeConfig("LTC", DEAD, tls=False), NodeConfig("LTC", node.address, tls=False)],
+                client_factory=plain,
+            )
+            try:
+                result = await router.call("getblockcount")
+            finally:
+                await router.close()
+            return result, router.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == "getblockcount"
+    assert stats[0]["error_rate"] > 0 and stats[0]["samples"] == 0
+    assert stats[1]["samples"] == 1
+
+
+def test_slow_primary_is_hedged_to_the_backup():
+    async def scenario():
+        async with StubNode(answer, delay=1.0) as slow, StubNode(answer) as fast:
+            router = NodeRouter(
+                [NodeConfig("LTC", slow.address, tls=False), NodeConfig("LTC", fast.address, tls=False)],
+                client_factory=plain,
+                min_hedge_delay=0.05,
+            )
+            started = time.monotonic()
+            try:
+                result = await router.call("getblockcount")
+            finally:
+                await router.close()
+            return result, time.monotonic() - started, slow, fast
+
+    result, elapsed, slow, fast = asyncio.run(scenario())
+    assert result == "getblockcount"
+    assert elapsed < 0.5
+    assert len(slow.requests) == 1 and len(fast.requests) == 1
+
+
+def test_failing_endpoint_is_ejected_and_shared_health_remembers_it():
+    health = {}
+
+    async def scenario():
+        async with StubNode(answer) as node:
+            nodes = [NodeConfig("LTC", DEAD, tls=False), NodeConfig("LTC", node.address, tls=False)]
+            for _ in range(2):
+                router = NodeRouter(nodes, client_factory=plain, eject_after=1, base_backoff=30.0, health=health)
+                try:
+                    await router.call("getblockcount")
+                finally:
+                    await router.close()
+            return node
+
+    node = asyncio.run(scenario())
+    assert health[DEAD].ejected_until > time.monotonic()
+    assert health[DEAD].error_rate == pytest.approx(0.1)  # only the first run tried it
+    assert len(node.requests) == 2
+
+
+def test_rpc_errors_are_answers_not_failures():
+    async def scenario():
+        async with StubNode(answer) as first, StubNode(answer) as second:
+            router = NodeRouter(
+                [NodeConfig("LTC", first.address, tls=False), NodeConfig("LTC", second.address, tls=False)],
+                client_factory=plain,
+            )
+            try:
+                with pytest.raises(NodeRPCError) as raised:
+                    await router.call("fail")
+            finally:
+                await router.close()
+            return raised.value, router.stats(), second
+
+    error, stats, second = asyncio.run(scenario())
+    assert error.code == -8 and not isinstance(error, NodeConnectionError)
+    assert stats[0]["error_rate"] == 0.0
+    assert not second.requests
+
+
+def test_engine_broadcasts_through_its_configured_nodes(engine):
+    seen = []
+
+    def node_answer(method, params):
+        seen.append((method, params))
+        return "ab" * 32
+
+    with serve_in_thread(node_answer) as node:
+        engine.set_node("LTC", DEAD, tls=False)
+        engine.add_node("LTC", node.address, tls=False)
+        tx_id = engine.send_transaction("LTC", engine.receive_address("LTC", 5), 0.5, 0.001, "")
+        assert engine.get_transaction("LTC", tx_id).state == STAGED
+        record = engine.broadcast_transaction("LTC", tx_id, "0200")
+
+    assert record.state == BROADCAST
+    assert seen == [("sendrawtransaction", ["0200"])]
+    with pytest.raises(ValueError):
+        engine.broadcast_transaction("LTC", tx_id, "0200")
+
+
+def test_engine_router_needs_a_node(engine):
+    with pytest.raises(ValueError):
+        engine.node_router("XMR")
+
+
+class FlakyClient:
+    """In-process client: every third call on ``flaky`` endpoints is a transport failure."""
+
+    def __init__(self, node):
+        self.flaky = node.rpc_address.startswith("flaky")
+        self.calls = 0
+
+    async def call(self, method, params):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.flaky and self.calls % 3 == 0:
+            raise NodeConnectionError("reset")
+        return method
+
+    async def close(self):
+        pass
+
+
+def test_routers_on_several_threads_share_health_consistently():
+    health = {}
+    nodes = [NodeConfig("LTC", "steady:1", tls=False), NodeConfig("LTC", "flaky:1", tls=False)]
+    outcomes = []
+    snapshots = []
+
+    async def run():
+        router = NodeRouter(nodes, client_factory=FlakyClient, eject_after=1000, max_error_rate=1.0, health=health)
+        succeeded = failed = 0
+        for _ in range(40):
+            try:
+                await router.call("getblockcount", idempotent=False)
+                succeeded += 1
+            except NodeConnectionError:
+                failed += 1
+            snapshots.append(router.stats())  # reads race with the other threads' updates
+        outcomes.append((succeeded, failed))
+
+    threads = [threading.Thread(target=asyncio.run, args=(run(),)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 8
+    succeeded = sum(ok for ok, _ in outcomes)
+    assert set(health) == {"steady:1", "flaky:1"}
+    assert all(state.in_flight == 0 for state in health.values())
+    # Every success landed in exactly one shared histogram.
+    assert sum(len(state.latency) for state in health.values()) == succeeded
+    assert succeeded + sum(failed for _, failed in outcomes) == 8 * 40
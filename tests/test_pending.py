@@ -0,0 +1,149 @@
+import pytest
+
+from pending import (
+    BROADCAST,
+    CANCELLED,
+    CONFIRMED,
+    FAILED,
+    STAGED,
+    PendingStore,
+    RetentionPolicy,
+)
+
+
+def store_with(count, retention=None, now=1_000.0):
+    store = PendingStore("LTC", retention or RetentionPolicy(max_records=None))
+    for index in range(count):
+        store.add(f"ltc1q{index:04d}", 1_000 * (index + 1), 10 * (count - index), f"note {index}", now=now + index)
+    return store
+
+
+def test_state_indexes_follow_every_transition():
+    store = store_with(4)
+    ids = [record.tx_id for record in store]
+
+    store.set_state(ids[0], BROADCAST, now=2_000)
+    store.set_state(ids[0], CONFIRMED, now=2_001)
+    store.set_state(ids[1], CANCELLED, now=2_002)
+    store.set_state(ids[2], FAILED, now=2_003)
+
+    assert [record.tx_id for record in store.in_state(STAGED)] == [ids[3]]
+    assert [record.tx_id for record in store.in_state(CONFIRMED)] == [ids[0]]
+    assert [record.tx_id for record in store.active()] == [ids[3]]
+    assert (store.count(), store.count(BROADCAST), store.count(CANCELLED)) == (4, 0, 1)
+    with pytest.raises(ValueError, match="Cannot move"):
+        store.set_state(ids[0], BROADCAST)
+    with pytest.raises(KeyError):
+        store.get("ltc-9999")
+
+
+def test_retention_evicts_only_the_oldest_finished_records():
+    store = store_with(6, RetentionPolicy(max_records=4))
+    ids = [record.tx_id for record in store]
+    assert len(store) == 6  # nothing finished yet, so nothing can go
+
+    store.set_state(ids[3], CANCELLED, now=2_000)
+    store.set_state(ids[1], CANCELLED, now=2_001)
+    store.set_state(ids[5], FAILED, now=2_002)
+
+    assert len(store) == 4
+    assert ids[3] not in store and ids[1] not in store
+    assert ids[5] in store and store.count(STAGED) == 3
+    # Ids are never reused after eviction.
+    assert store.add("ltc1qnew", 1, 1).tx_id == "ltc-0007"
+
+
+def test_retention_by_age():
+    store = store_with(3, RetentionPolicy(max_records=None, max_age=60))
+    ids = [record.tx_id for record in store]
+    store.set_state(ids[0], CANCELLED, now=2_000)
+    store.set_state(ids[1], CANCELLED, now=2_050)
+
+    assert store.prune(now=2_070) == 1
+    assert ids[0] not in store and ids[1] in store
+    assert store.prune(now=2_070) == 0
+
+
+def test_large_batches_move_and_evict_as_one():
+    store = PendingStore("LTC", RetentionPolicy(max_records=10))
+    size = 20_000
+    rows = store.add_many(["ltc1q"] * size, [1] * size, [1] * size, [""] * size, now=1.0, batch=True)
+    tail = store.add("ltc1qtail", 1, 1, now=2.0)
+
+    assert store.batch_of(rows[-1])[0] is rows[0]
+    store.set_state(rows[size // 2].tx_id, CANCELLED, now=3.0)
+
+    assert len(store) == 10
+    assert tail.tx_id in store
+    # The leader and the earliest rows went first; the rest still resolve their batch.
+    assert rows[0].tx_id not in store
+    survivors = store.batch_of(rows[-1])
+    assert [record.tx_id for record in survivors] == [record.tx_id for record in rows[-9:]]
+    assert all(record.state == CANCELLED for record in survivors)
+
+
+def test_page_slices_sorts_and_filters():
+    store = store_with(25)
+
+    first = store.page(offset=0, limit=10)
+    assert (first.offset, first.total) == (0, 25)
+    assert [record.tx_id for record in first.records][:2] == ["ltc-0025", "ltc-0024"]
+    last = store.page(offset=100, limit=10)
+    assert last.offset == 15 and len(last.records) == 10
+
+    by_amount = store.page(limit=3, sort="amount", descending=False)
+    assert [record.amount for record in by_amount.records] == [1_000, 2_000, 3_000]
+    by_fee = store.page(limit=1, sort="fee", descending=True)
+    assert by_fee.records[0].tx_id == "ltc-0001"
+
+    store.set_state("ltc-0003", CANCELLED, now=5_000)
+    store.set_state("ltc-0001", CANCELLED, now=5_001)
+    cancelled = store.page(state=CANCELLED, descending=False)
+    assert [record.tx_id for record in cancelled.records] == ["ltc-0001", "ltc-0003"]
+
+    matches = store.page(query="  NOTE 1")
+    assert matches.total == 11  # note 1 and note 10 .. note 19
+    assert store.page(query="ltc1q0007").records[0].tx_id == "ltc-0008"
+    with pytest.raises(ValueError, match="Unknown sort key"):
+        store.page(sort="colour")
+    with pytest.raises(ValueError, match="Unknown state"):
+        store.page(state="lost")
+
+
+def test_page_cache_is_rebuilt_when_the_store_changes():
+    store = store_with(5)
+    before = store.page(state=STAGED)
+    assert store.page(state=STAGED).version == before.version
+
+    store.set_state("ltc-0002", CANCELLED, now=3_000)
+    after = store.page(state=STAGED)
+    assert after.version != before.version
+    assert after.total == 4 and "ltc-0002" not in [record.tx_id for record in after.records]
+
+    store.add("ltc1qmore", 1, 1)
+    assert store.page(state=STAGED).total == 5
+
+    store.prune()
+    version = store.page().version
+    store.retention.max_records = 1
+    store.prune()
+    assert store.page().version != version
+
+
+def test_export_restore_round_trip_keeps_batches_and_indexes():
+    store = store_with(2)
+    batch = store.add_many(["a", "b", "c"], [1, 2, 3], [1, 1, 1], ["", "", ""], now=3_000, batch=True)
+    store.set_state(batch[1].tx_id, BROADCAST, now=3_001)
+
+    copy = PendingStore("LTC")
+    copy.restore(store.export())
+
+    assert [record.tx_id for record in copy] == [record.tx_id for record in store]
+    assert [record.tx_id for record in copy.batch_of(copy.get(batch[2].tx_id))] == [record.tx_id for record in batch]
+    assert copy.count(BROADCAST) == 3 and copy.count(STAGED) == 2
+    assert copy.add("d", 1, 1).tx_id == "ltc-0006"
+
+    legacy = store.export()
+    legacy["records"] = [row[:10] for row in legacy["records"]]
+    copy.restore(legacy)
+    assert copy.batch_of(copy.get(batch[0].tx_id)) == [copy.get(batch[0].tx_id)]
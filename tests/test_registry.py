@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Metrics
+from registry import WalletRegistry
+from seed import SeedVault
+
+from conftest import TEST_MNEMONIC
+
+WALLETS = ("alpha", "beta", "gamma")
+ATTEMPTS = 20  # per thread
+THREADS = 6  # per wallet
+
+
+def test_concurrent_sends_never_overspend_and_metrics_stay_per_wallet():
+    metrics = Metrics()
+    registry = WalletRegistry(metrics=metrics, seed_vault=SeedVault(use_process=False))
+    try:
+        for name in WALLETS:
+            engine = registry.open(name, TEST_MNEMONIC)
+            engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+            engine.set_balance("LTC", 10**8)  # room for 9 sends of 0.1 + 0.0001
+        recipient = registry.get("alpha").receive_address("LTC", 3)
+        start = threading.Barrier(THREADS * len(WALLETS))
+
+        def hammer(name):
+            engine = registry.get(name)
+            start.wait()
+            sent = 0
+            for _ in range(ATTEMPTS):
+                try:
+                    engine.send_transaction("LTC", recipient, 0.1, 0.0001, "")
+                    sent += 1
+                except ValueError:
+                    pass
+            return name, sent
+
+        with ThreadPoolExecutor(THREADS * len(WALLETS)) as pool:
+            outcomes = list(pool.map(hammer, [name for name in WALLETS for _ in range(THREADS)]))
+
+        for name in WALLETS:
+            engine = registry.get(name)
+            assert sum(sent for owner, sent in outcomes if owner == name) == 9
+            assert engine.get_account("LTC").pending.count() == 9
+            assert engine.get_account("LTC").balance_units == 10**8 - 9 * 10_010_000
+
+        snapshot = metrics.snapshot()
+        for name in WALLETS:
+            series = f'send_transaction",wallet="{name}"}}'
+            calls = snapshot["counters"][f'calls_total{{method="{series}']
+            latency = snapshot["histograms"][f'call_seconds{{method="{series}']
+            assert calls == latency["count"] == THREADS * ATTEMPTS
+            assert snapshot["gauges"][f'pending_depth{{asset="LTC",state="staged",wallet="{name}"}}'] == 9
+
+        registry.close("beta")
+        assert not any('wallet="beta"' in key for key in metrics.snapshot()["gauges"])
+    finally:
+        registry.close_all()
+
+
+def test_reinstrumenting_a_method_reuses_its_histogram():
+    metrics = Metrics()
+    first = metrics.instrument("work", lambda: None)
+    second = metrics.instrument("work", lambda: None)
+    first()
+    second()
+    second()
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]['calls_total{method="work"}'] == 3
+    assert snapshot["histograms"]['call_seconds{method="work"}']["count"] == 3
@@ -0,0 +1,96 @@
+import hashlib
+import hmac
+
+import pytest
+
+from seed import WORDLIST, SeedVault, mnemonic_indices, mnemonic_to_seed
+
+# BIP-39 reference vectors (trezor/python-mnemonic vectors.json), passphrase "TREZOR".
+VECTORS = [
+    (
+        "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about",
+        "c55257c360c07c72029aebc1b53c05ed0362ada38ead3e3e9efa3708e53495531f09a6987599d18264c1e1c92f2cf141630c7a3c4ab7c81b2f001698e7463b04",
+    ),
+    (
+        "legal winner thank year wave sausage worth useful legal winner thank yellow",
+        "2e8905819b8723fe2c1d161860e5ee1830318dbf49a83bd451cfb8440c28bd6fa457fe1296106559a3c80937a1c1069be3a3a5bd381ee6260e8d9739fce1f607",
+    ),
+    (
+        "letter advice cage absurd amount doctor acoustic avoid letter advice cage above",
+        "d71de856f81a8acc65e6fc851a38d4d7ec216fd0796d0a6827a3ad6ed5511a30fa280f12eb2e47ed2ac03b5c462a0358d18d69fe4f985ec81778c1b370b652a8",
+    ),
+    (
+        "zoo zoo zoo zoo zoo zoo zoo zoo zoo zoo zoo wrong",
+        "ac27495480225222079d7be181583751e86f571027b0497b5b5d11218e0a8a13332572917f0f8e5a589620c6f15b11c61dee327651a14c34e18231052e48c069",
+    ),
+    (
+        " ".join(["abandon"] * 17 + ["agent"]),
+        "035895f2f481b1b0f01fcf8c289c794660b289981a78f8106447707fdd9666ca06da5a9a565181599b79f53b844d8a71dd9f439c52a3d7b3e8a79c906ac845fa",
+    ),
+    (
+        " ".join(["abandon"] * 23 + ["art"]),
+        "bda85446c68413707090a52022edd26a1c9462295029f2e60cd7c4f2bbd3097170af7a4d73245cafa9c3cca8d561a7c3de6f5d4a10be8ed2a5e608d68f92fcc8",
+    ),
+]
+
+
+@pytest.mark.parametrize("phrase, seed_hex", VECTORS)
+def test_reference_vectors(phrase, seed_hex):
+    mnemonic_indices(phrase)
+    assert mnemonic_to_seed(phrase, "TREZOR").hex() == seed_hex
+
+
+def test_phrases_are_normalized_before_stretching():
+    phrase, seed_hex = VECTORS[0]
+    assert mnemonic_to_seed("  " + phrase.upper().replace(" ", "   ") + "\n", "TREZOR").hex() == seed_hex
+
+
+@pytest.mark.parametrize(
+    "phrase, message",
+    [
+        (" ".join(["abandon"] * 12), "checksum does not match"),
+        ("about " + " ".join(["abandon"] * 11), "checksum does not match"),
+        (" ".join(["zoo"] * 12), "checksum does not match"),
+        (" ".join(["abandon"] * 11), "12, 15, 18, 21 or 24 words"),
+        (" ".join(["abandon"] * 10 + ["abandonn", "about"]), "Word 11 is not"),
+        ("", "12, 15, 18, 21 or 24 words"),
+    ],
+)
+def test_invalid_phrases_are_rejected(phrase, message):
+    with pytest.raises(ValueError, match=message):
+        mnemonic_indices(phrase)
+
+
+def test_wordlist_is_the_canonical_list():
+    assert len(WORDLIST) == 2048
+    assert (WORDLIST[0], WORDLIST[-1]) == ("abandon", "zoo")
+
+
+def test_vault_derives_in_a_spawned_process_and_caches():
+    phrase, seed_hex = VECTORS[1]
+    vault = SeedVault(use_process=True)
+    try:
+        master = vault.derive(phrase, "TREZOR")
+        assert vault._pool is not None
+        assert bytes(master.seed).hex() == seed_hex
+        expected = hmac.new(b"Bitcoin seed", bytes.fromhex(seed_hex), hashlib.sha512).digest()
+        assert bytes(master.master_key) + bytes(master.master_chain_code) == expected
+
+        assert vault.derive(phrase.upper(), "TREZOR") is master
+        assert vault.derive(phrase, "") is not master
+        assert len(vault) == 2
+    finally:
+        vault.close()
+    assert master.wiped and len(vault) == 0
+
+
+def test_discard_zeroizes_only_that_seed():
+    vault = SeedVault(use_process=False)
+    kept = vault.derive(VECTORS[0][0])
+    dropped = vault.derive(VECTORS[2][0])
+
+    vault.discard(dropped)
+
+    assert dropped.wiped and not kept.wiped
+    assert len(vault) == 1
+    assert repr(kept) == "MasterSeed(<redacted>)"
@@ -0,0 +1,110 @@
+import io
+
+import wallet_engine
+from wallet_engine import WalletEngine
+from address_index import output_script
+from hd import account_path
+from pending import CANCELLED
+from tx_container import iter_container
+
+
+def fund(engine, with_paths=True):
+    engine.set_node("LTC", "127.0.0.1:9332", tls=False)
+    engine.set_balance("LTC", 0)
+    for n, value in enumerate((200_000_000, 300_000_000, 400_000_000)):
+        path = account_path("LTC") + (0, n) if with_paths else None
+        engine.add_utxo("LTC", f"{n + 1:064x}", 0, value, path)
+
+
+def exported(engine, **options):
+    stream = io.BytesIO()
+    engine.export_prepared(stream, "LTC", **options)
+    return [(record.tx_id, record.note, record.psbt().input_value(0)) for record in iter_container(stream.getvalue())]
+
+
+def test_sends_with_the_same_timestamp_stay_separate(engine, monkeypatch):
+    fund(engine)
+    monkeypatch.setattr(wallet_engine.time, "time", lambda: 1_700_000_000.0)
+    first = engine.send_transaction("LTC", engine.receive_address("LTC", 5), 0.5, 0.0001, "rent")
+    second = engine.send_transaction("LTC", engine.receive_address("LTC", 6), 0.5, 0.0001, "")
+    addresses = [engine.receive_address("LTC", 10 + row) for row in range(3)]
+    batch = engine.prepare_batch("LTC", addresses, [0.2] * 3, [0.0001] * 3, ["a", "", "c"])
+    monkeypatch.undo()
+
+    records = exported(engine)
+    assert [tx_id for tx_id, _, _ in records] == [first, second, batch.tx_ids[0]]
+    assert [note for _, note, _ in records] == ["rent", "", "a\nc"]
+    assert all(value for _, _, value in records)  # every PSBT carries its inputs
+
+
+def test_a_cancelled_batch_leaves_the_export_whole(engine):
+    fund(engine)
+    addresses = [engine.receive_address("LTC", 10 + row) for row in range(3)]
+    kept = engine.prepare_batch("LTC", addresses, [0.3] * 3, [0.0001] * 3)
+    cancelled = engine.prepare_batch("LTC", addresses, [0.2] * 3, [0.0001] * 3)
+    engine.update_transaction_state("LTC", cancelled.tx_ids[1], CANCELLED)
+
+    assert [tx_id for tx_id, _, _ in exported(engine)] == [kept.tx_ids[0]]
+    assert [tx_id for tx_id, _, _ in exported(engine, states=(CANCELLED,))] == [cancelled.tx_ids[0]]
+
+
+def test_inputs_carry_their_witness_utxo_and_derivation(engine):
+    fund(engine)
+    tx_id = engine.send_transaction("LTC", engine.receive_address("LTC", 9), 2.5, 0.0001, "")
+    spends_change = engine.send_transaction("LTC", engine.receive_address("LTC", 9), 0.2, 0.0001, "")
+    fingerprint = engine._require_keychain().master.fingerprint
+
+    stream = io.BytesIO()
+    engine.export_prepared(stream, "LTC")
+    first, second = [record.psbt() for record in iter_container(stream.getvalue())]
+
+    inputs = engine.get_transaction("LTC", tx_id).inputs
+    for index, (txid, _, value) in enumerate(inputs):
+        n = int(txid, 16) - 1
+        assert first.input_value(index) == value
+        assert bytes(first.input_script(index)) == output_script("LTC", engine.receive_address("LTC", n))
+        [(public_key, origin, path)] = first.input_derivations(index)
+        assert (origin, path) == (fingerprint, account_path("LTC") + (0, n))
+        assert not any(key[0] == 0xFC for key, _ in first.inputs[index])
+
+    # The second send spends the first one's change, at m/84'/2'/0'/1/0.
+    assert engine.get_transaction("LTC", spends_change).inputs[0][:2] == [tx_id, 1]
+    assert bytes(second.input_script(0)) == output_script("LTC", engine.receive_address("LTC", 0, change=True))
+    assert second.input_derivations(0)[0][2] == account_path("LTC") + (1, 0)
+
+
+def test_inputs_without_a_known_path_fall_back_to_the_value_field(engine):
+    fund(engine, with_paths=False)
+    engine.send_transaction("LTC", engine.receive_address("LTC", 9), 0.5, 0.0001, "")
+
+    stream = io.BytesIO()
+    engine.export_prepared(stream, "LTC")
+    [record] = list(iter_container(stream.getvalue()))
+    psbt = record.psbt()
+
+    assert psbt.input_value(0) == 200_000_000
+    assert psbt.input_script(0) is None and psbt.input_derivations(0) == []
+
+
+def test_output_paths_survive_a_restart(tmp_path):
+    from journal import JournalStore
+    from seed import SeedVault
+
+    def reopen():
+        return WalletEngine(seed_vault=vault, journal=JournalStore(str(tmp_path), bytes(32), snapshot_every=3))
+
+    vault = SeedVault(use_process=False)
+    engine = reopen()
+    engine.set_balance("LTC", 0)
+    for n in range(4):  # the third append writes a snapshot, the fourth is replayed from the tail
+        engine.add_utxo("LTC", f"{n + 1:064x}", 0, 1_000, account_path("LTC") + (0, n))
+    engine.close()
+
+    engine = reopen()
+    try:
+        assert [engine.utxo_path("LTC", f"{n + 1:064x}", 0) for n in range(4)] == [
+            account_path("LTC") + (0, n) for n in range(4)
+        ]
+    finally:
+        engine.close()
+        vault.close()
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+
+from worker import EngineWorker
+
+
+class FakeRoot:
+    """Just enough of a Tk root: ``after`` callbacks run when the test pumps them."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.cursor = ""
+        self.reported = []
+
+    def after(self, _ms, callback):
+        self.scheduled.append(callback)
+
+    def configure(self, cursor):
+        self.cursor = cursor
+
+    def report_callback_exception(self, kind, value, traceback):
+        self.reported.append(value)
+
+
+class FakeWidget:
+    def __init__(self, disabled=False):
+        self.disabled = disabled
+
+    def instate(self, states):
+        return self.disabled
+
+    def state(self, states):
+        self.disabled = states == ["disabled"]
+
+
+@pytest.fixture
+def worker():
+    root = FakeRoot()
+    engine_worker = EngineWorker(root, max_workers=2)
+    yield engine_worker
+    engine_worker.shutdown(wait=True)
+
+
+def pump(worker, timeout=5.0):
+    """Run the Tk-side polling until no job is outstanding."""
+
+    deadline = time.monotonic() + timeout
+    while worker._jobs or worker.root.scheduled:
+        assert time.monotonic() < deadline, "worker jobs did not settle"
+        scheduled, worker.root.scheduled = worker.root.scheduled, []
+        for callback in scheduled:
+            callback()
+        time.sleep(0.001)
+
+
+def test_identical_requests_in_flight_are_coalesced(worker):
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def estimate(symbol, amount):
+        calls.append((symbol, amount))
+        release.wait(5)
+        return amount * 2
+
+    worker.submit("estimate", estimate, "LTC", 1.5, on_done=results.append)
+    worker.submit("estimate", estimate, "LTC", 1.5, on_done=results.append)
+    assert worker.in_flight("estimate")
+    release.set()
+    pump(worker)
+
+    assert calls == [("LTC", 1.5)]
+    assert results == [3.0, 3.0]
+
+
+def test_a_new_request_supersedes_the_old_one(worker):
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow(value):
+        started.set()
+        release.wait(5)
+        return value
+
+    worker.submit("estimate", slow, "first", on_done=results.append)
+    started.wait(5)
+    worker.submit("estimate", slow, "second", on_done=results.append)
+    release.set()
+    pump(worker)
+
+    # "first" ran to completion but its stale result was dropped.
+    assert results == ["second"]
+
+
+def test_superseded_queued_jobs_never_run(worker):
+    release = threading.Event()
+    ran = []
+    worker.submit("block", release.wait, 5)
+    worker.submit("history", ran.append, 1)
+    worker.submit("history", ran.append, 2)
+    release.set()
+    pump(worker)
+
+    assert ran == [2]
+
+
+def test_exclusive_jobs_run_one_at_a_time_in_submission_order(worker):
+    order = []
+    active = []
+    overlap = []
+
+    def step(index):
+        active.append(index)
+        overlap.append(len(active))
+        time.sleep(0.002 * (index % 3))
+        order.append(index)
+        active.remove(index)
+
+    for index in range(20):
+        worker.submit(f"job-{index}", step, index)
+    pump(worker)
+
+    assert order == list(range(20))
+    assert max(overlap) == 1
+
+
+def test_non_exclusive_jobs_run_beside_an_exclusive_one(worker):
+    gate = threading.Event()
+    results = []
+    worker.submit("send", gate.wait, 5, on_done=results.append)
+    worker.submit("history", gate.set, exclusive=False)
+    pump(worker)
+
+    assert results == [True]
+
+
+def test_busy_widgets_and_cursor_follow_the_job(worker):
+    release = threading.Event()
+    button = FakeWidget()
+    already_off = FakeWidget(disabled=True)
+    errors = []
+
+    def fail():
+        release.wait(5)
+        raise ValueError("node unreachable")
+
+    worker.submit("send", fail, on_error=errors.append, busy=[button, already_off])
+    assert button.disabled and worker.root.cursor == "watch"
+    release.set()
+    pump(worker)
+
+    assert [str(error) for error in errors] == ["node unreachable"]
+    assert not button.disabled and already_off.disabled
+    assert worker.root.cursor == ""
+
+    worker.submit("send", fail)
+    pump(worker)
+    assert [str(error) for error in worker.root.reported] == ["node unreachable"]
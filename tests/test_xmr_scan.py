@@ -0,0 +1,181 @@
+import hashlib
+import threading
+
+from monero import (
+    L,
+    MoneroKeys,
+    base_mult,
+    compress,
+    decompress,
+    derive_output_scalar,
+    hash_to_scalar,
+    keccak256,
+    key_derivation,
+    key_image,
+    point_add,
+    view_tag,
+)
+from xmr_scan import MoneroScanner, ScanCheckpoint, parse_transaction
+
+STRANGER = MoneroKeys(12345)
+
+
+def txid(label):
+    return hashlib.sha256(label.encode()).hexdigest()
+
+
+def payment(keys, label, amounts, spends=(), legacy=False, with_amounts=True):
+    """A monerod ``as_json`` transaction paying ``amounts`` to ``keys`` and spending ``spends`` key images."""
+
+    secret = hash_to_scalar(label.encode())
+    tx_public = compress(base_mult(secret))
+    derivation = key_derivation(decompress(keys.view_public), secret)
+    spend_point = decompress(keys.spend_public)
+    vout, ecdh = [], []
+    for index, amount in enumerate(amounts):
+        scalar = derive_output_scalar(derivation, index)
+        key = compress(point_add(base_mult(scalar), spend_point))
+        vout.append({"amount": 0, "target": {"tagged_key": {"key": key.hex(), "view_tag": f"{view_tag(derivation, index):02x}"}}})
+        if legacy:
+            offset = hash_to_scalar(hash_to_scalar(scalar.to_bytes(32, "little")).to_bytes(32, "little"))
+            ecdh.append({"amount": ((amount + offset) % L).to_bytes(32, "little").hex()})
+        else:
+            mask = keccak256(b"amount" + scalar.to_bytes(32, "little"))[:8]
+            ecdh.append({"amount": bytes(a ^ b for a, b in zip(amount.to_bytes(8, "little"), mask)).hex()})
+    body = {
+        "vin": [{"key": {"amount": 0, "key_offsets": [1, 2], "k_image": image.hex()}} for image in spends],
+        "vout": vout,
+        "extra": [1, *tx_public],
+        "rct_signatures": {"type": 3 if legacy else 6, **({"ecdhInfo": ecdh} if with_amounts else {})},
+    }
+    return txid(label), body
+
+
+def owned_image(keys, label, index):
+    """Key image of output ``index`` of :func:`payment` ``label``, from the wallet's side."""
+
+    derivation = key_derivation(decompress(compress(base_mult(hash_to_scalar(label.encode())))), keys.view_secret)
+    scalar = derive_output_scalar(derivation, index)
+    return key_image(scalar + keys.spend_secret, compress(point_add(base_mult(scalar), decompress(keys.spend_public))))
+
+
+class FakeChain:
+    """Block source for the scanner: ``blocks`` is a list of ``(txid, as_json body)`` lists."""
+
+    def __init__(self, blocks, cancel_after=None, cancel=None):
+        self.blocks = blocks
+        self.fetched = []
+        self.cancel_after = cancel_after
+        self.cancel = cancel
+
+    def tip(self):
+        return len(self.blocks) - 1
+
+    def fetch(self, start, end):
+        self.fetched.append((start, end))
+        if self.cancel is not None and len(self.fetched) == self.cancel_after:
+            self.cancel.set()
+        transactions = []
+        for height in range(start, end + 1):
+            for tx_hash, body in self.blocks[height]:
+                parsed = parse_transaction(height, tx_hash, body)
+                if parsed is not None:
+                    transactions.append(parsed)
+        return transactions
+
+
+def chain_for(keys):
+    return [
+        [payment(keys, "first", [7_000, 1_000]), payment(STRANGER, "noise", [5])],
+        [],
+        [payment(keys, "legacy", [2_500], legacy=True)],
+        [payment(STRANGER, "spend", [6_900], spends=[owned_image(keys, "first", 0), b"\x11" * 32])],
+        [payment(keys, "late", [400])],
+    ]
+
+
+def xmr(engine):
+    return engine.get_account("XMR").balance_units, engine.get_utxos("XMR").total
+
+
+def test_received_outputs_are_credited_and_spends_debited(engine, tmp_path):
+    engine.set_balance("XMR", 0)
+    keys = engine.monero_keys()
+    scanner = MoneroScanner(engine, FakeChain(chain_for(keys)), str(tmp_path / "xmr.json"), batch_blocks=2, processes=0)
+
+    report = scanner.run()
+
+    assert (report.outputs_found, report.outputs_spent, report.undecoded) == (4, 1, [])
+    assert report.transactions == 5 and report.scanned_height == 4
+    assert xmr(engine) == (3_900, 3_900)
+    utxos = engine.get_utxos("XMR")
+    assert (txid("first"), 0) not in utxos and utxos.get(txid("legacy"), 0) == 2_500
+    checkpoint = ScanCheckpoint.load(str(tmp_path / "xmr.json"))
+    assert checkpoint.height == 4 and owned_image(keys, "first", 0).hex() not in checkpoint.key_images
+    assert checkpoint.key_images[owned_image(keys, "late", 0).hex()] == [txid("late"), 0]
+
+
+def test_a_spend_in_a_later_run_uses_the_checkpointed_key_images(engine, tmp_path):
+    engine.set_balance("XMR", 0)
+    keys = engine.monero_keys()
+    blocks = chain_for(keys)
+    path = str(tmp_path / "xmr.json")
+    MoneroScanner(engine, FakeChain(blocks[:3]), path, processes=0).run()
+    assert xmr(engine) == (10_500, 10_500)
+
+    chain = FakeChain(blocks)
+    report = MoneroScanner(engine, chain, path, processes=0).run()
+
+    assert chain.fetched == [(3, 4)] and report.outputs_spent == 1
+    assert xmr(engine) == (3_900, 3_900)
+
+
+def test_cancelled_scan_resumes_from_its_checkpoint(engine, tmp_path):
+    engine.set_balance("XMR", 0)
+    keys = engine.monero_keys()
+    path = str(tmp_path / "xmr.json")
+    cancel = threading.Event()
+    chain = FakeChain(chain_for(keys), cancel_after=2, cancel=cancel)
+    scanner = MoneroScanner(engine, chain, path, batch_blocks=2, processes=0)
+
+    stopped = scanner.run(cancel)
+    assert stopped.cancelled and stopped.scanned_height == 3
+    assert ScanCheckpoint.load(path).height == 3
+    assert xmr(engine) == (3_500, 3_500)
+
+    resumed = scanner.run()
+    assert not resumed.cancelled and resumed.start_height == 4
+    assert chain.fetched[-1] == (4, 4)
+    assert xmr(engine) == (3_900, 3_900)
+
+
+def test_worker_processes_find_the_same_outputs(engine, tmp_path):
+    engine.set_balance("XMR", 0)
+    keys = engine.monero_keys()
+    scanner = MoneroScanner(engine, FakeChain(chain_for(keys)), str(tmp_path / "xmr.json"), processes=2)
+    try:
+        report = scanner.run()
+    finally:
+        scanner.close()
+
+    assert (report.outputs_found, report.outputs_spent) == (4, 1)
+    assert xmr(engine) == (3_900, 3_900)
+
+
+def test_outputs_without_an_amount_are_reported_not_credited(engine, tmp_path):
+    engine.set_balance("XMR", 0)
+    keys = engine.monero_keys()
+    chain = FakeChain([[payment(keys, "bare", [900], with_amounts=False)]])
+
+    report = MoneroScanner(engine, chain, str(tmp_path / "xmr.json"), processes=0).run()
+
+    assert report.outputs_found == 1 and report.undecoded == [(txid("bare"), 0)]
+    assert xmr(engine) == (0, 0)
+
+
+def test_transactions_without_a_tx_key_still_carry_their_spends():
+    image = b"\x22" * 32
+    body = {"vin": [{"key": {"amount": 0, "key_offsets": [3], "k_image": image.hex()}}], "vout": [], "extra": []}
+    parsed = parse_transaction(9, "ab" * 32, body)
+    assert parsed.outputs == () and parsed.key_images == (image,)
+    assert parse_transaction(9, "ab" * 32, {"vin": [{"gen": {"height": 9}}], "vout": [], "extra": []}) is None